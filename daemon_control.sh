@@ -52,6 +52,19 @@ status() {
     fi
 }
 
+# 通知守护进程重新加载配置与订阅的函数
+reload() {
+    if [ -f $PID_FILE ]; then
+        PID=$(cat $PID_FILE)
+        echo "Reloading $DAEMON_NAME..."
+        # 发送 SIGHUP 信号，守护进程只重建配置发生变化的组件
+        kill -HUP $PID
+        echo "$DAEMON_NAME reloaded."
+    else
+        echo "$DAEMON_NAME is not running."
+    fi
+}
+
 # 根据输入参数选择执行哪个函数
 case "$1" in
     start)
@@ -63,6 +76,9 @@ case "$1" in
     status)
         status
         ;;
+    reload)
+        reload
+        ;;
     restart)
         # 重启守护进程
         stop
@@ -70,6 +86,6 @@ case "$1" in
         ;;
     *)
         # 如果参数不符合预期，显示用法
-        echo "Usage: $0 {start|stop|status|restart}"
+        echo "Usage: $0 {start|stop|status|reload|restart}"
         exit 1
 esac
@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import threading
+import time
+from logger import LOG  # 导入日志模块
+from state_file import atomic_write_json, file_lock  # 导入状态文件的原子写入与进程间文件锁
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+class AdaptivePolling:
+    """
+    按仓库活跃度自适应调整获取与报告间隔：记录每个仓库近期的活动速率（条/天）的指数滑动平均，
+    活跃的仓库按最短间隔获取，冷门仓库逐步放宽到最长间隔，使 API 调用和 LLM 开销集中在真正有新进展的仓库上。
+    """
+
+    def __init__(self, state_file, min_interval_hours=24, max_interval_hours=168,
+                 target_items=10, smoothing=0.5, grace_hours=1):
+        """
+        :param state_file: 状态文件路径。
+        :param min_interval_hours: 最短间隔（小时），通常与 GitHub 任务的调度周期一致。
+        :param max_interval_hours: 最长间隔（小时）。
+        :param target_items: 期望每份报告包含的活动条数，间隔 = 目标条数 / 活动速率。
+        :param smoothing: 指数滑动平均中新观测值的权重（0~1），越大对近期变化越敏感。
+        :param grace_hours: 判断是否到期时的宽限时间，避免调度抖动导致刚好差几分钟而被推迟一个周期。
+        """
+        self.state_file = state_file
+        self.min_interval = min_interval_hours * 3600
+        self.max_interval = max_interval_hours * 3600
+        self.target_items = target_items
+        self.smoothing = smoothing
+        self.grace = grace_hours * 3600
+        self._lock = threading.Lock()
+        self.repos = self._load()  # repo -> {'rate', 'last_polled', 'interval'}
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, polling_config):
+        return cls(
+            polling_config.get('path', 'data/repo_activity.json'),
+            polling_config.get('min_interval_hours', 24),
+            polling_config.get('max_interval_hours', 168),
+            polling_config.get('target_items', 10),
+            polling_config.get('smoothing', 0.5),
+            polling_config.get('grace_hours', 1),
+        )
+
+    def is_due(self, repo, now=None):
+        """
+        判断仓库是否到了下一次获取的时间；从未获取过的仓库总是到期。
+        """
+        now = now or time.time()
+        with self._lock:
+            entry = self.repos.get(repo)
+        return entry is None or now >= entry['last_polled'] + entry['interval'] - self.grace
+
+    def due_repos(self, repos, now=None):
+        """
+        从订阅列表中筛选出本次需要处理的仓库，并记录被跳过的仓库。
+        """
+        self.sync()  # 协调进程筛选时需要看到工作进程记录的获取结果
+        due = [repo for repo in repos if self.is_due(repo, now)]
+        skipped = [repo for repo in repos if repo not in due]
+        if skipped:
+            LOG.info(f"[自适应轮询]本次跳过活跃度较低的仓库：{skipped}")
+        return due
+
+    def sync(self):
+        """
+        读入其它进程（例如工作进程）记录的获取结果，同一仓库以最近一次获取为准。
+        """
+        with self._lock:
+            self._merge(self._load())
+
+    def window_days(self, repo, default_days, now=None):
+        """
+        返回本次获取应覆盖的天数：自上次获取以来的天数（向上取整），从未获取过时使用默认值。
+        """
+        now = now or time.time()
+        with self._lock:
+            entry = self.repos.get(repo)
+        if entry is None:
+            return default_days
+        return max(1, math.ceil((now - entry['last_polled']) / 86400))
+
+    def record(self, repo, item_count, window_days, now=None):
+        """
+        记录一次获取到的活动条数，更新活动速率与下一次的获取间隔，并立即持久化。
+        :return: 新的获取间隔（小时）
+        """
+        now = now or time.time()
+        observed = item_count / max(window_days, 1)
+        with self._lock, file_lock(self.state_file + ".lock"):
+            # 多个工作进程共用同一个状态文件，先合并其它进程的记录，再在最新的记录上更新并写回
+            self._merge(self._load())
+            entry = self.repos.get(repo)
+            rate = observed if entry is None else self.smoothing * observed + (1 - self.smoothing) * entry['rate']
+            interval = self.max_interval if rate <= 0 else self.target_items / rate * 86400
+            interval = min(self.max_interval, max(self.min_interval, interval))
+            self.repos[repo] = {'rate': rate, 'last_polled': now, 'interval': interval}
+            atomic_write_json(self.state_file, self.repos)
+        LOG.info(f"[自适应轮询][{repo}]活动速率 {rate:.2f} 条/天，下一次获取间隔 {interval / 3600:.0f} 小时")
+        return interval / 3600
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"仓库活跃度状态读取失败，将重新统计：{str(e)}")
+            return {}
+
+    def _merge(self, repos):
+        # 同一仓库以最近一次获取的记录为准
+        for repo, entry in repos.items():
+            current = self.repos.get(repo)
+            if current is None or entry['last_polled'] > current['last_polled']:
+                self.repos[repo] = entry
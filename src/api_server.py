@@ -0,0 +1,282 @@
+import argparse  # 导入argparse库，用于解析监听地址参数
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 导入标准库的 HTTP 服务，无需额外依赖
+from logger import LOG  # 导入日志模块
+
+REPO_NAME = re.compile(r'^[\w.-]+/[\w.-]+$')  # owner/repo 形式的仓库名
+PROVIDERS = ("openai", "ollama")
+MAX_DAYS = 30
+
+
+class QueueFull(Exception):
+    """
+    任务队列已满，调用方应稍后重试。
+    """
+
+
+class ReportJobQueue:
+    """
+    报告任务队列：请求进入有界队列，由固定数量的工作线程依次生成报告。
+    相同参数的请求在排队或生成中时复用同一个任务，生成完成后在 result_ttl 内直接返回缓存的结果。
+    已有新鲜的已保存报告时直接返回：请求指定了模型时只使用该模型生成的报告。
+    """
+
+    def __init__(self, process, workers=2, max_queue=100, result_ttl_minutes=60, report_store=None):
+        """
+        :param process: 生成报告的函数 process(repo, days, provider, model)，返回 (报告内容, 报告文件路径)。
+        :param workers: 工作线程数。
+        :param max_queue: 队列中最多等待的任务数，超出时拒绝新任务。
+        :param result_ttl_minutes: 已完成任务的结果保留时长。
+        :param report_store: 可选的 ReportStore，已有新鲜的报告时不再生成。
+        """
+        self.process = process
+        self.workers = workers
+        self.result_ttl = result_ttl_minutes * 60
+        self.report_store = report_store
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}  # job_id -> 任务
+        self._by_key = {}  # (repo, days, provider, model) -> 最近一次的 job_id；未指定模型的请求 model 为 None
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"report-job-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, repo, days, provider, model, any_model=False):
+        """
+        提交报告任务。
+        :param any_model: 请求未指定模型：可以直接返回任意模型生成的新鲜报告，需要生成时使用 provider/model。
+        :return: (任务, 是否新建)；相同参数的任务正在进行或结果仍在有效期内时返回该任务。
+                 直接返回已保存的报告时，任务中的 provider/model 为生成该报告的模型（没有记录时为 None）。
+        :raises QueueFull: 队列已满。
+        """
+        key = (repo, days, provider, None if any_model else model)
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            job = self._jobs.get(self._by_key.get(key))
+            if job is not None and job['status'] != 'failed':
+                return self._view(job), False
+
+            job = {
+                'id': uuid.uuid4().hex, 'repo': repo, 'days': days, 'provider': provider, 'model': model,
+                'status': 'queued', 'cached': False, 'created_at': now, 'finished_at': None,
+                'report': None, 'report_file_path': None, 'error': None,
+            }
+            stored = None
+            if self.report_store:
+                stored = self.report_store.latest(repo, days) if any_model else self.report_store.latest(repo, days, provider, model)
+            if stored is not None and self.report_store.is_fresh(stored, now):
+                job.update(status='done', cached=True, finished_at=now, report=stored.read(), report_file_path=stored.path,
+                           provider=stored.provider, model=stored.model)
+            else:
+                try:
+                    self._queue.put_nowait(job['id'])
+                except queue.Full:
+                    raise QueueFull(f"任务队列已满（{self._queue.maxsize}），请稍后重试")
+            self._jobs[job['id']] = job
+            self._by_key[key] = job['id']
+            LOG.info(f"[报告接口]新任务 {job['id']}：{repo} {days} 天 {provider}/{model}（{job['status']}）")
+            return self._view(job), True
+
+    def get(self, job_id, with_report=False):
+        """
+        返回任务的状态（with_report 为 True 时包括报告内容），不存在时返回 None。
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job, with_report) if job else None
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job['status'] = 'running'
+                repo, days, provider, model = job['repo'], job['days'], job['provider'], job['model']
+            try:
+                report, report_file_path = self.process(repo, days, provider, model)
+                update = {'status': 'done', 'report': report, 'report_file_path': report_file_path}
+            except Exception as e:
+                LOG.error(f"[报告接口]任务 {job_id} 失败：{str(e)}")
+                update = {'status': 'failed', 'error': str(e)}
+            with self._lock:
+                job.update(update, finished_at=time.time())
+
+    def _purge(self, now):
+        # 清除超过保留时长的已完成任务，避免长时间运行后占用过多内存
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+        for key, job_id in list(self._by_key.items()):
+            if job_id not in self._jobs:
+                del self._by_key[key]
+
+    @staticmethod
+    def _view(job, with_report=False):
+        view = {key: value for key, value in job.items() if key != 'report'}
+        if with_report:
+            view['report'] = job['report']
+        return view
+
+
+class ApiServer:
+    """
+    本地 HTTP/JSON 接口，供其它服务以编程方式请求报告：
+      POST /reports          提交任务，请求体 {"repo", "days", "provider", "model"}，返回任务状态；
+                             未指定 model 时可能直接返回其它模型生成的新鲜报告（见返回的 provider/model）
+      GET  /jobs/<id>        查询任务状态
+      GET  /jobs/<id>/result 获取报告；未完成时返回 202，失败时返回 500
+      GET  /healthz          健康检查
+    """
+
+    def __init__(self, jobs, host="127.0.0.1", port=8088, default_provider="ollama", default_model=None):
+        self.jobs = jobs
+        self.default_provider = default_provider
+        self.default_model = default_model
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/reports":
+                    return self._reply(404, {'error': "not found"})
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                    repo, days, provider, model = server.parse_request(request)
+                except (ValueError, TypeError) as e:
+                    return self._reply(400, {'error': str(e)})
+                try:
+                    job, created = server.jobs.submit(repo, days, provider, model, any_model=not request.get('model'))
+                except QueueFull as e:
+                    return self._reply(429, {'error': str(e)})
+                self._reply(200 if job['status'] == 'done' else 202, {**job, 'deduplicated': not created})
+
+            def do_GET(self):
+                if self.path == "/healthz":
+                    return self._reply(200, {'status': "ok"})
+                match = re.fullmatch(r'/jobs/(?P<id>[0-9a-f]+)(?P<result>/result)?', self.path)
+                job = server.jobs.get(match.group('id'), with_report=bool(match.group('result'))) if match else None
+                if job is None:
+                    return self._reply(404, {'error': "not found"})
+                if not match.group('result'):
+                    return self._reply(200, job)
+                status = {'done': 200, 'failed': 500}.get(job['status'], 202)
+                self._reply(status, job)
+
+            def _reply(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                LOG.debug(f"[报告接口]{self.address_string()} {format % args}")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    def parse_request(self, request):
+        """
+        校验请求参数，返回 (repo, days, provider, model)；参数不合法时抛出 ValueError。
+        """
+        if not isinstance(request, dict):
+            raise ValueError("请求体应为 JSON 对象")
+        repo = request.get('repo')
+        if not isinstance(repo, str) or not REPO_NAME.match(repo):
+            raise ValueError("repo 应为 owner/repo 形式的仓库名")
+        days = request.get('days', 1)
+        if not isinstance(days, int) or isinstance(days, bool) or not 1 <= days <= MAX_DAYS:
+            raise ValueError(f"days 应为 1 到 {MAX_DAYS} 之间的整数")
+        provider = request.get('provider') or self.default_provider
+        if provider not in PROVIDERS:
+            raise ValueError(f"provider 应为 {PROVIDERS} 之一")
+        model = request.get('model') or (self.default_model if provider == self.default_provider else None)
+        if not isinstance(model, str) or not model:
+            raise ValueError("请指定 model")
+        return repo, days, provider, model
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="api-server", daemon=True)
+        self._thread.start()
+        LOG.info(f"[报告接口]已启动，监听端口 {self.port}")
+
+    def serve_forever(self):
+        LOG.info(f"[报告接口]已启动，监听端口 {self.port}")
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    from config import Config  # 导入配置管理类
+    from github_client import GitHubClient  # 导入GitHub客户端类
+    from input_compactor import InputCompactor  # 导入输入压缩器
+    from llm_pool import LLMPool  # 导入按模型复用 LLM 与报告生成器的实例池
+    from report_store import ReportStore  # 导入已保存报告的查找
+
+    config = Config()
+    api_config = config.api
+    parser = argparse.ArgumentParser(description='GitHub Sentinel 报告 HTTP 接口')
+    parser.add_argument('--host', default=api_config.get('host', '127.0.0.1'), help='监听地址')
+    parser.add_argument('--port', type=int, default=api_config.get('port', 8088), help='监听端口')
+    args = parser.parse_args()
+
+    github_client = GitHubClient(config.github_token)
+    llm_pool = LLMPool(config, InputCompactor.from_config(config.compaction), api_config.get('llm_pool_size', 8))
+
+    def process(repo, days, provider, model):
+        # 导出仓库进展并用所选模型生成报告
+        raw_file_path = github_client.export_progress_by_date_range(repo, days)
+        return llm_pool.get(provider, model).generate_github_report(raw_file_path)
+
+    jobs = ReportJobQueue(
+        process,
+        workers=api_config.get('workers', 2),
+        max_queue=api_config.get('max_queue', 100),
+        result_ttl_minutes=api_config.get('result_ttl_minutes', 60),
+        report_store=ReportStore(max_age_minutes=api_config.get('report_max_age_minutes', 60)),
+    )
+    default_model = config.openai_model_name if config.llm_model_type == "openai" else config.ollama_model_name
+    server = ApiServer(jobs, args.host, args.port, config.llm_model_type, default_model)
+    jobs.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        LOG.info("[报告接口]收到中断信号，正在停止")
+    finally:
+        jobs.stop()
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 # src/command_handler.py
 
 import argparse  # 导入argparse库，用于处理命令行参数解析
+from subscription_manager import read_repo_file  # 导入批量订阅文件的读取函数
 
 class CommandHandler:
     def __init__(self, github_client, subscription_manager, report_generator):
@@ -20,16 +21,36 @@ class CommandHandler:
 
         # 添加订阅命令
         parser_add = subparsers.add_parser('add', help='Add a subscription')
-        parser_add.add_argument('repo', type=str, help='The repository to subscribe to (e.g., owner/repo)')
+        parser_add.add_argument('repo', type=str, help='The repository to subscribe to (e.g., owner/repo, org:<org> or topic:<topic>)')
+        parser_add.add_argument('--recipient', type=str, default=None, help='Recipient of the reports (defaults to the configured email "to")')
+        parser_add.add_argument('--frequency-days', type=int, default=None, help='Report on this repository every N days')
+        parser_add.add_argument('--window-days', type=int, default=None, help='Number of days each report covers')
+        parser_add.add_argument('--labels', type=str, default=None, help='Only include issues with these labels (comma separated)')
+        parser_add.add_argument('--model', type=str, default=None, help='Model used to generate the reports')
+        parser_add.add_argument('--priority', type=int, default=None, help='Repositories with higher priority are processed first')
         parser_add.set_defaults(func=self.add_subscription)
 
         # 删除订阅命令
         parser_remove = subparsers.add_parser('remove', help='Remove a subscription')
         parser_remove.add_argument('repo', type=str, help='The repository to unsubscribe from (e.g., owner/repo)')
+        parser_remove.add_argument('--recipient', type=str, default=None, help='Only remove this recipient from the subscription')
         parser_remove.set_defaults(func=self.remove_subscription)
 
+        # 批量添加订阅命令
+        parser_import = subparsers.add_parser('import', help='Add subscriptions from a file (one owner/repo per line)')
+        parser_import.add_argument('file', type=str, help='The file listing repositories to subscribe to')
+        parser_import.add_argument('--recipient', type=str, default=None, help='Recipient of the reports (defaults to the configured email "to")')
+        parser_import.set_defaults(func=self.import_subscriptions)
+
+        # 批量删除订阅命令
+        parser_remove_file = subparsers.add_parser('remove-file', help='Remove subscriptions listed in a file (one owner/repo per line)')
+        parser_remove_file.add_argument('file', type=str, help='The file listing repositories to unsubscribe from')
+        parser_remove_file.add_argument('--recipient', type=str, default=None, help='Only remove this recipient from the subscriptions')
+        parser_remove_file.set_defaults(func=self.remove_subscriptions_from_file)
+
         # 列出所有订阅命令
         parser_list = subparsers.add_parser('list', help='List all subscriptions')
+        parser_list.add_argument('--recipient', type=str, default=None, help='Only list repositories subscribed by this recipient')
         parser_list.set_defaults(func=self.list_subscriptions)
 
         # 导出每日进展命令
@@ -56,18 +77,40 @@ class CommandHandler:
 
     # 下面是各种命令对应的方法实现，每个方法都使用了相应的管理器来执行实际操作，并输出结果信息
     def add_subscription(self, args):
-        self.subscription_manager.add_subscription(args.repo)
+        self.subscription_manager.add_subscription(args.repo, args.recipient)
+        settings = {
+            'frequency_days': args.frequency_days, 'window_days': args.window_days, 'model': args.model, 'priority': args.priority,
+            'labels': [label.strip() for label in args.labels.split(',') if label.strip()] if args.labels else None,
+        }
+        settings = {key: value for key, value in settings.items() if value is not None}
+        if settings:
+            self.subscription_manager.update_settings(args.repo, **settings)
         print(f"Added subscription for repository: {args.repo}")
 
     def remove_subscription(self, args):
-        self.subscription_manager.remove_subscription(args.repo)
+        self.subscription_manager.remove_subscription(args.repo, args.recipient)
         print(f"Removed subscription for repository: {args.repo}")
 
+    def import_subscriptions(self, args):
+        repos = read_repo_file(args.file)
+        added = self.subscription_manager.add_subscriptions(repos, args.recipient)
+        print(f"Imported {added} new subscriptions from {args.file} ({len(repos)} listed)")
+
+    def remove_subscriptions_from_file(self, args):
+        repos = read_repo_file(args.file)
+        removed = self.subscription_manager.remove_subscriptions(repos, args.recipient)
+        print(f"Removed {removed} subscriptions listed in {args.file}")
+
     def list_subscriptions(self, args):
-        subscriptions = self.subscription_manager.list_subscriptions()
         print("Current subscriptions:")
-        for sub in subscriptions:
-            print(f"  - {sub}")
+        repos = self.subscription_manager.by_recipient(args.recipient) if args.recipient else self.subscription_manager.list_entries()
+        for repo in repos:
+            recipients = self.subscription_manager.recipients_for(repo)
+            settings = self.subscription_manager.settings_for(repo)
+            details = f" ({', '.join(f'{key}={value}' for key, value in settings.items())})" if settings else ""
+            if repo in self.subscription_manager.expanded:
+                details += f" -> {len(self.subscription_manager.expanded[repo])} repositories"
+            print(f"  - {repo}: {', '.join(recipient or '(default)' for recipient in recipients)}{details}")
 
     def export_daily_progress(self, args):
         self.github_client.export_daily_progress(args.repo)
@@ -3,8 +3,10 @@ import shlex  # 导入shlex库，用于正确解析命令行输入
 from config import Config  # 从config模块导入Config类，用于配置管理
 from github_client import GitHubClient  # 从github_client模块导入GitHubClient类，用于GitHub API操作
 from report_generator import ReportGenerator  # 从report_generator模块导入ReportGenerator类，用于报告生成
+from input_compactor import InputCompactor  # 从input_compactor模块导入InputCompactor类，用于压缩LLM输入
 from llm import LLM  # 从llm模块导入LLM类，可能用于语言模型相关操作
 from subscription_manager import SubscriptionManager  # 从subscription_manager模块导入SubscriptionManager类，管理订阅
+from wildcard_expander import WildcardExpander  # 从wildcard_expander模块导入WildcardExpander类，展开通配订阅
 from command_handler import CommandHandler  # 从command_handler模块导入CommandHandler类，处理命令行命令
 from logger import LOG  # 从logger模块导入LOG对象，用于日志记录
 
@@ -12,8 +14,10 @@ def main():
     config = Config()  # 创建配置实例
     github_client = GitHubClient(config.github_token)  # 创建GitHub客户端实例
     llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
-    subscription_manager = SubscriptionManager(config.subscriptions_file)  # 创建订阅管理器实例
+    compactor = InputCompactor.from_config(config.compaction)  # 创建输入压缩器（未启用时为 None）
+    report_generator = ReportGenerator(llm, config.report_types, compactor)  # 创建报告生成器实例
+    expander = WildcardExpander.from_config(config.wildcards, github_client)  # 创建通配订阅展开器（未启用时为 None）
+    subscription_manager = SubscriptionManager(config.subscriptions_file, expander=expander)  # 创建订阅管理器实例
     command_handler = CommandHandler(github_client, subscription_manager, report_generator)  # 创建命令处理器实例
     
     parser = command_handler.parser  # 获取命令解析器
@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 
@@ -11,13 +12,29 @@ class Config:
             
             self.email = config.get('email', {})
             self.email['password'] = os.getenv('EMAIL_PASSWORD', self.email.get('password', ''))
+            self.outbox = config.get('outbox', {})  # 持久化发件箱配置（后台投递、失败重试）
 
             # 加载 GitHub 相关配置
             github_config = config.get('github', {})
             self.github_token = os.getenv('GITHUB_TOKEN', github_config.get('token'))
             self.subscriptions_file = github_config.get('subscriptions_file')
+            self.subscription_state_file = github_config.get('subscription_state_file')  # 记录各仓库上次报告时间，用于按订阅频率调度
+            self.wildcards = github_config.get('wildcards', {})  # org:/topic: 通配订阅的展开缓存配置
             self.freq_days = github_config.get('progress_frequency_days', 1)
             self.exec_time = github_config.get('progress_execution_time', "08:00")
+            self.compaction = github_config.get('compaction', {})  # 进展 Markdown 的输入压缩规则
+            self.delta_reports = github_config.get('delta_reports', False)  # 是否只总结上次报告之后的新条目
+            self.adaptive_polling = github_config.get('adaptive_polling', {})  # 按仓库活跃度自适应调整获取间隔
+
+            # 加载流水线配置（各阶段工作线程数与队列容量）
+            self.pipeline = config.get('pipeline', {})
+
+            # 加载调度器配置（各任务的 cron 表达式、重叠策略与抖动）
+            self.scheduler = config.get('scheduler', {})
+            self.job_state = config.get('job_state', {})  # 任务检查点与错过运行的补跑配置
+            self.work_queue = config.get('work_queue', {})  # 多进程模式下共享工作队列的配置
+            self.metrics = config.get('metrics', {})  # 指标与健康检查 HTTP 服务的配置
+            self.tracing = config.get('tracing', {})  # 各阶段追踪 span 导出的配置
 
             # 加载 LLM 相关配置
             llm_config = config.get('llm', {})
@@ -25,10 +42,38 @@ class Config:
             self.openai_model_name = llm_config.get('openai_model_name', 'gpt-4o-mini')
             self.ollama_model_name = llm_config.get('ollama_model_name', 'llama3')
             self.ollama_api_url = llm_config.get('ollama_api_url', 'http://localhost:11434/api/chat')
+            self.structured_output = llm_config.get('structured_output', False)  # 是否让 LLM 输出结构化 JSON 报告
             
+            # 加载报告清单配置（输入未变化时复用已有报告）
+            self.report_manifest = config.get('report_manifest', {})
+            self.skip_unchanged_notify = self.report_manifest.get('skip_unchanged_notify', False)
+
+            # 加载 Hacker News 相关配置
+            hacker_news_config = config.get('hacker_news', {})
+            self.hn_incremental_daily = hacker_news_config.get('incremental_daily', False)
+
             # 加载报告类型配置
             self.report_types = config.get('report_types', ["github", "hacker_news"])  # 默认报告类型
             
+            # 加载 Gradio 界面配置（请求队列的并发数与模型实例池大小）
+            self.gradio = config.get('gradio', {})
+
+            # 加载报告 HTTP 接口配置（监听地址、工作线程数、队列容量与结果保留时长）
+            self.api = config.get('api', {})
+
             # 加载 Slack 配置
-            slack_config = config.get('slack', {})
-            self.slack_webhook_url = slack_config.get('webhook_url')
+            self.slack = config.get('slack', {})
+            self.slack_webhook_url = self.slack.get('webhook_url')
+
+
+def optional_feature(from_config):
+    """
+    可选功能的 from_config 装饰器：配置段缺失或未设置 enabled: true 时返回 None（功能未启用），
+    否则按配置段创建实例。与 classmethod 一起使用，写在 classmethod 之下。
+    """
+    @functools.wraps(from_config)
+    def wrapper(cls, section, *args, **kwargs):
+        if not section or not section.get('enabled', False):
+            return None
+        return from_config(cls, section, *args, **kwargs)
+    return wrapper
@@ -1,17 +1,31 @@
-import schedule # 导入 schedule 实现定时任务执行器
-import time  # 导入time库，用于控制时间间隔
+import argparse  # 导入argparse库，用于解析运行角色参数
 import os   # 导入os模块用于文件和目录操作
 import signal  # 导入signal库，用于信号处理
 import sys  # 导入sys库，用于执行系统相关的操作
+import threading  # 导入threading库，用于在后台线程中重新加载配置
+import time  # 导入time库，记录运行开始的时间
 from datetime import datetime  # 导入 datetime 模块用于获取当前日期
 
 from config import Config  # 导入配置管理类
 from github_client import GitHubClient  # 导入GitHub客户端类，处理GitHub API请求
 from hacker_news_client import HackerNewsClient
 from notifier import Notifier  # 导入通知器类，用于发送通知
+from slack_notifier import SlackNotifier  # 导入 Slack 通知渠道
+from notification_channel import NotifierGroup  # 导入多渠道通知组合
+from outbox import Outbox, OutboxWorker  # 导入持久化发件箱及其后台投递线程
 from report_generator import ReportGenerator  # 导入报告生成器类
+from input_compactor import InputCompactor  # 导入输入压缩器
+from report_manifest import ReportManifest  # 导入报告清单
 from llm import LLM  # 导入语言模型类，可能用于生成报告内容
 from subscription_manager import SubscriptionManager  # 导入订阅管理器类，管理GitHub仓库订阅
+from wildcard_expander import WildcardExpander  # 导入通配订阅展开器
+from pipeline import Pipeline, Stage  # 导入流水线，用于并发执行各阶段
+from scheduler import Scheduler, CronTrigger, daily_trigger  # 导入基于截止时间堆的调度器
+from job_state import JobState  # 导入任务状态，用于检查点续跑与错过运行的补跑
+from work_queue import WorkQueue, default_worker_id, run_worker  # 导入共享工作队列，用于多进程分片处理订阅
+from adaptive_polling import AdaptivePolling  # 导入按仓库活跃度的自适应轮询策略
+from metrics import MetricsServer  # 导入指标与健康检查 HTTP 服务
+import tracing  # 导入追踪模块，把各阶段的 span 导出到本地文件
 from logger import LOG  # 导入日志记录器
 
 
@@ -20,19 +34,138 @@ def graceful_shutdown(signum, frame):
     LOG.info("[优雅退出]守护进程接收到终止信号")
     sys.exit(0)  # 安全退出程序
 
-def github_job(subscription_manager, github_client, report_generator, notifier, days):
+def github_stages(subscription_manager, github_client, report_generator, notifier, config, job_state=None, polling=None):
+    """
+    返回处理单个仓库的 获取、生成、通知 三个阶段函数，由流水线或工作进程按顺序调用。
+    """
+    days = config.freq_days
+    started_at = time.time()  # 以本次运行开始的时间记录各仓库的报告时间，运行耗时不会推迟下次到期时间
+
+    def resumable(stage, path_key, *extra_keys):
+        # 续跑时该阶段已完成且产物仍然存在（或条目已经通知完毕），则直接复用检查点中的结果；
+        # 检查点保存产物路径以及 extra_keys 指定的条目字段
+        def wrap(func):
+            def run(item):
+                if job_state and job_state.reached("github", item['repo'], stage):
+                    path = job_state.progress("github", item['repo']).get(path_key)
+                    if job_state.reached("github", item['repo'], "notified") or (path and os.path.exists(path)):
+                        LOG.info(f"[{item['repo']}]已在上次运行中完成 {stage}，跳过")
+                        item.update(job_state.progress("github", item['repo']))
+                        return item
+                item = func(item)
+                if job_state and item is not None:
+                    keys = ((path_key,) if path_key else ()) + extra_keys
+                    job_state.checkpoint("github", item['repo'], stage, **{key: item[key] for key in keys if key in item})
+                return item
+            return run
+        return wrap
+
+    @resumable("fetched", 'markdown_file_path', 'window', 'activity')
+    def fetch(item):
+        # 获取仓库进展并导出为 Markdown 文件；订阅未指定覆盖天数时，启用自适应轮询则覆盖自上次获取以来的天数，
+        # 否则覆盖一个报告周期；活动量在通知成功后才记录，生成或通知失败时下次仍从原来的时间开始获取
+        settings = subscription_manager.settings_for(item['repo'])
+        default_window = settings.get('frequency_days') or days
+        window = settings.get('window_days') or (polling.window_days(item['repo'], default_window) if polling else default_window)
+        item['markdown_file_path'] = github_client.export_progress_by_date_range(item['repo'], window, settings.get('labels'))
+        item['window'], item['activity'] = window, github_client.activity_counts.get(item['repo'], 0)
+        return item
+
+    def finish(item):
+        # 报告已送达（或无需通知）：记录本次报告时间，并提交自适应轮询的获取时间与活动量
+        subscription_manager.mark_run(item['repo'], started_at)  # 按订阅的报告频率计算下次到期时间
+        if polling and 'window' in item:
+            polling.record(item['repo'], item.get('activity', 0), item['window'])
+        return item
+
+    @resumable("summarized", 'report_file_path')
+    def summarize(item):
+        # 从Markdown文件自动生成进展简报；增量模式下只总结上次报告之后的新条目
+        generate = report_generator.generate_github_delta_report if config.delta_reports else report_generator.generate_github_report
+        item['report'], item['report_file_path'] = generate(item['markdown_file_path'], subscription_manager.settings_for(item['repo']).get('model'))
+        return item
+
+    @resumable("notified", None)
+    def notify(item):
+        if config.skip_unchanged_notify and report_generator.is_unchanged(item['report_file_path']):
+            LOG.info(f"[{item['repo']}]进展与上次相同，跳过通知")
+            return finish(item)
+        if 'report' not in item:
+            # 续跑时报告来自检查点，从报告文件中读取内容
+            with open(item['report_file_path'], 'r') as file:
+                item['report'] = file.read()
+        # 报告只生成和渲染一次，再分发给订阅了该仓库的所有收件人
+        structured = report_generator.load_structured(item['report_file_path'])
+        recipients = subscription_manager.recipients_for(item['repo'])
+        if not notifier.notify_github_report(item['repo'], item['report'], structured, recipients):
+            # 投递失败时不记录报告时间与检查点，下次运行（或续跑）重新通知
+            raise RuntimeError(f"{item['repo']} 的报告投递失败")
+        return finish(item)
+
+    return fetch, summarize, notify
+
+
+def github_job(subscription_manager, github_client, report_generator, notifier, config, job_state=None, polling=None):
     LOG.info("[开始执行定时任务]GitHub Repo 项目进展报告")
-    subscriptions = subscription_manager.list_subscriptions()  # 获取当前所有订阅
+    resumed = job_state.begin_run("github") if job_state else False  # 存在未完成的运行时从检查点继续
+    subscription_manager.refresh_wildcards()  # 展开缓存超过 TTL 的通配订阅
+    subscriptions = subscription_manager.due_now()  # 获取按报告频率到期的仓库（按优先级排序，多个收件人订阅同一仓库时只处理一次）
+    if polling and not resumed:
+        subscriptions = polling.due_repos(subscriptions)  # 只处理按活跃度到期的仓库
     LOG.info(f"订阅列表：{subscriptions}")
-    for repo in subscriptions:
-        # 遍历每个订阅的仓库，执行以下操作
-        markdown_file_path = github_client.export_progress_by_date_range(repo, days)
-        # 从Markdown文件自动生成进展简报
-        report, _ = report_generator.generate_github_report(markdown_file_path)
-        notifier.notify_github_report(repo, report)
+    pipeline_config = config.pipeline
+    queue_size = pipeline_config.get('queue_size', 4)
+    fetch, summarize, notify = github_stages(subscription_manager, github_client, report_generator, notifier, config, job_state, polling)
+
+    # 获取、生成、通知三个阶段通过有界队列串联，各自拥有独立的工作线程数
+    pipeline = Pipeline("github_job", [
+        Stage("fetch", fetch, pipeline_config.get('fetch_workers', 2), queue_size),
+        Stage("summarize", summarize, pipeline_config.get('llm_workers', 1), queue_size),
+        Stage("notify", notify, pipeline_config.get('notify_workers', 1), queue_size),
+    ], describe=lambda item: item['repo'])
+    with notifier.session():  # 整个运行期间复用渠道连接，批量模式下结束时合并发送
+        completed = {item['repo'] for item in pipeline.run({'repo': repo} for repo in subscriptions)}
+    failed = [repo for repo in subscriptions if repo not in completed]
+    if failed:
+        LOG.warning(f"以下仓库处理失败，保留检查点以便续跑：{failed}")
+    if job_state:
+        job_state.finish_run("github", keep=failed)
+    LOG.info(f"[定时任务执行完毕]")
+
+
+def publish_github_run(subscription_manager, work_queue, polling=None):
+    """
+    协调模式下的 GitHub 任务：只把本次运行的仓库发布到共享工作队列，由工作进程领取处理。
+    :param polling: 可选的自适应轮询，只发布按活跃度到期的仓库；获取结果由工作进程记录到共享的状态文件。
+    """
+    LOG.info("[开始执行定时任务]发布 GitHub Repo 项目进展任务")
+    run_id = datetime.now().strftime('%Y-%m-%dT%H:%M')
+    subscription_manager.refresh_wildcards()
+    subscriptions = subscription_manager.due_now()
+    if polling:
+        subscriptions = polling.due_repos(subscriptions)
+    work_queue.publish(run_id, subscriptions)
     LOG.info(f"[定时任务执行完毕]")
 
 
+def process_github_repo(stages, notifier, repo, lease=None):
+    """
+    工作进程处理单个仓库：依次执行获取、生成、通知三个阶段。
+    :param lease: 工作队列的任务租约；通知前确认仍持有租约，租约丢失时抛出 LeaseLost，不发送通知。
+    """
+    item = {'repo': repo}
+    fetch, summarize, notify = stages
+    # 每个任务一个通知会话：批量模式下只合并本仓库的报告，避免长时间空闲占用 SMTP 连接
+    with tracing.span("worker.repo", repo=repo), notifier.session():
+        for stage in (fetch, summarize):
+            item = stage(item)
+            if item is None:
+                return
+        if lease is not None:
+            lease.ensure_held()  # 任务可能已被其他工作进程接手，避免重复发送同一份报告
+        notify(item)
+
+
 def hn_topic_job(hacker_news_client, report_generator):
     LOG.info("[开始执行定时任务]Hacker News 热点话题跟踪")
     markdown_file_path = hacker_news_client.export_top_stories()
@@ -47,48 +180,288 @@ def hn_daily_job(hacker_news_client, report_generator, notifier):
     # 生成每日汇总报告的目录路径
     directory_path = os.path.join('hacker_news', date)
     # 生成每日汇总报告并保存
-    report, _ = report_generator.generate_hn_daily_report(directory_path)
-    notifier.notify_hn_report(date, report)
+    report, report_file_path = report_generator.generate_hn_daily_report(directory_path)
+    notifier.notify_hn_report(date, report, report_generator.load_structured(report_file_path))
     LOG.info(f"[定时任务执行完毕]")
 
 
+def catch_up(scheduler, job_state):
+    """
+    启动时续跑未完成的运行，并补跑停机期间错过的计划运行。
+    每个任务最多补跑一次：各任务总是处理最新的数据，多次补跑只会生成重复的报告。
+    """
+    for job in scheduler.jobs():
+        if job_state.has_unfinished_run(job.name):
+            LOG.info(f"[补跑]任务 {job.name} 上次运行未完成，从检查点继续")
+            scheduler.run_now(job.name)
+            continue
+        missed = job_state.missed_runs(job.name, job.trigger)
+        if missed:
+            LOG.info(f"[补跑]任务 {job.name} 在停机期间错过 {len(missed)} 次计划运行，立即补跑一次")
+            scheduler.run_now(job.name)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='GitHubSentinel 守护进程')
+    parser.add_argument('--role', choices=['standalone', 'coordinator', 'worker'], default='standalone',
+                        help='standalone：单进程处理所有订阅；coordinator：按计划发布任务并投递发件箱；worker：从共享工作队列领取仓库处理')
+    parser.add_argument('--worker-id', default=None, help='工作进程标识，默认为 主机名-进程号')
+    return parser.parse_args()
+
+
+class DaemonRuntime:
+    """
+    守护进程的运行时组件集合。定时任务总是通过它取用当前的组件，
+    因此收到 SIGHUP 重新加载配置时，只需重建发生变化的组件和调度项，
+    未变化的组件（LLM 客户端、SMTP 连接、缓存等）保持原样。
+    """
+
+    # 组件 -> 影响它的 Config 属性
+    COMPONENT_KEYS = {
+        'github_client': ('github_token',),
+        'llm': ('llm_model_type', 'openai_model_name', 'ollama_model_name', 'ollama_api_url'),
+        'compactor': ('compaction',),
+        'manifest': ('report_manifest',),
+        'report_generator': ('report_types', 'hn_incremental_daily', 'structured_output'),
+        'outbox': ('outbox',),
+        'notifier': ('email', 'slack'),
+        'subscription_manager': ('subscriptions_file', 'subscription_state_file', 'wildcards'),
+        'job_state': ('job_state',),
+        'polling': ('adaptive_polling',),
+        'work_queue': ('work_queue',),
+    }
+    # 组件 -> 依赖它、需要随之重建的组件
+    DEPENDENTS = {
+        'github_client': ('subscription_manager',),
+        'llm': ('report_generator',),
+        'compactor': ('report_generator',),
+        'manifest': ('report_generator',),
+        'outbox': ('notifier',),
+    }
+    SCHEDULE_KEYS = ('scheduler', 'exec_time', 'freq_days')
+
+    def __init__(self, config, role='standalone'):
+        self.config = config
+        self.role = role
+        self.hacker_news_client = HackerNewsClient()  # 创建 Hacker News 客户端实例
+        self.outbox_worker = None
+        self.scheduler = None
+        self._reload_lock = threading.Lock()
+        for component in self.COMPONENT_KEYS:
+            self._build(component)
+
+    def _build(self, component):
+        config = self.config
+        if component == 'github_client':
+            self.github_client = GitHubClient(config.github_token)  # 创建GitHub客户端实例
+        elif component == 'llm':
+            self.llm = LLM(config)  # 创建语言模型实例
+        elif component == 'compactor':
+            self.compactor = InputCompactor.from_config(config.compaction)  # 创建输入压缩器（未启用时为 None）
+        elif component == 'manifest':
+            self.manifest = ReportManifest.from_config(config.report_manifest)  # 创建报告清单（未启用时为 None）
+        elif component == 'report_generator':
+            self.report_generator = ReportGenerator(
+                self.llm, config.report_types, self.compactor, config.hn_incremental_daily, self.manifest,
+                structured=config.structured_output,
+            )  # 创建报告生成器实例
+        elif component == 'outbox':
+            if self.outbox_worker:
+                self.outbox_worker.stop()
+                self.outbox_worker = None
+            self.outbox = Outbox.from_config(config.outbox)  # 创建持久化发件箱（未启用时为 None）
+        elif component == 'notifier':
+            # 创建邮件与 Slack 通知渠道（Slack 未配置 Webhook 时不启用），组合为统一的通知器
+            slack_notifier = SlackNotifier(config.slack, self.outbox)
+            self.notifier = NotifierGroup([
+                Notifier(config.email, self.outbox), slack_notifier if slack_notifier.is_configured() else None
+            ])
+            self._update_outbox_worker()
+        elif component == 'subscription_manager':
+            expander = WildcardExpander.from_config(config.wildcards, self.github_client)  # 创建通配订阅展开器（未启用时为 None）
+            self.subscription_manager = SubscriptionManager(config.subscriptions_file, config.subscription_state_file,
+                                                            expander=expander)  # 创建订阅管理器实例
+        elif component == 'job_state':
+            self.job_state = JobState.from_config(config.job_state)  # 创建任务状态（检查点与上次运行时间，未启用时为 None）
+        elif component == 'polling':
+            self.polling = AdaptivePolling.from_config(config.adaptive_polling)  # 创建自适应轮询（未启用时为 None）
+        elif component == 'work_queue':
+            self.work_queue = WorkQueue.from_config(config.work_queue) if self.role != 'standalone' else None
+
+    def _update_outbox_worker(self):
+        # 后台投递线程负责发送发件箱中的消息，批量投递时复用各渠道的连接；
+        # 多进程模式下只由协调进程投递，避免多个进程重复发送同一条消息
+        if not self.outbox or self.role == 'worker':
+            return
+        if self.outbox_worker is None:
+            self.outbox_worker = OutboxWorker(
+                self.outbox, self.notifier.senders(),
+                poll_interval=self.config.outbox.get('poll_interval', 5),
+                max_attempts=self.config.outbox.get('max_attempts', 5),
+                base_backoff=self.config.outbox.get('base_backoff', 30),
+            )
+            self.outbox_worker.batch_contexts = self.notifier.batch_contexts()
+            self.outbox_worker.start()
+        else:
+            self.outbox_worker.senders = self.notifier.senders()
+            self.outbox_worker.batch_contexts = self.notifier.batch_contexts()
+
+    # 定时任务：每次运行时取用当前的组件
+    def run_github(self):
+        if self.role == 'coordinator':
+            publish_github_run(self.subscription_manager, self.work_queue, self.polling)
+            self._finish("github")
+        else:
+            github_job(self.subscription_manager, self.github_client, self.report_generator, self.notifier,
+                       self.config, self.job_state, self.polling)
+
+    def run_hn_topic(self):
+        hn_topic_job(self.hacker_news_client, self.report_generator)
+        self._finish("hn_topic")
+
+    def run_hn_daily(self):
+        hn_daily_job(self.hacker_news_client, self.report_generator, self.notifier)
+        self._finish("hn_daily")
+
+    def process_repo(self, repo, lease=None):
+        # 只读取协调进程更新过的展开缓存（不访问 GitHub），通配订阅的收件人与参数才能对应上
+        self.subscription_manager.sync_wildcards()
+        if self.polling:
+            self.polling.sync()  # 仓库可能上次由其它工作进程处理，获取窗口从那次获取开始计算
+        stages = github_stages(self.subscription_manager, self.github_client, self.report_generator, self.notifier,
+                               self.config, polling=self.polling)
+        process_github_repo(stages, self.notifier, repo, lease)
+
+    def _finish(self, name):
+        # 没有条目级检查点的任务，完成后只记录运行时间，用于发现错过的计划运行
+        if self.job_state:
+            self.job_state.finish_run(name)
+
+    def job_specs(self):
+        """
+        返回各定时任务的 名称 -> (任务函数, 默认触发器, 调度配置)，调度配置用于比较重新加载前后是否变化。
+        """
+        config = self.config
+        return {
+            # GitHub 任务默认每 freq_days 天在 exec_time 执行；协调模式下只发布任务，由工作进程处理
+            "github": (self.run_github, lambda: daily_trigger(config.exec_time, config.freq_days),
+                       (config.exec_time, config.freq_days)),
+            # hn_topic_job 每4小时执行一次，从0点开始
+            "hn_topic": (self.run_hn_topic, lambda: CronTrigger("0 */4 * * *"), ()),
+            # hn_daily_job 每天早上10点执行一次
+            "hn_daily": (self.run_hn_daily, lambda: CronTrigger("0 10 * * *"), ()),
+        }
+
+    def schedule_jobs(self, scheduler, names=None):
+        """
+        把定时任务（或 names 指定的部分任务）加入调度器，同名任务会被替换。
+        """
+        self.scheduler = scheduler
+        scheduler_config = self.config.scheduler
+        for name, (func, default_trigger, _) in self.job_specs().items():
+            if names is not None and name not in names:
+                continue
+            job_config = scheduler_config.get('jobs', {}).get(name, {})
+            trigger = CronTrigger(job_config['cron']) if job_config.get('cron') else default_trigger()
+            scheduler.add_job(name, func, trigger, (), job_config.get('overlap', 'skip'),
+                              job_config.get('jitter', scheduler_config.get('jitter', 0)))
+
+    def _schedule_signature(self, name):
+        scheduler_config = self.config.scheduler
+        return (scheduler_config.get('jobs', {}).get(name), scheduler_config.get('jitter', 0), self.job_specs()[name][2])
+
+    def reload(self):
+        """
+        重新读取 config.json 与订阅文件，与当前状态比较后只重建受影响的组件和调度项。
+        """
+        with self._reload_lock:
+            LOG.info("[重新加载]开始重新加载配置")
+            try:
+                new_config = Config()
+            except Exception as e:
+                LOG.error(f"[重新加载]配置读取失败，继续使用当前配置：{str(e)}")
+                return
+            old_config, old_signatures = self.config, {name: self._schedule_signature(name) for name in self.job_specs()}
+            changed = {key for key in set(vars(old_config)) | set(vars(new_config))
+                       if getattr(old_config, key, None) != getattr(new_config, key, None)}
+            self.config = new_config
+
+            affected = [component for component, keys in self.COMPONENT_KEYS.items() if changed.intersection(keys)]
+            for component in list(affected):
+                for dependent in self.DEPENDENTS.get(component, ()):
+                    if dependent not in affected:
+                        affected.append(dependent)
+            # 按构建顺序重建，保证依赖的组件先于使用它的组件重建
+            for component in self.COMPONENT_KEYS:
+                if component in affected:
+                    LOG.info(f"[重新加载]重建组件 {component}")
+                    self._build(component)
+
+            if 'subscription_manager' not in affected:
+                self._reload_subscriptions()
+            if 'tracing' in changed:
+                tracing.configure_from_config(new_config.tracing)
+
+            if self.scheduler is not None:
+                rescheduled = [name for name in self.job_specs() if self._schedule_signature(name) != old_signatures[name]]
+                if rescheduled:
+                    LOG.info(f"[重新加载]更新调度项：{rescheduled}")
+                    self.schedule_jobs(self.scheduler, rescheduled)
+            LOG.info(f"[重新加载]完成，变化的配置项：{sorted(changed) or '无'}")
+
+    def _reload_subscriptions(self):
+        old_repos = set(self.subscription_manager.list_repos())
+        try:
+            self.subscription_manager.reload()
+        except (OSError, ValueError) as e:
+            LOG.error(f"[重新加载]订阅文件读取失败，继续使用当前订阅：{str(e)}")
+            return
+        new_repos = set(self.subscription_manager.list_repos())
+        if old_repos != new_repos:
+            LOG.info(f"[重新加载]订阅变化：新增 {sorted(new_repos - old_repos)}，移除 {sorted(old_repos - new_repos)}")
+
+
 def main():
+    args = parse_args()
     # 设置信号处理器
     signal.signal(signal.SIGTERM, graceful_shutdown)
 
-    config = Config()  # 创建配置实例
-    github_client = GitHubClient(config.github_token)  # 创建GitHub客户端实例
-    hacker_news_client = HackerNewsClient() # 创建 Hacker News 客户端实例
-    notifier = Notifier(config.email)  # 创建通知器实例
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
-    subscription_manager = SubscriptionManager(config.subscriptions_file)  # 创建订阅管理器实例
+    runtime = DaemonRuntime(Config(), args.role)
+    tracing.configure_from_config(runtime.config.tracing)
+    # 收到 SIGHUP 时在后台线程中重新加载配置，不打断正在运行的任务
+    signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(target=runtime.reload, name="config-reload").start())
+
+    if args.role == 'worker':
+        # 工作进程只处理共享工作队列中的仓库，不运行调度器
+        metrics_server = MetricsServer.from_config(runtime.config.metrics)
+        if metrics_server:
+            metrics_server.start()
+        run_worker(runtime.work_queue, args.worker_id or default_worker_id(), runtime.process_repo,
+                   runtime.config.work_queue.get('poll_interval', 10))
+        return
 
     # 启动时立即执行（如不需要可注释）
-    # github_job(subscription_manager, github_client, report_generator, notifier, config.freq_days)
-    hn_daily_job(hacker_news_client, report_generator, notifier)
+    # runtime.run_github()
+    runtime.run_hn_daily()
 
-    # 安排 GitHub 的定时任务
-    schedule.every(config.freq_days).days.at(
-        config.exec_time
-    ).do(github_job, subscription_manager, github_client, report_generator, notifier, config.freq_days)
-    
-    # 安排 hn_topic_job 每4小时执行一次，从0点开始
-    schedule.every(4).hours.at(":00").do(hn_topic_job, hacker_news_client, report_generator)
+    # 各任务由截止时间堆调度器按时触发，在独立的工作线程中运行，互不推迟
+    scheduler = Scheduler()
+    runtime.schedule_jobs(scheduler)
+    # 可选的指标服务：/metrics 输出 Prometheus 指标，/healthz 反映调度器是否存活
+    metrics_server = MetricsServer.from_config(runtime.config.metrics, scheduler.health)
+    if metrics_server:
+        metrics_server.start()
 
-    # 安排 hn_daily_job 每天早上10点执行一次
-    schedule.every().day.at("10:00").do(hn_daily_job, hacker_news_client, report_generator, notifier)
+    if runtime.job_state:
+        catch_up(scheduler, runtime.job_state)
 
     try:
-        # 在守护进程中持续运行
-        while True:
-            schedule.run_pending()
-            time.sleep(1)  # 短暂休眠以减少 CPU 使用
+        # 在守护进程中持续运行，调度线程只在最近的截止时间到达时醒来
+        scheduler.run_forever()
     except Exception as e:
         LOG.error(f"主进程发生异常: {str(e)}")
         sys.exit(1)
 
 
-
 if __name__ == '__main__':
     main()
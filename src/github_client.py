@@ -4,17 +4,20 @@ import requests  # 导入requests库用于HTTP请求
 from datetime import datetime, date, timedelta  # 导入日期处理模块
 import os  # 导入os模块用于文件和目录操作
 from logger import LOG  # 导入日志模块
+import metrics  # 导入指标模块，记录 API 请求次数与剩余的速率限制配额
+import tracing  # 导入追踪模块，记录每次请求与导出的 span
 
 class GitHubClient:
     def __init__(self, token):
         self.token = token  # GitHub API令牌
         self.headers = {'Authorization': f'token {self.token}'}  # 设置HTTP头部认证信息
+        self.activity_counts = {}  # 仓库 -> 最近一次导出时获取到的活动条数（提交、问题与拉取请求之和）
 
-    def fetch_updates(self, repo, since=None, until=None):
-        # 获取指定仓库的更新，可以指定开始和结束日期
+    def fetch_updates(self, repo, since=None, until=None, labels=None):
+        # 获取指定仓库的更新，可以指定开始和结束日期，以及只统计带有指定标签的问题
         updates = {
             'commits': self.fetch_commits(repo, since, until),  # 获取提交记录
-            'issues': self.fetch_issues(repo, since, until),  # 获取问题
+            'issues': self.fetch_issues(repo, since, until, labels),  # 获取问题
             'pull_requests': self.fetch_pull_requests(repo, since, until)  # 获取拉取请求
         }
         return updates
@@ -29,7 +32,9 @@ class GitHubClient:
             params['until'] = until  # 如果指定了结束日期，添加到参数中
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            with tracing.span("github.request", endpoint="commits", repo=repo) as request_span:
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                self._record_response("commits", response, request_span)
             response.raise_for_status()  # 检查请求是否成功
             return response.json()  # 返回JSON格式的数据
         except Exception as e:
@@ -37,12 +42,16 @@ class GitHubClient:
             LOG.error(f"响应详情：{response.text if 'response' in locals() else '无响应数据可用'}")
             return []  # Handle failure case
 
-    def fetch_issues(self, repo, since=None, until=None):
+    def fetch_issues(self, repo, since=None, until=None, labels=None):
         LOG.debug(f"准备获取 {repo} 的 Issues。")
         url = f'https://api.github.com/repos/{repo}/issues'  # 构建获取问题的API URL
         params = {'state': 'closed', 'since': since, 'until': until}
+        if labels:
+            params['labels'] = ','.join(labels)  # GitHub 只返回同时带有这些标签的问题
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            with tracing.span("github.request", endpoint="issues", repo=repo) as request_span:
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                self._record_response("issues", response, request_span)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -55,7 +64,9 @@ class GitHubClient:
         url = f'https://api.github.com/repos/{repo}/pulls'  # 构建获取拉取请求的API URL
         params = {'state': 'closed', 'since': since, 'until': until}
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            with tracing.span("github.request", endpoint="pulls", repo=repo) as request_span:
+                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                self._record_response("pulls", response, request_span)
             response.raise_for_status()  # 确保成功响应
             return response.json()
         except Exception as e:
@@ -63,6 +74,61 @@ class GitHubClient:
             LOG.error(f"响应详情：{response.text if 'response' in locals() else '无响应数据可用'}")
             return []
 
+    def list_org_repos(self, org, pushed_since=None, limit=None):
+        """
+        列出组织的仓库（不是组织时按用户查询），按最近推送时间倒序。
+        :param pushed_since: ISO 格式时间，遇到更早推送的仓库即停止翻页。
+        :param limit: 最多返回的仓库数。
+        """
+        LOG.debug(f"准备获取 {org} 的仓库列表")
+        params = {'sort': 'pushed', 'direction': 'desc'}
+        stop = (lambda repo: (repo.get('pushed_at') or '') < pushed_since) if pushed_since else None
+        try:
+            return self._get_pages("org_repos", f'https://api.github.com/orgs/{org}/repos', params, limit, stop=stop)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            return self._get_pages("user_repos", f'https://api.github.com/users/{org}/repos', params, limit, stop=stop)
+
+    def search_repos(self, query, limit=None):
+        """
+        按搜索条件（例如 topic:llm archived:false）查找仓库，按最近更新时间倒序。
+        """
+        LOG.debug(f"准备搜索仓库：{query}")
+        params = {'q': query, 'sort': 'updated', 'order': 'desc'}
+        return self._get_pages("search_repos", 'https://api.github.com/search/repositories', params, limit, items_key='items')
+
+    def _get_pages(self, endpoint, url, params, limit=None, items_key=None, stop=None):
+        # 逐页获取列表结果，直到最后一页、达到 limit 或 stop(条目) 为真；请求失败时抛出异常
+        results = []
+        page = 1
+        while True:
+            with tracing.span("github.request", endpoint=endpoint, page=page) as request_span:
+                response = requests.get(url, headers=self.headers, params={**params, 'per_page': 100, 'page': page}, timeout=10)
+                self._record_response(endpoint, response, request_span)
+            response.raise_for_status()
+            data = response.json()
+            items = data.get(items_key, []) if items_key else data
+            for item in items:
+                if stop and stop(item):
+                    return results
+                results.append(item)
+                if limit and len(results) >= limit:
+                    return results
+            if len(items) < 100:
+                return results
+            page += 1
+
+    def _record_response(self, endpoint, response, request_span):
+        # 记录请求结果与响应头中剩余的速率限制配额
+        metrics.GITHUB_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+        request_span.set("status", response.status_code)
+        if isinstance(response.content, bytes):
+            request_span.set("bytes", len(response.content))
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if isinstance(remaining, str) and remaining.isdigit():
+            metrics.GITHUB_RATE_LIMIT_REMAINING.set(int(remaining))
+
     def export_daily_progress(self, repo):
         LOG.debug(f"[准备导出项目进度]：{repo}")
         today = datetime.now().date().isoformat()  # 获取今天的日期
@@ -81,11 +147,14 @@ class GitHubClient:
         LOG.info(f"[{repo}]项目每日进展文件生成： {file_path}")  # 记录日志
         return file_path
 
-    def export_progress_by_date_range(self, repo, days):
+    @tracing.traced("github.export")
+    def export_progress_by_date_range(self, repo, days, labels=None):
         today = date.today()  # 获取当前日期
         since = today - timedelta(days=days)  # 计算开始日期
         
-        updates = self.fetch_updates(repo, since=since.isoformat(), until=today.isoformat())  # 获取指定日期范围内的更新
+        updates = self.fetch_updates(repo, since=since.isoformat(), until=today.isoformat(), labels=labels)  # 获取指定日期范围内的更新
+        self.activity_counts[repo] = sum(len(items) for items in updates.values())  # 记录活动条数，供自适应轮询使用
+        tracing.annotate(repo=repo, days=days, items=self.activity_counts[repo])
         
         repo_dir = os.path.join('daily_progress', repo.replace("/", "_"))  # 构建目录路径
         os.makedirs(repo_dir, exist_ok=True)  # 确保目录存在
@@ -1,29 +1,32 @@
 import gradio as gr  # 导入gradio库用于创建GUI
+from datetime import datetime  # 导入datetime，用于显示报告的生成时间
 
 from config import Config  # 导入配置管理模块
 from github_client import GitHubClient  # 导入用于GitHub API操作的客户端
 from hacker_news_client import HackerNewsClient
-from report_generator import ReportGenerator  # 导入报告生成器模块
-from llm import LLM  # 导入可能用于处理语言模型的LLM类
+from input_compactor import InputCompactor  # 导入输入压缩器
+from llm_pool import LLMPool  # 导入按模型复用 LLM 与报告生成器的实例池
+from report_store import ReportStore, BackgroundRefresher  # 导入已保存报告的查找与后台刷新
+from report_dashboard import stream_dashboard  # 导入多仓库看板的并发生成与进度输出
 from subscription_manager import SubscriptionManager  # 导入订阅管理器
+from wildcard_expander import WildcardExpander  # 导入通配订阅展开器
 from logger import LOG  # 导入日志记录器
 
 # 创建各个组件的实例
 config = Config()
 github_client = GitHubClient(config.github_token)
 hacker_news_client = HackerNewsClient() # 创建 Hacker News 客户端实例
-subscription_manager = SubscriptionManager(config.subscriptions_file)
-
-def generate_github_report(model_type, model_name, repo, days):
-    config.llm_model_type = model_type
-
-    if model_type == "openai":
-        config.openai_model_name = model_name
-    else:
-        config.ollama_model_name = model_name
-
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
+# 通配订阅只使用缓存中的展开结果，由守护进程按 TTL 刷新
+subscription_manager = SubscriptionManager(config.subscriptions_file, expander=WildcardExpander.from_config(config.wildcards, github_client))
+compactor = InputCompactor.from_config(config.compaction)  # 输入压缩器（未启用时为 None）
+# 按所选模型复用 LLM 与报告生成器，请求之间不修改共享的 config
+llm_pool = LLMPool(config, compactor, config.gradio.get('llm_pool_size', 8))
+# 已保存的报告先返回给页面，过期时在后台重新生成
+report_store = ReportStore(max_age_minutes=config.gradio.get('report_max_age_minutes', 60))
+refresher = BackgroundRefresher(config.gradio.get('refresh_workers', 4))  # 单个报告与多仓库看板共用的有界线程池
+
+def refresh_github_report(model_type, model_name, repo, days):
+    report_generator = llm_pool.get(model_type, model_name)  # 获取所选模型的报告生成器
 
     # 定义一个函数，用于导出和生成指定时间范围内项目的进展报告
     raw_file_path = github_client.export_progress_by_date_range(repo, days)  # 导出原始数据文件路径
@@ -31,16 +34,41 @@ def generate_github_report(model_type, model_name, repo, days):
 
     return report, report_file_path  # 返回报告内容和报告文件路径
 
-def generate_hn_hour_topic(model_type, model_name):
-    config.llm_model_type = model_type
-
-    if model_type == "openai":
-        config.openai_model_name = model_name
-    else:
-        config.ollama_model_name = model_name
+def generate_github_report(model_type, model_name, repo, days):
+    """
+    先返回所选模型已保存的最新报告；报告不存在或已过期时在后台重新生成，完成后把新报告推送到页面。
+    同一仓库、同一时间窗口、同一模型同时只有一次生成，多个用户的请求共用结果。
+    """
+    days = int(days)
+    stored = report_store.latest(repo, days, model_type, model_name)
+    if stored is not None:
+        generated_at = datetime.fromtimestamp(stored.generated_at).strftime('%Y-%m-%d %H:%M')
+        if report_store.is_fresh(stored):
+            yield stored.read(), stored.path
+            return
+        yield f"> 以下是 {generated_at} 生成的报告，正在后台生成最新报告……\n\n{stored.read()}", stored.path
+
+    future = refresher.submit((repo, days, model_type, model_name), refresh_github_report, model_type, model_name, repo, days)
+    try:
+        yield future.result()
+    except Exception as e:
+        LOG.error(f"[{repo}]生成报告失败：{str(e)}")
+        if stored is None:
+            raise gr.Error(f"生成报告失败：{str(e)}")
+        gr.Warning(f"生成最新报告失败，显示的是 {generated_at} 的报告")
+
+def generate_dashboard(model_type, model_name, repos, all_subscriptions, days):
+    """
+    并发生成多个仓库的报告，每完成一个仓库就把进度表与已完成的报告推送到页面。
+    """
+    days = int(days)
+    repos = subscription_manager.list_repos() if all_subscriptions else list(repos or [])
+    if not repos:
+        raise gr.Error("请选择至少一个仓库，或勾选全部订阅")
+    yield from stream_dashboard(repos, days, model_type, model_name, report_store, refresher, refresh_github_report)
 
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
+def generate_hn_hour_topic(model_type, model_name):
+    report_generator = llm_pool.get(model_type, model_name)  # 获取所选模型的报告生成器
 
     markdown_file_path = hacker_news_client.export_top_stories()
     report, report_file_path = report_generator.generate_hn_topic_report(markdown_file_path)
@@ -69,7 +97,7 @@ with gr.Blocks(title="GitHubSentinel") as demo:
         model_name = gr.Dropdown(choices=["gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo"], label="选择模型")
 
         # 创建订阅列表的 Dropdown 组件
-        subscription_list = gr.Dropdown(subscription_manager.list_subscriptions(), label="订阅列表", info="已订阅GitHub项目")
+        subscription_list = gr.Dropdown(subscription_manager.list_repos(), label="订阅列表", info="已订阅GitHub项目")
 
         # 创建 Slider 组件
         days = gr.Slider(value=2, minimum=1, maximum=7, step=1, label="报告周期", info="生成项目过去一段时间进展，单位：天")
@@ -87,6 +115,38 @@ with gr.Blocks(title="GitHubSentinel") as demo:
         # 将按钮点击事件与导出函数绑定
         button.click(generate_github_report, inputs=[model_type, model_name, subscription_list, days], outputs=[markdown_output, file_output])
 
+    # 创建多仓库报告看板 Tab
+    with gr.Tab("多仓库报告看板"):
+        gr.Markdown("## 多仓库报告看板")  # 添加小标题
+
+        # 创建 Radio 组件
+        model_type = gr.Radio(["openai", "ollama"], label="模型类型", info="使用 OpenAI GPT API 或 Ollama 私有化模型服务")
+
+        # 创建 Dropdown 组件
+        model_name = gr.Dropdown(choices=["gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo"], label="选择模型")
+
+        # 创建可多选的订阅列表，以及选择全部订阅的 Checkbox 组件
+        repo_list = gr.Dropdown(subscription_manager.list_repos(), multiselect=True, label="订阅列表", info="选择要生成报告的GitHub项目")
+        all_subscriptions = gr.Checkbox(label="全部订阅", info="忽略上面的选择，为所有订阅的项目生成报告")
+
+        # 创建 Slider 组件
+        days = gr.Slider(value=2, minimum=1, maximum=7, step=1, label="报告周期", info="生成项目过去一段时间进展，单位：天")
+
+        # 使用 radio 组件的值来更新 dropdown 组件的选项
+        model_type.change(fn=update_model_list, inputs=model_type, outputs=model_name)
+
+        # 创建按钮来生成报告
+        button = gr.Button("批量生成报告")
+
+        # 设置输出组件：进度表、已完成的报告与下载文件
+        progress_output = gr.Markdown()
+        markdown_output = gr.Markdown()
+        file_output = gr.File(label="下载报告", file_count="multiple")
+
+        # 将按钮点击事件与看板函数绑定，每完成一个仓库就更新一次页面
+        button.click(generate_dashboard, inputs=[model_type, model_name, repo_list, all_subscriptions, days],
+                     outputs=[progress_output, markdown_output, file_output])
+
     # 创建 Hacker News 热点话题 Tab
     with gr.Tab("Hacker News 热点话题"):
         gr.Markdown("## Hacker News 热点话题")  # 添加小标题
@@ -112,6 +172,10 @@ with gr.Blocks(title="GitHubSentinel") as demo:
 
 
 
+# 请求进入队列，最多同时处理 concurrency_limit 个，避免多个用户同时生成报告时压垮模型服务
+demo.queue(default_concurrency_limit=config.gradio.get('concurrency_limit', 2),
+           max_size=config.gradio.get('max_queue_size', 32))
+
 if __name__ == "__main__":
     demo.launch(share=True, server_name="0.0.0.0")  # 启动界面并设置为公共可访问
     # 可选带有用户认证的启动方式
@@ -1,19 +1,21 @@
 import requests  # 导入requests库用于HTTP请求
-from bs4 import BeautifulSoup  # 导入BeautifulSoup库用于解析HTML内容
 from datetime import datetime  # 导入datetime模块用于获取日期和时间
 import os  # 导入os模块用于文件和目录操作
 from logger import LOG  # 导入日志模块
+import tracing  # 导入追踪模块，记录获取与导出的 span
 
 class HackerNewsClient:
     def __init__(self):
         self.url = 'https://news.ycombinator.com/'  # Hacker News的URL
 
+    @tracing.traced("hn.fetch")
     def fetch_top_stories(self):
         LOG.debug("准备获取Hacker News的热门新闻。")
         try:
             response = requests.get(self.url, timeout=10)
             response.raise_for_status()  # 检查请求是否成功
             top_stories = self.parse_stories(response.text)  # 解析新闻数据
+            tracing.annotate(bytes=len(response.text), items=len(top_stories))
             return top_stories
         except Exception as e:
             LOG.error(f"获取Hacker News的热门新闻失败：{str(e)}")
@@ -21,6 +23,7 @@ class HackerNewsClient:
 
     def parse_stories(self, html_content):
         LOG.debug("解析Hacker News的HTML内容。")
+        from bs4 import BeautifulSoup  # 首次解析时才导入BeautifulSoup库，加快启动
         soup = BeautifulSoup(html_content, 'html.parser')
         stories = soup.find_all('tr', class_='athing')  # 查找所有包含新闻的<tr>标签
         
@@ -35,6 +38,7 @@ class HackerNewsClient:
         LOG.info(f"成功解析 {len(top_stories)} 条Hacker News新闻。")
         return top_stories
 
+    @tracing.traced("hn.export")
     def export_top_stories(self, date=None, hour=None):
         LOG.debug("准备导出Hacker News的热门新闻。")
         top_stories = self.fetch_top_stories()  # 获取新闻数据
@@ -0,0 +1,168 @@
+import re
+from difflib import SequenceMatcher
+from logger import LOG  # 导入日志模块
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+# 默认过滤规则：依赖机器人（dependabot / renovate）与杂务类提交的标题
+DEFAULT_EXCLUDE_PATTERNS = [
+    r"^(build\()?(deps|deps-dev)\)?:?\s*bump\b",
+    r"^bump\s+\S+\s+from\s+\S+\s+to\s+\S+",
+    r"^(chore\(deps\)|fix\(deps\)):\s*update\b",
+    r"^update\s+(dependency|module)\s+\S+\s+to\s+v?\S+",
+    r"^(chore|ci|style)(\([^)]*\))?!?:",
+    r"^\[bot\]",
+]
+
+# 约定式提交（Conventional Commits）前缀，用于分组
+CONVENTIONAL_PREFIX = re.compile(r"^(?P<type>[a-z]+)(\((?P<scope>[^)]*)\))?!?:\s*(?P<subject>.+)$", re.IGNORECASE)
+
+# 形如 "- 标题 #123" 的条目行
+ITEM_LINE = re.compile(r"^\s*-\s+(?P<title>.*?)\s+#(?P<number>\d+)\s*$")
+
+
+class InputCompactor:
+    """
+    在构建 LLM 提示之前，对 GitHub 进展 Markdown 做确定性的压缩：
+    按规则过滤、合并近似重复标题，并按约定式提交前缀分组。
+    """
+
+    def __init__(self, exclude_patterns=None, similarity_threshold=0.85, group_by_prefix=True):
+        """
+        :param exclude_patterns: 需要过滤掉的标题正则列表（不区分大小写），为 None 时使用默认规则。
+        :param similarity_threshold: 判定两个标题近似重复的相似度阈值（0~1）。
+        :param group_by_prefix: 是否按约定式提交前缀分组输出。
+        """
+        patterns = DEFAULT_EXCLUDE_PATTERNS if exclude_patterns is None else exclude_patterns
+        self.exclude_patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        self.similarity_threshold = similarity_threshold
+        self.group_by_prefix = group_by_prefix
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, compaction_config):
+        return cls(
+            exclude_patterns=compaction_config.get('exclude_patterns'),
+            similarity_threshold=compaction_config.get('similarity_threshold', 0.85),
+            group_by_prefix=compaction_config.get('group_by_prefix', True),
+        )
+
+    def compact(self, markdown_content):
+        """
+        压缩 Markdown 内容。
+
+        :param markdown_content: GitHubClient 导出的进展 Markdown。
+        :return: (压缩后的 Markdown, 统计信息字典)
+        """
+        output_lines = []
+        section_items = []
+        stats = {'items_in': 0, 'filtered': 0, 'collapsed': 0, 'items_out': 0}
+
+        for line in markdown_content.splitlines():
+            match = ITEM_LINE.match(line)
+            if match:
+                section_items.append((match.group('title').strip(), match.group('number')))
+                continue
+            # 遇到非条目行时，先把当前段落积累的条目输出
+            if section_items:
+                output_lines.extend(self._compact_items(section_items, stats))
+                section_items = []
+            output_lines.append(line)
+
+        if section_items:
+            output_lines.extend(self._compact_items(section_items, stats))
+
+        compacted = "\n".join(output_lines)
+        if markdown_content.endswith("\n"):
+            compacted += "\n"
+
+        stats['tokens_in'] = estimate_tokens(markdown_content)
+        stats['tokens_out'] = estimate_tokens(compacted)
+        stats['tokens_saved'] = stats['tokens_in'] - stats['tokens_out']
+        return compacted, stats
+
+    def _compact_items(self, items, stats):
+        stats['items_in'] += len(items)
+        kept = [(title, number) for title, number in items if not self._is_excluded(title)]
+        stats['filtered'] += len(items) - len(kept)
+
+        clusters = self._collapse_duplicates(kept)
+        stats['collapsed'] += len(kept) - len(clusters)
+        stats['items_out'] += len(clusters)
+
+        if not self.group_by_prefix:
+            return [self._format_cluster(cluster) for cluster in clusters]
+
+        # 按前缀分组，组的顺序按首次出现的顺序，保证输出稳定
+        groups = {}
+        for cluster in clusters:
+            groups.setdefault(self._prefix_of(cluster[0][0]), []).append(cluster)
+
+        lines = []
+        for prefix, group in groups.items():
+            lines.append(f"### {prefix}")
+            lines.extend(self._format_cluster(cluster) for cluster in group)
+        return lines
+
+    def _is_excluded(self, title):
+        return any(pattern.search(title) for pattern in self.exclude_patterns)
+
+    def _collapse_duplicates(self, items):
+        """
+        把近似重复的标题合并成一个簇。先按归一化标题精确分桶，再与已有簇的代表标题做相似度比较。
+        """
+        clusters = []
+        by_key = {}
+        for title, number in items:
+            key = _normalize_title(title)
+            if key in by_key:
+                by_key[key].append((title, number))
+                continue
+            for cluster in clusters:
+                representative = _normalize_title(cluster[0][0])
+                if SequenceMatcher(None, key, representative).ratio() >= self.similarity_threshold:
+                    cluster.append((title, number))
+                    by_key[key] = cluster
+                    break
+            else:
+                cluster = [(title, number)]
+                clusters.append(cluster)
+                by_key[key] = cluster
+        return clusters
+
+    def _prefix_of(self, title):
+        match = CONVENTIONAL_PREFIX.match(title)
+        return match.group('type').lower() if match else "other"
+
+    def _format_cluster(self, cluster):
+        title, number = cluster[0]
+        if len(cluster) == 1:
+            return f"- {title} #{number}"
+        others = ", ".join(f"#{n}" for _, n in cluster[1:])
+        return f"- {title} #{number} (+{len(cluster) - 1} similar: {others})"
+
+
+def _normalize_title(title):
+    # 统一大小写，去掉版本号、数字与标点，便于判断近似重复
+    title = title.lower()
+    title = re.sub(r"\bv?\d+(\.\d+)*\b", "", title)
+    title = re.sub(r"[^\w\s]", " ", title)
+    return " ".join(title.split())
+
+
+def estimate_tokens(text):
+    """
+    粗略估算 token 数（约 4 个字符 1 个 token），仅用于比较压缩前后的节省量。
+    """
+    return (len(text) + 3) // 4
+
+
+def log_savings(repo, stats):
+    """
+    记录单个仓库的压缩效果。
+    """
+    saved_ratio = stats['tokens_saved'] / stats['tokens_in'] * 100 if stats['tokens_in'] else 0
+    LOG.info(
+        f"[{repo}]输入压缩：条目 {stats['items_in']} → {stats['items_out']}"
+        f"（过滤 {stats['filtered']}，合并 {stats['collapsed']}），"
+        f"tokens {stats['tokens_in']} → {stats['tokens_out']}（节省 {saved_ratio:.1f}%）"
+    )
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from logger import LOG  # 导入日志模块
+from state_file import atomic_write_json, file_lock  # 导入状态文件的原子写入与进程间文件锁
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+# 单个条目（例如一个仓库）在一次运行中依次经过的阶段
+STAGES = ("fetched", "summarized", "notified")
+
+
+class JobState:
+    """
+    守护进程任务的持久化状态：记录每个任务最近一次完成的时间，以及进行中的运行里
+    每个条目已完成的阶段。进程重启后可以从检查点继续未完成的运行，并发现停机期间错过的计划运行。
+    """
+
+    def __init__(self, state_file, resume_max_age_hours=24, catch_up_max_age_hours=24):
+        """
+        :param state_file: 状态文件路径。
+        :param resume_max_age_hours: 未完成的运行超过该时长后不再续跑，而是重新开始。
+        :param catch_up_max_age_hours: 只补跑该时长以内错过的计划运行。
+        """
+        self.state_file = state_file
+        self.resume_max_age = resume_max_age_hours * 3600
+        self.catch_up_max_age = catch_up_max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._jobs = set()  # 本进程开始或结束过运行的任务，它们的检查点以本进程为准
+        self.state = self._load()  # {'last_runs': {job: ts}, 'runs': {job: {...}}}
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, job_state_config):
+        return cls(
+            job_state_config.get('path', 'data/job_state.json'),
+            job_state_config.get('resume_max_age_hours', 24),
+            job_state_config.get('catch_up_max_age_hours', 24),
+        )
+
+    def begin_run(self, job):
+        """
+        开始一次运行：存在未过期的未完成运行时继续它，否则新建一次运行。
+        :return: 是否为续跑
+        """
+        now = time.time()
+        with self._lock:
+            self._jobs.add(job)
+            run = self.state['runs'].get(job)
+            if run and now - run['started_at'] <= self.resume_max_age:
+                done = sum(1 for item in run['items'].values() if item.get('stage') == STAGES[-1])
+                LOG.info(f"[{job}]继续上次未完成的运行（已完成 {done}/{len(run['items'])} 个条目）")
+                return True
+            self.state['runs'][job] = {'started_at': now, 'items': {}}
+            self._save()
+            return False
+
+    def has_unfinished_run(self, job):
+        with self._lock:
+            run = self.state['runs'].get(job)
+            return bool(run) and time.time() - run['started_at'] <= self.resume_max_age
+
+    def progress(self, job, key):
+        """
+        返回条目在当前运行中的检查点，例如 {'stage': 'summarized', 'report_file_path': ...}；没有时返回空字典。
+        """
+        with self._lock:
+            run = self.state['runs'].get(job)
+            return dict(run['items'].get(key, {})) if run else {}
+
+    def reached(self, job, key, stage):
+        """
+        判断条目在当前运行中是否已完成指定阶段。
+        """
+        current = self.progress(job, key).get('stage')
+        return current is not None and STAGES.index(current) >= STAGES.index(stage)
+
+    def checkpoint(self, job, key, stage, **data):
+        """
+        记录条目完成了某个阶段，data 为续跑时需要的中间结果（例如文件路径），并立即持久化。
+        """
+        with self._lock:
+            run = self.state['runs'].get(job)
+            if run is None:
+                return
+            item = run['items'].setdefault(key, {})
+            item.update(data)
+            item['stage'] = stage
+            self._save()
+
+    def finish_run(self, job, finished_at=None, keep=()):
+        """
+        结束当前运行，清除检查点并记录完成时间（没有条目级检查点的任务也用它记录完成）。
+        :param keep: 本次处理失败的条目：保留它们的检查点，运行仍视为未完成，
+                     重启或下次运行时从这些条目已完成的阶段继续，已成功的条目不会被跳过或重复处理。
+        """
+        with self._lock:
+            self._jobs.add(job)
+            run = self.state['runs'].pop(job, None)
+            if run and keep:
+                run['items'] = {key: item for key, item in run['items'].items() if key in keep}
+                for key in keep:
+                    run['items'].setdefault(key, {})
+                self.state['runs'][job] = run
+            self.state['last_runs'][job] = finished_at or time.time()
+            self._save()
+
+    def last_run(self, job):
+        with self._lock:
+            return self.state['last_runs'].get(job)
+
+    def missed_runs(self, job, trigger, now=None):
+        """
+        返回自上次完成以来、在补跑窗口内错过的计划运行时间列表。
+        从未运行过的任务不视为错过。
+        """
+        last_run = self.last_run(job)
+        if last_run is None:
+            return []
+        now = now or time.time()
+        missed = []
+        slot = trigger.next_after(max(last_run, now - self.catch_up_max_age))
+        while slot <= now:
+            missed.append(slot)
+            slot = trigger.next_after(slot)
+        return missed
+
+    def _load(self):
+        state = {'last_runs': {}, 'runs': {}}
+        if not os.path.exists(self.state_file):
+            return state
+        try:
+            with open(self.state_file, 'r') as f:
+                state.update(json.load(f))
+        except (OSError, ValueError) as e:
+            LOG.warning(f"任务状态读取失败，将重新开始：{str(e)}")
+        return state
+
+    def _save(self):
+        # 多个进程可能共用同一个状态文件：在文件锁内合并其它进程记录的完成时间与它们的任务检查点再写回
+        with file_lock(self.state_file + ".lock"):
+            saved = self._load()
+            for job, finished_at in saved['last_runs'].items():
+                if finished_at > self.state['last_runs'].get(job, 0):
+                    self.state['last_runs'][job] = finished_at
+            runs = {job: run for job, run in saved['runs'].items() if job not in self._jobs}
+            runs.update((job, run) for job, run in self.state['runs'].items() if job in self._jobs)
+            self.state['runs'] = runs
+            atomic_write_json(self.state_file, self.state)
@@ -1,7 +1,18 @@
 import json
 import requests
-from openai import OpenAI  # 导入OpenAI库用于访问GPT模型
 from logger import LOG  # 导入日志模块
+import metrics  # 导入指标模块，记录生成耗时与 token 消耗
+import tracing  # 导入追踪模块，记录每次生成的 span
+
+OpenAI = None  # OpenAI 客户端类，首次使用 OpenAI 模型时才导入 openai 库以加快启动
+
+
+def _openai_client_class():
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI as client_class  # 导入OpenAI库用于访问GPT模型
+        OpenAI = client_class
+    return OpenAI
 
 class LLM:
     def __init__(self, config):
@@ -13,19 +24,29 @@ class LLM:
         self.config = config
         self.model = config.llm_model_type.lower()  # 获取模型类型并转换为小写
         if self.model == "openai":
-            self.client = OpenAI()  # 创建OpenAI客户端实例
+            self.client = _openai_client_class()()  # 创建OpenAI客户端实例
         elif self.model == "ollama":
             self.api_url = config.ollama_api_url  # 设置Ollama API的URL
         else:
             LOG.error(f"不支持的模型类型: {self.model}")
             raise ValueError(f"不支持的模型类型: {self.model}")  # 如果模型类型不支持，抛出错误
 
-    def generate_report(self, system_prompt, user_content):
+    def model_name(self, model=None):
+        """
+        返回实际使用的模型名称：指定了 model 时使用它，否则使用配置中当前模型类型的模型。
+        """
+        if model:
+            return model
+        return self.config.openai_model_name if self.model == "openai" else self.config.ollama_model_name
+
+    def generate_report(self, system_prompt, user_content, json_mode=False, model=None):
         """
         生成报告，根据配置选择不同的模型来处理请求。
 
         :param system_prompt: 系统提示信息，包含上下文和规则。
         :param user_content: 用户提供的内容，通常是Markdown格式的文本。
+        :param json_mode: 是否要求模型只输出 JSON（用于结构化报告）。
+        :param model: 模型名称，为 None 时使用配置中的模型（用于按订阅指定模型）。
         :return: 生成的报告内容。
         """
         messages = [
@@ -35,53 +56,76 @@ class LLM:
 
         # 根据选择的模型调用相应的生成报告方法
         if self.model == "openai":
-            return self._generate_report_openai(messages)
+            model_name, generate = self.model_name(model), self._generate_report_openai
         elif self.model == "ollama":
-            return self._generate_report_ollama(messages)
+            model_name, generate = self.model_name(model), self._generate_report_ollama
         else:
             raise ValueError(f"不支持的模型类型: {self.model}")
 
-    def _generate_report_openai(self, messages):
+        input_bytes = len(system_prompt.encode('utf-8')) + len(user_content.encode('utf-8'))
+        with tracing.span("llm.generate", provider=self.model, model=model_name, input_bytes=input_bytes) as llm_span:
+            with metrics.LLM_LATENCY.time(provider=self.model, model=model_name):
+                report = generate(messages, json_mode, model_name)
+            llm_span.set("output_bytes", len(report.encode('utf-8')))
+            return report
+
+    def _generate_report_openai(self, messages, json_mode=False, model_name=None):
         """
         使用 OpenAI GPT 模型生成报告。
 
         :param messages: 包含系统提示和用户内容的消息列表。
+        :param json_mode: 是否要求模型只输出 JSON。
+        :param model_name: 模型名称，默认使用配置中的OpenAI模型。
         :return: 生成的报告内容。
         """
-        LOG.info(f"使用 OpenAI {self.config.openai_model_name} 模型生成报告。")
+        model_name = model_name or self.config.openai_model_name
+        LOG.info(f"使用 OpenAI {model_name} 模型生成报告。")
         try:
+            kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
             response = self.client.chat.completions.create(
-                model=self.config.openai_model_name,  # 使用配置中的OpenAI模型名称
-                messages=messages
+                model=model_name,
+                messages=messages,
+                **kwargs
             )
             LOG.debug("GPT 响应: {}", response)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                _record_tokens("openai", model_name,
+                               getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
             return response.choices[0].message.content  # 返回生成的报告内容
         except Exception as e:
             LOG.error(f"生成报告时发生错误：{e}")
             raise
 
-    def _generate_report_ollama(self, messages):
+    def _generate_report_ollama(self, messages, json_mode=False, model_name=None):
         """
         使用 Ollama LLaMA 模型生成报告。
 
         :param messages: 包含系统提示和用户内容的消息列表。
+        :param json_mode: 是否要求模型只输出 JSON。
+        :param model_name: 模型名称，默认使用配置中的Ollama模型。
         :return: 生成的报告内容。
         """
-        LOG.info(f"使用 Ollama {self.config.ollama_model_name} 模型生成报告。")
+        model_name = model_name or self.config.ollama_model_name
+        LOG.info(f"使用 Ollama {model_name} 模型生成报告。")
         try:
             payload = {
-                "model": self.config.ollama_model_name,  # 使用配置中的Ollama模型名称
+                "model": model_name,
                 "messages": messages,
                 "max_tokens": 4000,
                 "temperature": 0.7,
                 "stream": False
             }
+            if json_mode:
+                payload["format"] = "json"  # 要求 Ollama 只输出 JSON
 
             response = requests.post(self.api_url, json=payload)  # 发送POST请求到Ollama API
             response_data = response.json()
 
             # 调试输出查看完整的响应结构
             LOG.debug("Ollama 响应: {}", response_data)
+            _record_tokens("ollama", model_name,
+                           response_data.get("prompt_eval_count"), response_data.get("eval_count"))
 
             # 直接从响应数据中获取 content
             message_content = response_data.get("message", {}).get("content", None)
@@ -94,6 +138,13 @@ class LLM:
             LOG.error(f"生成报告时发生错误：{e}")
             raise
 
+def _record_tokens(provider, model, prompt_tokens, completion_tokens):
+    # 只记录响应中确实提供了的 token 数
+    for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+        if isinstance(count, int):
+            metrics.LLM_TOKENS.inc(count, provider=provider, model=model, kind=kind)
+            tracing.annotate(**{f"{kind}_tokens": count})
+
 if __name__ == '__main__':
     from config import Config  # 导入配置管理类
     config = Config()
@@ -0,0 +1,52 @@
+import copy
+import threading
+from collections import OrderedDict
+from llm import LLM  # 导入语言模型类
+from report_generator import ReportGenerator  # 导入报告生成器类
+from logger import LOG  # 导入日志模块
+
+
+class LLMPool:
+    """
+    按 (模型类型, 模型名称) 复用 LLM 与 ReportGenerator 实例：客户端只创建一次，提示文件只读取一次。
+    每个实例使用配置的独立副本，不同请求选择不同模型时不会互相修改共享的配置。
+    """
+
+    def __init__(self, config, compactor=None, max_size=8):
+        """
+        :param config: 全局配置，只读取，不会被修改。
+        :param compactor: 可选的输入压缩器，所有实例共用。
+        :param max_size: 最多缓存的实例数，超出时淘汰最久未使用的实例。
+        """
+        self.config = config
+        self.compactor = compactor
+        self.max_size = max_size
+        self._generators = OrderedDict()  # (provider, model) -> ReportGenerator
+        self._lock = threading.Lock()
+
+    def get(self, provider, model):
+        """
+        返回指定模型的报告生成器（其 llm 属性为对应的 LLM 实例），不存在时创建。
+        """
+        key = (provider, model)
+        with self._lock:
+            generator = self._generators.get(key)
+            if generator is None:
+                generator = self._create(provider, model)
+                self._generators[key] = generator
+                if len(self._generators) > self.max_size:
+                    evicted, _ = self._generators.popitem(last=False)
+                    LOG.debug(f"[模型池]淘汰最久未使用的模型实例：{evicted}")
+            self._generators.move_to_end(key)
+            return generator
+
+    def _create(self, provider, model):
+        # 请求级的配置：复制全局配置后只修改模型选择
+        request_config = copy.copy(self.config)
+        request_config.llm_model_type = provider
+        if provider == "openai":
+            request_config.openai_model_name = model
+        else:
+            request_config.ollama_model_name = model
+        LOG.info(f"[模型池]创建模型实例：{provider}/{model}")
+        return ReportGenerator(LLM(request_config), request_config.report_types, self.compactor)
@@ -0,0 +1,207 @@
+import threading  # 导入threading库，保护指标更新并在后台线程中运行 HTTP 服务
+import time  # 导入time库，用于计时
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 导入标准库的 HTTP 服务，无需额外依赖
+from logger import LOG  # 导入日志模块
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+# 默认的耗时分布桶（秒），覆盖从 API 请求到整次任务运行的范围
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        """
+        :param registry: 注册到的指标列表，默认为全局的 REGISTRY（由 /metrics 输出）。
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{self._format_labels(key)} {_format_number(value)}"]
+
+
+class Counter(_Metric):
+    """
+    只增不减的计数器，例如请求次数。
+    """
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    可任意设置的瞬时值，例如剩余的速率限制配额、最近一次成功运行的时间。
+    """
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    耗时等观测值的分布，按桶累计计数并记录总和与次数。
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = [bucket_count + (1 if value <= bound else 0) for bucket_count, bound in zip(counts, self.buckets)]
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        统计代码块的耗时（无论是否抛出异常）。
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = [
+            f"{self.name}_bucket{self._format_labels(key, [('le', _format_number(bound))])} {bucket_count}"
+            for bound, bucket_count in zip(self.buckets, counts)
+        ]
+        lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_number(total)}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = []  # 所有已创建的指标
+
+# 定时任务与流水线
+JOB_DURATION = Histogram("sentinel_job_duration_seconds", "定时任务每次运行的耗时", ["job"])
+JOB_RUNS = Counter("sentinel_job_runs_total", "定时任务运行次数", ["job", "result"])
+JOB_LAST_SUCCESS = Gauge("sentinel_job_last_success_timestamp_seconds", "定时任务最近一次成功运行结束的时间", ["job"])
+STAGE_DURATION = Histogram("sentinel_stage_duration_seconds", "流水线各阶段处理单个条目的耗时", ["pipeline", "stage"])
+# GitHub API
+GITHUB_REQUESTS = Counter("sentinel_github_requests_total", "GitHub API 请求次数", ["endpoint", "status"])
+GITHUB_RATE_LIMIT_REMAINING = Gauge("sentinel_github_rate_limit_remaining", "GitHub API 剩余的速率限制配额")
+# LLM
+LLM_LATENCY = Histogram("sentinel_llm_request_duration_seconds", "LLM 生成报告的耗时", ["provider", "model"])
+LLM_TOKENS = Counter("sentinel_llm_tokens_total", "LLM 消耗的 token 数", ["provider", "model", "kind"])
+# 通知
+NOTIFICATIONS = Counter("sentinel_notifications_total", "通知投递次数", ["channel", "result"])
+
+
+def render(registry=None):
+    """
+    以 Prometheus 文本格式返回所有指标（默认为全局的 REGISTRY）。
+    """
+    lines = []
+    for metric in REGISTRY if registry is None else registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    可选的轻量 HTTP 服务：/metrics 输出 Prometheus 文本格式的指标，/healthz 反映调度器是否存活。
+    """
+
+    def __init__(self, host="0.0.0.0", port=9108, health_check=None):
+        """
+        :param health_check: 返回 (是否健康, 说明) 的函数，默认总是健康。
+        """
+        self.health_check = health_check or (lambda: (True, "ok"))
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    self._reply(200, render(), "text/plain; version=0.0.4; charset=utf-8")
+                elif self.path == "/healthz":
+                    healthy, detail = server.health_check()
+                    self._reply(200 if healthy else 503, f"{detail}\n", "text/plain; charset=utf-8")
+                else:
+                    self._reply(404, "not found\n", "text/plain; charset=utf-8")
+
+            def _reply(self, status, body, content_type):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                LOG.debug(f"[指标服务]{self.address_string()} {format % args}")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, metrics_config, health_check=None):
+        return cls(metrics_config.get('host', '0.0.0.0'), metrics_config.get('port', 9108), health_check)
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        LOG.info(f"[指标服务]已启动，监听端口 {self.port}")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
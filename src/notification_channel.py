@@ -0,0 +1,215 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager
+from logger import LOG  # 导入日志模块
+import metrics  # 导入指标模块，记录通知投递结果
+import tracing  # 导入追踪模块，记录通知渲染与投递的 span
+from rate_limiter import RateLimiter  # 导入发送速率限制器
+
+class NotificationChannel(ABC):
+    """
+    通知渠道基类，统一了报告通知、批量合并、发件箱入队与限速等投递流程。
+    新增一个渠道只需实现 is_configured / render / combine / deliver（以及可选的 split / connection），
+    缺少其中任何一个抽象方法的渠道在创建实例时就会报错。
+    """
+
+    channel_name = None  # 渠道名称，同时作为发件箱中的 channel 字段
+    display_name = None  # 日志中显示的渠道名称
+    supports_recipients = False  # 是否支持按订阅指定收件人，不支持的渠道总是发往默认目标
+
+    def __init__(self, outbox=None, max_per_minute=None, batch_mode=False):
+        """
+        :param outbox: 可选的持久化发件箱（Outbox），设置后消息只入队，由 OutboxWorker 调用 deliver 投递。
+        :param max_per_minute: 每分钟最多投递的消息数。
+        :param batch_mode: 是否把一次 session 中的所有报告合并投递。
+        """
+        self.outbox = outbox
+        self.batch_mode = batch_mode
+        self.rate_limiter = RateLimiter(max_per_minute)
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+        self._batch = None  # 批量模式下收集的 (主题, 正文, 收件人) 列表
+
+    def notify_github_report(self, repo, report, structured=None, recipients=None):
+        """
+        发送 GitHub 项目报告
+        :param repo: 仓库名称
+        :param report: 报告内容
+        :param structured: 可选的结构化报告，提供时由渠道直接渲染，无需再解析 Markdown
+        :param recipients: 可选的收件人列表（None 表示默认收件人），报告只渲染一次后分发给每个收件人
+        """
+        return self.publish(f"[GitHub] {repo} 进展简报", report, structured, recipients)
+
+    def notify_hn_report(self, date, report, structured=None):
+        """
+        发送 Hacker News 每日技术趋势报告
+        :param date: 报告日期
+        :param report: 报告内容
+        :param structured: 可选的结构化报告，提供时由渠道直接渲染，无需再解析 Markdown
+        """
+        return self.publish(f"[HackerNews] {date} 技术趋势", report, structured)
+
+    def publish(self, subject, report, structured=None, recipients=None):
+        """
+        渲染并发送一份报告；批量模式的 session 中只收集，退出 session 时合并发送。
+        报告只渲染一次，渲染结果被所有收件人共用。
+        :return: 是否全部发送成功（被收集或入队时返回 True）
+        """
+        if not self.is_configured():
+            LOG.warning(f"{self.display_name}设置未配置正确，无法发送通知：{subject}")
+            return False
+        if not self.supports_recipients or not recipients:
+            recipients = [None]
+        with tracing.span("notify.publish", channel=self.channel_name, subject=subject, recipients=len(recipients)):
+            body = self.render(subject, report, structured)
+            ok = True
+            for recipient in recipients:
+                ok = self.send(subject, body, recipient) and ok
+            return ok
+
+    def send(self, subject, body, recipient=None):
+        with self._lock:
+            if self._batch is not None:
+                self._batch.append((subject, body, recipient))
+                LOG.info(f"{self.display_name}已加入批量发送:{subject}")
+                return True
+        return self._dispatch(subject, body, recipient)
+
+    @contextmanager
+    def session(self):
+        """
+        一次运行的通知会话：期间复用渠道连接；批量模式下收集期间的所有报告，退出时合并发送。
+        """
+        with self.connection():
+            with self._collect_batch():
+                yield self
+
+    @contextmanager
+    def connection(self):
+        """
+        在上下文期间复用渠道连接，默认不做任何事，由需要连接复用的渠道覆盖。
+        """
+        yield self
+
+    @contextmanager
+    def _collect_batch(self):
+        if not self.batch_mode:
+            yield
+            return
+        with self._lock:
+            self._batch_depth += 1
+            if self._batch is None:
+                self._batch = []
+        try:
+            yield
+        finally:
+            batch = None
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    batch, self._batch = self._batch, None
+            if batch:
+                # 按收件人分组合并，每个收件人只收到自己订阅的报告
+                groups = {}
+                for subject, body, recipient in batch:
+                    groups.setdefault(recipient, []).append((subject, body))
+                for recipient, items in groups.items():
+                    for subject, body in self.combine(items):
+                        self._dispatch(subject, body, recipient)
+
+    def _dispatch(self, subject, body, recipient=None):
+        ok = True
+        for part_subject, part_body in self.split(subject, body):
+            if self.outbox is not None:
+                self.outbox.enqueue(self.channel_name, part_subject, part_body, recipient)
+            else:
+                ok = self.deliver_recorded(part_subject, part_body, recipient) and ok
+        return ok
+
+    def deliver_recorded(self, subject, body, recipient=None):
+        """
+        调用 deliver 投递一条消息，并记录投递结果指标。
+        """
+        try:
+            with tracing.span("notify.deliver", channel=self.channel_name, bytes=len(body.encode('utf-8'))):
+                ok = self.deliver(subject, body, recipient)
+        except Exception:
+            metrics.NOTIFICATIONS.inc(channel=self.channel_name, result="failure")
+            raise
+        metrics.NOTIFICATIONS.inc(channel=self.channel_name, result="success" if ok else "failure")
+        return ok
+
+    # 以下方法由具体渠道实现
+    @abstractmethod
+    def is_configured(self):
+        """
+        返回渠道是否已配置（例如收件人或 Webhook），未配置时不发送。
+        """
+
+    @abstractmethod
+    def render(self, subject, report, structured=None):
+        """
+        把一份报告渲染为渠道的消息正文（字符串，便于存入发件箱）。
+        """
+
+    @abstractmethod
+    def combine(self, items):
+        """
+        把批量收集的 (主题, 正文) 合并为若干条待发送的 (主题, 正文)。
+        """
+
+    def split(self, subject, body):
+        """
+        把超出渠道限制的消息拆分为多条，默认不拆分。
+        """
+        return [(subject, body)]
+
+    @abstractmethod
+    def deliver(self, subject, body, recipient=None):
+        """
+        立即投递一条消息，返回是否成功。
+        """
+
+
+class NotifierGroup:
+    """
+    把多个通知渠道组合在一起，对外提供与单个渠道相同的通知接口。
+    """
+
+    def __init__(self, channels):
+        self.channels = [channel for channel in channels if channel is not None]
+
+    def notify_github_report(self, repo, report, structured=None, recipients=None):
+        """
+        :return: 已配置的渠道是否全部发送成功（或入队、加入批量发送）；未配置的渠道不计入。
+        """
+        return self._all_delivered(lambda channel: channel.notify_github_report(repo, report, structured, recipients))
+
+    def notify_hn_report(self, date, report, structured=None):
+        return self._all_delivered(lambda channel: channel.notify_hn_report(date, report, structured))
+
+    def _all_delivered(self, notify):
+        ok = True
+        for channel in self.channels:
+            delivered = notify(channel)  # 每个渠道都要尝试，不因前一个渠道失败而跳过
+            ok = (delivered or not channel.is_configured()) and ok
+        return ok
+
+    @contextmanager
+    def session(self):
+        with ExitStack() as stack:
+            for channel in self.channels:
+                stack.enter_context(channel.session())
+            yield self
+
+    def senders(self):
+        """
+        返回供 OutboxWorker 使用的 渠道名称 -> 投递函数 映射。
+        """
+        return {channel.channel_name: channel.deliver_recorded for channel in self.channels}
+
+    def batch_contexts(self):
+        """
+        返回供 OutboxWorker 批量投递时使用的 渠道名称 -> 连接上下文 映射。
+        """
+        return {channel.channel_name: channel.connection for channel in self.channels}
@@ -1,56 +1,144 @@
 import smtplib
-import markdown2
+from contextlib import contextmanager
+from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from logger import LOG
-
-class Notifier:
-    def __init__(self, email_settings):
+from notification_channel import NotificationChannel
+from report_renderer import render_html
+
+class Notifier(NotificationChannel):
+    channel_name = "email"
+    display_name = "邮件"
+    supports_recipients = True
+
+    def __init__(self, email_settings, outbox=None):
+        settings = email_settings or {}
+        # digest 为 True 时把一次运行中的所有报告合并成一封邮件；outbox 设置后邮件只入队，由后台线程投递
+        super().__init__(outbox, settings.get('max_per_minute'), settings.get('digest', False))
         self.email_settings = email_settings
-    
-    def notify_github_report(self, repo, report):
+        self.use_ssl = settings.get('use_ssl', True)  # 是否使用 SMTP over SSL（本地测试服务器可关闭）
+        self._connection_depth = 0  # 嵌套的 connection() 层数，大于 0 时复用 SMTP 连接
+        self._server = None  # 当前复用的已登录 SMTP 连接
+
+    def is_configured(self):
+        return bool(self.email_settings)
+
+    def send_email(self, subject, report, html_report=None, recipient=None):
         """
-        发送 GitHub 项目报告邮件
-        :param repo: 仓库名称
-        :param report: 报告内容
+        发送一封报告邮件；摘要模式的 session 中只收集报告，退出 session 时统一发送。
+        :param recipient: 可选的收件人，默认为配置中的 to
+        :return: 是否发送成功（被收集进摘要或入队时返回 True）
         """
-        if self.email_settings:
-            subject = f"[GitHub] {repo} 进展简报"
-            self.send_email(subject, report)
-        else:
-            LOG.warning("邮件设置未配置正确，无法发送 GitHub 报告通知")
-    
-    def notify_hn_report(self, date, report):
+        if html_report is None:
+            html_report = self.render(subject, report)
+        return self.send(subject, html_report, recipient)
+
+    def render(self, subject, report, structured=None):
+        if structured:
+            return render_html(structured)
+        # 将Markdown内容转换为HTML（首次发送时才导入 markdown2，加快启动）
+        import markdown2
+        return markdown2.markdown(report)
+
+    def combine(self, items):
+        date = datetime.now().strftime('%Y-%m-%d')
+        subject = f"[GitHubSentinel] {date} 报告汇总（{len(items)} 份）"
+        html_report = "\n<hr>\n".join(f"<h2>{part_subject}</h2>\n{part_html}" for part_subject, part_html in items)
+        LOG.info(f"准备发送摘要邮件:{subject}")
+        return [(subject, html_report)]
+
+    @contextmanager
+    def connection(self):
         """
-        发送 Hacker News 每日技术趋势报告邮件
-        :param date: 报告日期
-        :param report: 报告内容
+        在上下文期间复用同一个已登录的 SMTP 连接，退出最外层上下文时关闭连接。
         """
-        if self.email_settings:
-            subject = f"[HackerNews] {date} 技术趋势"
-            self.send_email(subject, report)
-        else:
-            LOG.warning("邮件设置未配置正确，无法发送 Hacker News 报告通知")
-    
-    def send_email(self, subject, report):
-        LOG.info(f"准备发送邮件:{subject}")
+        with self._lock:
+            self._connection_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._connection_depth -= 1
+                if self._connection_depth == 0:
+                    self._close_locked()
+
+    def _build_message(self, subject, html_report, recipient=None):
         msg = MIMEMultipart()
         msg['From'] = self.email_settings['from']
-        msg['To'] = self.email_settings['to']
+        msg['To'] = recipient or self.email_settings['to']
         msg['Subject'] = subject
-        
-        # 将Markdown内容转换为HTML
-        html_report = markdown2.markdown(report)
-
         msg.attach(MIMEText(html_report, 'html'))
+        return msg
+
+    def deliver(self, subject, html_report, recipient=None):
+        """
+        立即通过 SMTP 投递一封 HTML 邮件（发件箱的投递线程也通过它发送）。
+        :return: 是否发送成功
+        """
+        LOG.info(f"准备发送邮件:{subject}")
+        msg = self._build_message(subject, html_report, recipient)
+        self.rate_limiter.wait()
         try:
-            with smtplib.SMTP_SSL(self.email_settings['smtp_server'], self.email_settings['smtp_port']) as server:
-                LOG.debug("登录SMTP服务器")
-                server.login(msg['From'], self.email_settings['password'])
-                server.sendmail(msg['From'], msg['To'], msg.as_string())
-                LOG.info("邮件发送成功！")
+            if self._connection_depth:
+                self._send_with_reuse(msg)
+            else:
+                server = self._connect()
+                try:
+                    server.sendmail(msg['From'], msg['To'], msg.as_string())
+                finally:
+                    server.quit()
+            LOG.info("邮件发送成功！")
+            return True
         except Exception as e:
             LOG.error(f"发送邮件失败：{str(e)}")
+            return False
+
+    def _send_with_reuse(self, msg):
+        # 复用已登录的连接；连接失效或临时错误（4xx）时重新连接并重试一次
+        with self._lock:
+            for attempt in range(2):
+                if self._server is None:
+                    self._server = self._connect()
+                try:
+                    self._server.sendmail(msg['From'], msg['To'], msg.as_string())
+                    return
+                except OSError as e:  # smtplib 的异常都是 OSError 的子类
+                    if not _is_transient(e):
+                        raise  # 永久性拒绝，重试只会重复投递；smtplib 已重置会话，连接留给后续邮件
+                    self._close_locked()
+                    if attempt:
+                        raise
+                    LOG.warning(f"SMTP 连接失效，重新连接：{str(e)}")
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = smtp_class(self.email_settings['smtp_server'], self.email_settings['smtp_port'])
+        try:
+            # 未配置密码时（例如本地中继服务器）不登录
+            if self.email_settings.get('password'):
+                LOG.debug("登录SMTP服务器")
+                server.login(self.email_settings['from'], self.email_settings['password'])
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _close_locked(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+def _is_transient(error):
+    # 连接断开、网络错误与 4xx 临时错误可以重试；5xx 永久拒绝与收件人全部被拒不重试
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    return not isinstance(error, smtplib.SMTPException)
 
 if __name__ == '__main__':
     from config import Config
@@ -0,0 +1,238 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from logger import LOG  # 导入日志模块
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+class Outbox:
+    """
+    基于 SQLite 的持久化发件箱：报告生成后只需入队，由后台的 OutboxWorker 负责投递、重试和记录状态，
+    进程重启后未投递的消息不会丢失。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dedup_key TEXT NOT NULL UNIQUE,
+                    channel TEXT NOT NULL,
+                    recipient TEXT,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    sent_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, outbox_config):
+        return cls(outbox_config.get('path', 'data/outbox.db'))
+
+    @contextmanager
+    def _connect(self):
+        # 每次操作使用独立连接（结束时提交并关闭），便于多个线程或进程同时访问
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, channel, subject, body, recipient=None, dedup_key=None):
+        """
+        把一条消息加入发件箱。相同去重键的消息只会保存一次。
+
+        :param channel: 投递渠道名称，例如 "email"。
+        :param subject: 消息主题。
+        :param body: 消息正文（渠道自行约定格式，例如邮件为 HTML）。
+        :param recipient: 可选的收件人，为 None 时使用渠道的默认收件人。
+        :param dedup_key: 去重键，默认由当天日期、渠道、收件人、主题和正文计算，即同一天内的相同消息只投递一次。
+        :return: 新消息的 id；重复消息返回 None。
+        """
+        if dedup_key is None:
+            raw_key = f"{date.today().isoformat()}\0{channel}\0{recipient}\0{subject}\0{body}"
+            dedup_key = hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox (dedup_key, channel, recipient, subject, body, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (dedup_key, channel, recipient, subject, body, now, now),
+            )
+            if cursor.rowcount == 0:
+                LOG.info(f"发件箱中已存在相同消息，忽略：{subject}")
+                return None
+            LOG.info(f"消息已加入发件箱：[{channel}] {subject}")
+            return cursor.lastrowid
+
+    def due(self, limit=50):
+        """
+        返回已到投递时间的待发送消息列表。
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_sent(self, message_id):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL WHERE id = ?",
+                (time.time(), message_id),
+            )
+
+    def mark_failed(self, message_id, error, max_attempts, base_backoff, max_backoff=3600):
+        """
+        记录一次投递失败：按指数退避安排下一次重试，达到最大尝试次数后标记为 failed。
+        """
+        with self._connect() as conn:
+            attempts = conn.execute("SELECT attempts FROM outbox WHERE id = ?", (message_id,)).fetchone()[0] + 1
+            if attempts >= max_attempts:
+                conn.execute(
+                    "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts, error, message_id),
+                )
+                return
+            delay = min(max_backoff, base_backoff * 2 ** (attempts - 1))
+            conn.execute(
+                "UPDATE outbox SET attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (attempts, error, time.time() + delay, message_id),
+            )
+
+    def status_counts(self):
+        """
+        返回各状态的消息数量，例如 {'pending': 1, 'sent': 10, 'failed': 0}。
+        """
+        counts = {'pending': 0, 'sent': 0, 'failed': 0}
+        with self._connect() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def recent_failures(self, limit=10):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT id, channel, recipient, subject, attempts, last_error FROM outbox "
+                "WHERE status = 'failed' ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+class OutboxWorker:
+    """
+    后台投递线程：不断取出到期的消息，交给对应渠道的发送函数投递，失败时按退避策略重试。
+    """
+
+    def __init__(self, outbox, senders, poll_interval=5, max_attempts=5, base_backoff=30):
+        """
+        :param outbox: Outbox 实例。
+        :param senders: 渠道名称 -> 发送函数 send(subject, body, recipient)，返回是否投递成功。
+        :param poll_interval: 没有消息时的轮询间隔（秒）。
+        :param max_attempts: 最大尝试次数。
+        :param base_backoff: 第一次重试前的等待时间（秒），之后每次翻倍。
+        """
+        self.outbox = outbox
+        self.senders = senders
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.batch_contexts = {}  # 渠道名称 -> 批量投递时使用的上下文管理器工厂（例如复用连接）
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="outbox-worker", daemon=True)
+        self._thread.start()
+        LOG.info("发件箱投递线程已启动")
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """
+        通知投递线程立即检查新消息。
+        """
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                LOG.error(f"发件箱投递出错：{str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def drain(self):
+        """
+        投递所有已到期的消息，返回本轮投递成功的数量。
+        """
+        messages = self.outbox.due()
+        if not messages:
+            return 0
+
+        delivered = 0
+        for channel in sorted({message['channel'] for message in messages}):
+            batch = [message for message in messages if message['channel'] == channel]
+            context_factory = self.batch_contexts.get(channel)
+            if context_factory:
+                with context_factory():
+                    delivered += self._deliver_batch(channel, batch)
+            else:
+                delivered += self._deliver_batch(channel, batch)
+
+        LOG.info(f"发件箱本轮投递 {delivered}/{len(messages)} 条，当前状态：{self.outbox.status_counts()}")
+        return delivered
+
+    def _deliver_batch(self, channel, batch):
+        delivered = 0
+        sender = self.senders.get(channel)
+        for message in batch:
+            if sender is None:
+                self.outbox.mark_failed(message['id'], f"未注册的渠道: {channel}", 1, 0)
+                continue
+            try:
+                ok = sender(message['subject'], message['body'], message['recipient'])
+                error = None if ok else "发送函数返回失败"
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                self.outbox.mark_sent(message['id'])
+                delivered += 1
+            else:
+                LOG.warning(f"消息投递失败，稍后重试：[{channel}] {message['subject']}（{error}）")
+                self.outbox.mark_failed(message['id'], error, self.max_attempts, self.base_backoff)
+        return delivered
+
+
+if __name__ == '__main__':
+    from config import Config  # 导入配置管理类
+
+    config = Config()
+    outbox = Outbox(config.outbox.get('path', 'data/outbox.db'))
+    print(f"发件箱状态：{outbox.status_counts()}")
+    for failure in outbox.recent_failures():
+        print(f"  #{failure['id']} [{failure['channel']}] {failure['subject']}：{failure['last_error']}")
@@ -0,0 +1,141 @@
+import queue  # 导入queue库，用于阶段之间的有界队列
+import threading  # 导入threading库，用于每个阶段的工作线程
+import time  # 导入time库，用于统计各阶段耗时
+from logger import LOG  # 导入日志模块
+import metrics  # 导入指标模块，记录各阶段耗时
+import tracing  # 导入追踪模块，为每个条目的每个阶段记录 span
+
+_STOP = object()  # 队列结束标记
+
+
+class Stage:
+    """
+    流水线中的一个阶段：由若干工作线程从输入队列取出条目，处理后交给下一阶段。
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=4):
+        """
+        :param name: 阶段名称，用于日志。
+        :param func: 处理函数，接收一个条目并返回传给下一阶段的条目；返回 None 表示丢弃该条目。
+        :param workers: 工作线程数。
+        :param queue_size: 输入队列容量，队列满时上游阶段阻塞等待（背压）。
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.durations = []  # 每个条目的处理耗时（秒）
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, duration, failed=False):
+        with self._lock:
+            self.durations.append(duration)
+            if failed:
+                self.errors += 1
+
+
+class Pipeline:
+    """
+    由有界队列串联起来的多阶段流水线，使第 N+1 个条目的获取与第 N 个条目的生成、
+    第 N-1 个条目的通知同时进行。
+    """
+
+    def __init__(self, name, stages, describe=str):
+        """
+        :param name: 流水线名称，用于日志。
+        :param stages: Stage 列表，按执行顺序排列。
+        :param describe: 把条目转换为日志中可读描述的函数。
+        """
+        self.name = name
+        self.stages = stages
+        self.describe = describe
+
+    def run(self, items):
+        """
+        让所有条目依次流过各阶段，阻塞直到全部处理完毕。
+
+        :param items: 输入条目的可迭代对象。
+        :return: 最后一个阶段输出的条目列表（顺序与完成顺序一致）。
+        """
+        results = []
+        results_lock = threading.Lock()
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            remaining = [stage.workers]  # 尚未退出的工作线程数
+            remaining_lock = threading.Lock()
+            for worker_id in range(stage.workers):
+                thread = threading.Thread(
+                    target=tracing.run_in_context(self._work),  # 工作线程中的 span 以调用方的 span 为父
+                    args=(stage, next_stage, remaining, remaining_lock, results, results_lock),
+                    name=f"{self.name}-{stage.name}-{worker_id}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        started = time.monotonic()
+        first = self.stages[0]
+        try:
+            for item in items:
+                first.queue.put(item)  # 队列满时阻塞，形成背压
+        finally:
+            # 输入迭代抛出异常时也要让工作线程处理完已入队的条目后退出，不能让它们永远阻塞在队列上
+            for _ in range(first.workers):
+                first.queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+
+        self._log_timings(time.monotonic() - started)
+        return results
+
+    def _work(self, stage, next_stage, remaining, remaining_lock, results, results_lock):
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                break
+
+            started = time.monotonic()
+            try:
+                with tracing.span(f"{self.name}.{stage.name}", item=self.describe(item)):
+                    output = stage.func(item)
+            except Exception as e:
+                stage.record(time.monotonic() - started, failed=True)
+                metrics.STAGE_DURATION.observe(time.monotonic() - started, pipeline=self.name, stage=stage.name)
+                LOG.error(f"[{self.name}]阶段 {stage.name} 处理 {self.describe(item)} 失败：{str(e)}")
+                continue
+
+            duration = time.monotonic() - started
+            stage.record(duration)
+            metrics.STAGE_DURATION.observe(duration, pipeline=self.name, stage=stage.name)
+            LOG.debug(f"[{self.name}]阶段 {stage.name} 处理 {self.describe(item)} 耗时 {duration:.2f}s")
+
+            if output is None:
+                continue
+            if next_stage:
+                next_stage.queue.put(output)
+            else:
+                with results_lock:
+                    results.append(output)
+
+        # 本阶段最后一个退出的线程负责通知下一阶段的所有工作线程结束
+        with remaining_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and next_stage:
+            for _ in range(next_stage.workers):
+                next_stage.queue.put(_STOP)
+
+    def _log_timings(self, elapsed):
+        for stage in self.stages:
+            count = len(stage.durations)
+            total = sum(stage.durations)
+            average = total / count if count else 0
+            longest = max(stage.durations) if count else 0
+            LOG.info(
+                f"[{self.name}]阶段 {stage.name}（{stage.workers} 个工作线程）："
+                f"处理 {count} 项，失败 {stage.errors} 项，累计 {total:.2f}s，平均 {average:.2f}s，最长 {longest:.2f}s"
+            )
+        LOG.info(f"[{self.name}]流水线总耗时 {elapsed:.2f}s")
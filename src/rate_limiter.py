@@ -0,0 +1,28 @@
+import threading
+import time
+
+class RateLimiter:
+    """
+    简单的发送速率限制器：保证相邻两次发送之间至少间隔 60 / max_per_minute 秒，线程安全。
+    """
+
+    def __init__(self, max_per_minute=None):
+        """
+        :param max_per_minute: 每分钟最多发送次数，为 None 或 0 时不限速。
+        """
+        self.interval = 60.0 / max_per_minute if max_per_minute else 0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        阻塞直到允许下一次发送。
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if delay > 0:
+            time.sleep(delay)
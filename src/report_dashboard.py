@@ -0,0 +1,43 @@
+import time  # 导入time库，用于统计每个仓库的耗时
+from concurrent.futures import as_completed  # 按完成顺序获取各仓库的生成结果
+from logger import LOG  # 导入日志模块
+
+
+def stream_dashboard(repos, days, model_type, model_name, report_store, refresher, refresh):
+    """
+    并发生成多个仓库的报告：所选模型新鲜的已保存报告直接使用，其余仓库提交到有界的后台线程池，
+    每完成一个仓库就产出一次 (进度表, 已完成的报告, 报告文件列表)。单个仓库失败只记录在进度表中。
+    :param refresh: 生成单个仓库报告的函数 refresh(model_type, model_name, repo, days)，返回 (报告内容, 报告文件路径)。
+    """
+    status, reports, futures = {}, {}, {}
+    for repo in repos:
+        stored = report_store.latest(repo, days, model_type, model_name)
+        if stored is not None and report_store.is_fresh(stored):
+            status[repo] = "已是最新（使用已保存的报告）"
+            reports[repo] = (stored.read(), stored.path)
+        else:
+            status[repo] = "生成中"
+            future = refresher.submit((repo, days, model_type, model_name), refresh, model_type, model_name, repo, days)
+            futures[future] = (repo, time.monotonic())
+    yield dashboard_view(repos, status, reports)
+
+    for future in as_completed(futures):
+        repo, started = futures[future]
+        try:
+            reports[repo] = future.result()
+            status[repo] = f"完成（{time.monotonic() - started:.0f}s）"
+        except Exception as e:
+            LOG.error(f"[{repo}]生成报告失败：{str(e)}")
+            status[repo] = f"失败：{str(e)}"
+        yield dashboard_view(repos, status, reports)
+
+
+def dashboard_view(repos, status, reports):
+    """
+    进度表按选择顺序列出所有仓库，报告按选择顺序只列出已完成的仓库。
+    """
+    progress = f"已完成 {len(reports)}/{len(repos)}\n\n| 仓库 | 状态 |\n| --- | --- |\n"
+    progress += "".join(f"| {repo} | {status[repo]} |\n" for repo in repos)
+    finished = [repo for repo in repos if repo in reports]
+    combined = "\n\n---\n\n".join(reports[repo][0] for repo in finished)
+    return progress, combined, [reports[repo][1] for repo in finished]
@@ -1,42 +1,133 @@
+import io
+import json
 import os
+import re
+import shutil
+import threading
 from logger import LOG  # 导入日志模块
+import tracing  # 导入追踪模块，记录报告生成的 span
+from input_compactor import ITEM_LINE, log_savings  # 导入条目行格式与压缩效果日志函数
+from report_renderer import STRUCTURED_OUTPUT_INSTRUCTIONS, parse_report, render_markdown  # 导入结构化报告的解析与渲染
+from report_store import report_meta_path  # 导入报告模型记录的文件路径
+from state_file import atomic_write_json  # 导入状态文件的原子写入
 
 class ReportGenerator:
-    def __init__(self, llm, report_types):
+    ROLLING_SUMMARY_FILE = "rolling_summary.md"  # 每日滚动汇总文件名
+    ROLLING_STATE_FILE = "rolling_state.json"  # 记录已折叠进滚动汇总的主题报告
+    DELTA_STATE_FILE = "last_report.json"  # 记录上次报告及其覆盖的条目，用于增量报告
+    STRUCTURED_ATTEMPTS = 2  # 结构化输出解析失败时最多请求的次数，之后退回普通 Markdown 报告
+
+    def __init__(self, llm, report_types, compactor=None, incremental_daily=False, manifest=None, preload_prompts=False, structured=False):
         self.llm = llm  # 初始化时接受一个LLM实例，用于后续生成报告
         self.report_types = report_types
-        self.prompts = {}  # 存储所有预加载的提示信息
-        self._preload_prompts()
+        self.compactor = compactor  # 可选的输入压缩器（InputCompactor），为 None 时不压缩
+        self.incremental_daily = incremental_daily  # 是否在每次生成小时主题报告后增量更新每日滚动汇总
+        self._rolling_lock = threading.Lock()
+        self.manifest = manifest  # 可选的报告清单（ReportManifest），输入未变化时复用已有报告
+        self.structured = structured  # 是否要求 LLM 输出结构化 JSON，并在本地渲染为各种格式
+        self.prompts = {}  # 缓存已加载的提示信息，首次使用某类报告时才读取对应的提示文件
+        if preload_prompts:
+            self._preload_prompts()
 
     def _preload_prompts(self):
         """
-        预加载所有可能的提示文件，并存储在字典中。
+        预加载所有可能的提示文件，并存储在字典中（用于启动时提前校验提示文件是否齐全）。
         """
         for report_type in self.report_types:  # 使用从配置中加载的报告类型
+            self._get_prompt(report_type)
+
+    def _get_prompt(self, report_type):
+        """
+        返回指定报告类型的提示信息，首次使用时从文件加载并缓存。
+        """
+        prompt = self.prompts.get(report_type)
+        if prompt is None:
             prompt_file = f"prompts/{report_type}_{self.llm.model}_prompt.txt"
             if not os.path.exists(prompt_file):
                 LOG.error(f"提示文件不存在: {prompt_file}")
                 raise FileNotFoundError(f"提示文件未找到: {prompt_file}")
             with open(prompt_file, "r", encoding='utf-8') as file:
-                self.prompts[report_type] = file.read()
+                prompt = file.read()
+            self.prompts[report_type] = prompt
+        return prompt
 
-    def generate_github_report(self, markdown_file_path):
+    @tracing.traced("report.github")
+    def generate_github_report(self, markdown_file_path, model=None):
         """
         生成 GitHub 项目的报告，并保存为 {original_filename}_report.md。
+        :param model: 订阅指定的模型名称，为 None 时使用配置中的模型。
         """
         with open(markdown_file_path, 'r') as file:
             markdown_content = file.read()
 
-        system_prompt = self.prompts.get("github")
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
+        if self.compactor:
+            markdown_content, stats = self.compactor.compact(markdown_content)
+            log_savings(self._repo_of(markdown_content, markdown_file_path), stats)
+
+        system_prompt = self._get_prompt("github")
         report_file_path = os.path.splitext(markdown_file_path)[0] + "_report.md"
-        with open(report_file_path, 'w+') as report_file:
-            report_file.write(report)
+        key = f"github:{os.path.dirname(markdown_file_path)}"
+        report = self._generate_or_reuse(key, system_prompt, markdown_content, report_file_path, model)
+        self._write_report_meta(report_file_path, model)
 
         LOG.info(f"GitHub 项目报告已保存到 {report_file_path}")
         return report, report_file_path
 
+    @tracing.traced("report.github_delta")
+    def generate_github_delta_report(self, markdown_file_path, model=None):
+        """
+        生成 GitHub 项目的增量报告，只把上次报告之后新出现的条目连同上次报告一起交给 LLM，
+        并保存为 {original_filename}_delta_report.md。没有上次报告时退回完整报告。
+        """
+        with open(markdown_file_path, 'r') as file:
+            markdown_content = file.read()
+
+        repo_dir = os.path.dirname(markdown_file_path)
+        state = self._load_delta_state(repo_dir)
+        previous_report = self._read_previous_report(state)
+        numbers = [match.group('number') for match in map(ITEM_LINE.match, markdown_content.splitlines()) if match]
+
+        if previous_report is None:
+            report, report_file_path = self.generate_github_report(markdown_file_path, model)
+            self._save_delta_state(repo_dir, report_file_path, numbers)
+            return report, report_file_path
+
+        covered = set(state.get('items', []))
+        new_lines = []
+        new_count = 0
+        for line in markdown_content.splitlines():
+            match = ITEM_LINE.match(line)
+            if match and match.group('number') in covered:
+                continue
+            new_count += 1 if match else 0
+            new_lines.append(line)
+
+        repo = self._repo_of(markdown_content, markdown_file_path)
+        report_file_path = os.path.splitext(markdown_file_path)[0] + "_delta_report.md"
+        if new_count == 0:
+            # 没有新条目时不调用 LLM，也不替换作为下次上下文的上次报告
+            report = f"# {repo} 项目更新\n\n自上次报告以来没有新的进展。\n"
+            self._write_report(report_file_path, report)
+            if self.manifest is not None:
+                self.manifest.record(f"github_delta:{repo_dir}", "", report_file_path, unchanged=True)
+            LOG.info(f"[{repo}]自上次报告以来没有新条目，跳过 LLM 调用")
+            return report, report_file_path
+
+        new_content = "\n".join(new_lines) + "\n"
+        if self.compactor:
+            new_content, stats = self.compactor.compact(new_content)
+            log_savings(repo, stats)
+        LOG.info(f"[{repo}]增量报告：{len(numbers)} 个条目中有 {new_count} 个为新条目")
+
+        user_content = f"## 上次报告摘要\n\n{previous_report}\n\n## 自上次报告以来的新条目\n\n{new_content}"
+        system_prompt = self._get_prompt("github_delta")
+        report = self._generate_or_reuse(f"github_delta:{repo_dir}", system_prompt, user_content, report_file_path, model)
+        self._save_delta_state(repo_dir, report_file_path, numbers)
+
+        LOG.info(f"GitHub 项目增量报告已保存到 {report_file_path}")
+        return report, report_file_path
+
+    @tracing.traced("report.hn_topic")
     def generate_hn_topic_report(self, markdown_file_path):
         """
         生成 Hacker News 小时主题的报告，并保存为 {original_filename}_topic.md。
@@ -44,49 +135,244 @@ class ReportGenerator:
         with open(markdown_file_path, 'r') as file:
             markdown_content = file.read()
 
-        system_prompt = self.prompts.get("hacker_news_hours_topic")
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
+        system_prompt = self._get_prompt("hacker_news_hours_topic")
         report_file_path = os.path.splitext(markdown_file_path)[0] + "_topic.md"
-        with open(report_file_path, 'w+') as report_file:
-            report_file.write(report)
+        report = self._generate_or_reuse("hacker_news_hours_topic", system_prompt, markdown_content, report_file_path)
 
         LOG.info(f"Hacker News 热点主题报告已保存到 {report_file_path}")
+
+        if self.incremental_daily:
+            self._fold_into_rolling_summary(os.path.dirname(report_file_path))
         return report, report_file_path
 
+    @tracing.traced("report.hn_daily")
     def generate_hn_daily_report(self, directory_path):
         """
         生成 Hacker News 每日汇总的报告，并保存到 hacker_news/tech_trends/ 目录下。
         这里的输入是一个目录路径，其中包含所有由 generate_hn_topic_report 生成的 *_topic.md 文件。
         """
-        markdown_content = self._aggregate_topic_reports(directory_path)
-        system_prompt = self.prompts.get("hacker_news_daily_report")
+        system_prompt = self._get_prompt("hacker_news_daily_report")
 
         base_name = os.path.basename(directory_path.rstrip('/'))
         report_file_path = os.path.join("hacker_news/tech_trends/", f"{base_name}_trends.md")
 
         # 确保 tech_trends 目录存在
         os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
-        
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
+
+        summary_path = os.path.join(directory_path, self.ROLLING_SUMMARY_FILE)
+        if self.incremental_daily and os.path.exists(summary_path):
+            # 增量模式：只把尚未折叠的主题报告合并进滚动汇总，没有新内容时直接复用滚动汇总
+            with self._rolling_lock:
+                with open(summary_path, 'r') as file:
+                    summary = file.read()
+                pending = self._pending_topic_reports(directory_path)
+                if pending:
+                    report = self._call_llm(system_prompt, self._rolling_input(directory_path, summary, pending), report_file_path)
+                    # 合并后的汇总同时作为新的滚动汇总，之后的小时主题报告不会再重复折叠这些主题报告
+                    self._save_rolling_summary(directory_path, report, pending)
+                else:
+                    LOG.info("滚动汇总已是最新，直接作为每日汇总报告")
+                    report = summary
+        else:
+            markdown_content = self._aggregate_topic_reports(directory_path)
+            report = self._call_llm(system_prompt, markdown_content, report_file_path)
+
         with open(report_file_path, 'w+') as report_file:
             report_file.write(report)
-        
+
         LOG.info(f"Hacker News 每日汇总报告已保存到 {report_file_path}")
         return report, report_file_path
 
+    def is_unchanged(self, report_file_path):
+        """
+        判断该报告是否因输入未变化而复用了上一次的报告（未启用报告清单时总是返回 False）。
+        """
+        return self.manifest is not None and self.manifest.is_unchanged(report_file_path)
+
+    def _generate_or_reuse(self, key, system_prompt, markdown_content, report_file_path, model=None):
+        """
+        调用 LLM 生成报告并写入 report_file_path；启用报告清单且同一来源的输入与上次相同时，直接复用上次的报告。
+        """
+        if self.manifest is None:
+            report = self._call_llm(system_prompt, markdown_content, report_file_path, model)
+            self._write_report(report_file_path, report)
+            return report
+
+        # 首行标题只包含日期或时间窗口，不参与比较；模型取实际使用的名称，修改配置中的模型后会重新生成
+        llm_model = f"{self.llm.model}:{self.llm.model_name(model)}"
+        input_hash = self.manifest.hash_input(llm_model, self.structured, system_prompt, _strip_heading(markdown_content))
+        previous_path = self.manifest.lookup(key, input_hash)
+        if previous_path:
+            with open(previous_path, 'r') as file:
+                report = file.read()
+            if os.path.abspath(previous_path) != os.path.abspath(report_file_path):
+                self._write_report(report_file_path, report)
+                if os.path.exists(_structured_path(previous_path)):
+                    shutil.copyfile(_structured_path(previous_path), _structured_path(report_file_path))
+            LOG.info(f"输入未变化，复用已有报告：{previous_path}")
+            tracing.annotate(reused=True)
+            self.manifest.record(key, input_hash, report_file_path, unchanged=True)
+            return report
+
+        report = self._call_llm(system_prompt, markdown_content, report_file_path, model)
+        self._write_report(report_file_path, report)
+        self.manifest.record(key, input_hash, report_file_path)
+        return report
+
+    def _load_delta_state(self, repo_dir):
+        state_path = os.path.join(repo_dir, self.DELTA_STATE_FILE)
+        if not os.path.exists(state_path):
+            return {}
+        with open(state_path, 'r') as file:
+            return json.load(file)
+
+    def _save_delta_state(self, repo_dir, report_file_path, numbers):
+        with open(os.path.join(repo_dir, self.DELTA_STATE_FILE), 'w') as file:
+            json.dump({'report_file_path': report_file_path, 'items': numbers}, file, indent=4)
+
+    def _read_previous_report(self, state):
+        report_file_path = state.get('report_file_path')
+        if not report_file_path or not os.path.exists(report_file_path):
+            return None
+        with open(report_file_path, 'r') as file:
+            return file.read()
+
+    def load_structured(self, report_file_path):
+        """
+        读取与报告文件对应的结构化报告（{report}.json），不存在时返回 None。
+        """
+        structured_path = _structured_path(report_file_path)
+        if not os.path.exists(structured_path):
+            return None
+        with open(structured_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _call_llm(self, system_prompt, content, report_file_path, model=None):
+        """
+        调用 LLM 生成报告。结构化输出模式下要求 LLM 返回 JSON，校验后缓存到 {report}.json，
+        再在本地渲染为 Markdown 返回；其它输出格式由 report_renderer 从同一份 JSON 渲染。
+        LLM 返回的 JSON 无法解析或不符合格式时重试一次，仍然失败则退回普通的 Markdown 提示。
+        """
+        structured_path = _structured_path(report_file_path)
+        options = {'model': model} if model else {}  # 只在订阅指定了模型时覆盖配置中的模型
+        if self.structured:
+            for attempt in range(1, self.STRUCTURED_ATTEMPTS + 1):
+                response = self.llm.generate_report(system_prompt + STRUCTURED_OUTPUT_INSTRUCTIONS, content, json_mode=True, **options)
+                try:
+                    structured = parse_report(response)
+                except ValueError as e:
+                    LOG.warning(f"结构化报告第 {attempt} 次解析失败：{str(e)}")
+                    continue
+                with open(structured_path, 'w', encoding='utf-8') as file:
+                    json.dump(structured, file, ensure_ascii=False, indent=4)
+                return render_markdown(structured)
+            LOG.warning(f"结构化报告解析失败，退回普通 Markdown 报告：{report_file_path}")
+
+        # 删除之前结构化模式留下的同名 JSON，避免与新的 Markdown 报告不一致
+        if os.path.exists(structured_path):
+            os.remove(structured_path)
+        return self.llm.generate_report(system_prompt, content, **options)
+
+    def _write_report(self, report_file_path, report):
+        with open(report_file_path, 'w+') as report_file:
+            report_file.write(report)
+
+    def _write_report_meta(self, report_file_path, model=None):
+        # 记录生成报告所用的模型（{report}.meta.json），供界面与接口只复用同一模型生成的报告
+        meta = {'provider': self.llm.model, 'model': self.llm.model_name(model)}
+        with open(report_meta_path(report_file_path), 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False)
+
+    def _fold_into_rolling_summary(self, directory_path):
+        """
+        把目录下尚未折叠的小时主题报告合并进当天的滚动汇总（rolling_summary.md），
+        使每日汇总只需在最后做一次很小的增量更新。
+        """
+        with self._rolling_lock:
+            pending = self._pending_topic_reports(directory_path)
+            if not pending:
+                return
+
+            summary_path = os.path.join(directory_path, self.ROLLING_SUMMARY_FILE)
+            summary = ""
+            if os.path.exists(summary_path):
+                with open(summary_path, 'r') as file:
+                    summary = file.read()
+
+            system_prompt = self._get_prompt("hacker_news_daily_report")
+            summary = self.llm.generate_report(system_prompt, self._rolling_input(directory_path, summary, pending))
+            self._save_rolling_summary(directory_path, summary, pending)
+
+    def _save_rolling_summary(self, directory_path, summary, pending):
+        # 写入新的滚动汇总，并把本次合并的主题报告记为已折叠；调用方需持有 _rolling_lock
+        summary_path = os.path.join(directory_path, self.ROLLING_SUMMARY_FILE)
+        with open(summary_path, 'w') as file:
+            file.write(summary)
+        state = self._load_rolling_state(directory_path)
+        state['folded'] = sorted(set(state['folded']) | set(pending))
+        atomic_write_json(os.path.join(directory_path, self.ROLLING_STATE_FILE), state)
+        LOG.info(f"Hacker News 滚动汇总已更新：{summary_path}（新增 {len(pending)} 份主题报告）")
+
+    def _rolling_input(self, directory_path, summary, pending):
+        """
+        构建增量更新的 LLM 输入：此前的滚动汇总 + 新增的主题报告。
+        """
+        buffer = io.StringIO()
+        if summary:
+            buffer.write("# 今日此前的滚动汇总\n\n")
+            buffer.write(summary)
+            buffer.write("\n\n# 新增的热点话题报告\n\n")
+        self._copy_files(directory_path, pending, buffer)
+        return buffer.getvalue()
+
+    def _load_rolling_state(self, directory_path):
+        state_path = os.path.join(directory_path, self.ROLLING_STATE_FILE)
+        if not os.path.exists(state_path):
+            return {'folded': []}
+        with open(state_path, 'r') as file:
+            return json.load(file)
+
+    def _pending_topic_reports(self, directory_path):
+        folded = set(self._load_rolling_state(directory_path)['folded'])
+        return [filename for filename in self._topic_report_files(directory_path) if filename not in folded]
+
+    def _repo_of(self, markdown_content, markdown_file_path):
+        """
+        从进展 Markdown 的标题中解析仓库名，解析失败时退回到所在目录名。
+        """
+        match = re.search(r"^#\s+(?:Daily\s+)?Progress for (\S+)", markdown_content, re.MULTILINE)
+        if match:
+            return match.group(1)
+        return os.path.basename(os.path.dirname(markdown_file_path))
 
     def _aggregate_topic_reports(self, directory_path):
         """
-        聚合目录下所有以 '_topic.md' 结尾的 Markdown 文件内容，生成每日汇总报告的输入。
+        按文件名（即小时）顺序聚合目录下所有以 '_topic.md' 结尾的 Markdown 文件内容，生成每日汇总报告的输入。
         """
-        markdown_content = ""
-        for filename in os.listdir(directory_path):
-            if filename.endswith("_topic.md"):
-                with open(os.path.join(directory_path, filename), 'r') as file:
-                    markdown_content += file.read() + "\n"
-        return markdown_content
+        buffer = io.StringIO()
+        self._copy_files(directory_path, self._topic_report_files(directory_path), buffer)
+        return buffer.getvalue()
+
+    def _topic_report_files(self, directory_path):
+        return sorted(filename for filename in os.listdir(directory_path) if filename.endswith("_topic.md"))
+
+    def _copy_files(self, directory_path, filenames, buffer):
+        # 逐个文件流式写入缓冲区，避免反复的字符串拼接
+        for filename in filenames:
+            with open(os.path.join(directory_path, filename), 'r') as file:
+                shutil.copyfileobj(file, buffer)
+            buffer.write("\n")
+
+
+def _structured_path(report_file_path):
+    return os.path.splitext(report_file_path)[0] + ".json"
+
+
+def _strip_heading(markdown_content):
+    lines = markdown_content.lstrip().split("\n", 1)
+    if lines[0].startswith("# "):
+        return lines[1] if len(lines) > 1 else ""
+    return markdown_content
 
 
 if __name__ == '__main__':
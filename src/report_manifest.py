@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import threading
+from logger import LOG  # 导入日志模块
+from state_file import atomic_write_json, file_lock  # 导入状态文件的原子写入与进程间文件锁
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+class ReportManifest:
+    """
+    报告生成清单：记录每个输入来源最近一次的输入内容哈希与对应的报告文件，
+    输入未变化时可以直接复用已有报告，跳过 LLM 调用。
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        self._lock = threading.Lock()
+        self.entries = self._load()  # key -> {'input_hash', 'output_path', 'unchanged'}
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, manifest_config):
+        return cls(manifest_config.get('path', 'data/reports_manifest.json'))
+
+    @staticmethod
+    def hash_input(*parts):
+        """
+        计算输入内容的哈希，parts 通常包括模型、系统提示和 Markdown 正文。
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def lookup(self, key, input_hash):
+        """
+        如果该来源上次的输入哈希相同且报告文件仍然存在，返回该报告文件路径，否则返回 None。
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry['input_hash'] == input_hash and os.path.exists(entry['output_path']):
+            return entry['output_path']
+        return None
+
+    def record(self, key, input_hash, output_path, unchanged=False):
+        """
+        记录一次报告生成的结果，并立即持久化。
+        多个工作进程共用同一份清单，写入前先在文件锁内读入其它进程记录的条目，避免互相覆盖。
+        """
+        with self._lock, file_lock(self.manifest_file + ".lock"):
+            self.entries.update(self._load())
+            self.entries[key] = {'input_hash': input_hash, 'output_path': output_path, 'unchanged': unchanged}
+            atomic_write_json(self.manifest_file, self.entries)
+
+    def is_unchanged(self, output_path):
+        """
+        判断生成该报告文件的最近一次运行是否因输入未变化而复用了旧报告。
+        """
+        with self._lock:
+            return any(entry['output_path'] == output_path and entry['unchanged'] for entry in self.entries.values())
+
+    def _load(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"报告清单读取失败，将重新生成：{str(e)}")
+            return {}
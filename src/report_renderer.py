@@ -0,0 +1,173 @@
+import html
+import json
+import re
+
+# 结构化输出模式下追加到系统提示之后的格式要求
+STRUCTURED_OUTPUT_INSTRUCTIONS = """
+
+输出要求：请严格按照以下 JSON 格式输出报告，不要输出 JSON 以外的任何内容（包括 Markdown 代码块标记）：
+{"title": "报告标题", "period": "时间周期（可选）", "sections": [{"heading": "章节标题", "items": [{"text": "条目内容", "links": ["相关链接（可选）"]}]}]}
+"""
+
+# 结构化报告的 JSON Schema，供外部工具校验使用；validate_report 按同样的约束做轻量校验
+REPORT_SCHEMA = {
+    "type": "object",
+    "required": ["title", "sections"],
+    "properties": {
+        "title": {"type": "string"},
+        "period": {"type": "string"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["heading", "items"],
+                "properties": {
+                    "heading": {"type": "string"},
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": ["text"],
+                            "properties": {
+                                "text": {"type": "string"},
+                                "links": {"type": "array", "items": {"type": "string"}},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+# Slack 单个 section 文本块的长度上限
+SLACK_TEXT_LIMIT = 3000
+
+
+def parse_report(content):
+    """
+    解析 LLM 返回的 JSON 文本（容忍外层的 ```json 代码块），校验后返回报告字典。
+    校验失败时抛出 ValueError。
+    """
+    content = content.strip()
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", content, re.DOTALL)
+    if fenced:
+        content = fenced.group(1)
+    try:
+        report = json.loads(content)
+    except ValueError as e:
+        raise ValueError(f"结构化报告不是合法的 JSON：{e}")
+    validate_report(report)
+    return report
+
+
+def validate_report(report):
+    """
+    按 REPORT_SCHEMA 校验结构化报告，不符合时抛出 ValueError。
+    """
+    if not isinstance(report, dict):
+        raise ValueError("结构化报告必须是 JSON 对象")
+    _require_string(report, "title", "report")
+    if "period" in report and not isinstance(report["period"], str):
+        raise ValueError("report.period 必须是字符串")
+    if not isinstance(report.get("sections"), list):
+        raise ValueError("report.sections 必须是数组")
+    for i, section in enumerate(report["sections"]):
+        path = f"sections[{i}]"
+        if not isinstance(section, dict):
+            raise ValueError(f"{path} 必须是对象")
+        _require_string(section, "heading", path)
+        if not isinstance(section.get("items"), list):
+            raise ValueError(f"{path}.items 必须是数组")
+        for j, item in enumerate(section["items"]):
+            item_path = f"{path}.items[{j}]"
+            if not isinstance(item, dict):
+                raise ValueError(f"{item_path} 必须是对象")
+            _require_string(item, "text", item_path)
+            links = item.get("links", [])
+            if not isinstance(links, list) or not all(isinstance(link, str) for link in links):
+                raise ValueError(f"{item_path}.links 必须是字符串数组")
+
+
+def _require_string(obj, key, path):
+    if not isinstance(obj.get(key), str):
+        raise ValueError(f"{path}.{key} 必须是字符串")
+
+
+def render_markdown(report):
+    lines = [f"# {report['title']}", ""]
+    if report.get("period"):
+        lines += [f"## 时间周期：{report['period']}", ""]
+    for section in report["sections"]:
+        lines.append(f"## {section['heading']}")
+        for item in section["items"]:
+            lines.append(f"- {item['text']}")
+            lines.extend(f"  - {link}" for link in item.get("links", []))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_html(report):
+    parts = [f"<h1>{html.escape(report['title'])}</h1>"]
+    if report.get("period"):
+        parts.append(f"<h2>时间周期：{html.escape(report['period'])}</h2>")
+    for section in report["sections"]:
+        parts.append(f"<h2>{html.escape(section['heading'])}</h2>")
+        parts.append("<ul>")
+        for item in section["items"]:
+            links = "".join(
+                f' <a href="{html.escape(link, quote=True)}">{html.escape(link)}</a>' for link in item.get("links", [])
+            )
+            parts.append(f"<li>{html.escape(item['text'])}{links}</li>")
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+def render_text(report):
+    lines = [report["title"], "=" * len(report["title"])]
+    if report.get("period"):
+        lines.append(f"时间周期：{report['period']}")
+    for section in report["sections"]:
+        lines += ["", section["heading"]]
+        for item in section["items"]:
+            lines.append(f"  * {item['text']}")
+            lines.extend(f"    {link}" for link in item.get("links", []))
+    return "\n".join(lines) + "\n"
+
+
+def render_slack_blocks(report):
+    blocks = [{"type": "header", "text": {"type": "plain_text", "text": report["title"][:150]}}]
+    if report.get("period"):
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": f"时间周期：{_slack_escape(report['period'])}"}]})
+    for section in report["sections"]:
+        lines = [f"*{_slack_escape(section['heading'])}*"]
+        for item in section["items"]:
+            links = " ".join(f"<{link}>" for link in item.get("links", []))
+            lines.append(f"• {_slack_escape(item['text'])}" + (f" {links}" if links else ""))
+        text = "\n".join(lines)
+        # 超过 Slack 单块长度上限时拆成多个 section
+        for start in range(0, len(text), SLACK_TEXT_LIMIT):
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text[start:start + SLACK_TEXT_LIMIT]}})
+    return blocks
+
+
+def _slack_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+# 输出格式 -> 渲染函数，新增输出渠道只需在这里注册一个渲染函数
+RENDERERS = {
+    "markdown": render_markdown,
+    "html": render_html,
+    "text": render_text,
+    "slack": render_slack_blocks,
+}
+
+
+def render(report, output_format):
+    """
+    把结构化报告渲染为指定格式（markdown / html / text / slack）。
+    """
+    if output_format not in RENDERERS:
+        raise ValueError(f"不支持的输出格式: {output_format}")
+    return RENDERERS[output_format](report)
@@ -0,0 +1,122 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from logger import LOG  # 导入日志模块
+
+# 守护进程与界面生成的完整报告文件名：{开始日期}_to_{结束日期}_report.md（不包括增量报告）
+REPORT_FILE = re.compile(r'^(?P<since>\d{4}-\d{2}-\d{2})_to_(?P<until>\d{4}-\d{2}-\d{2})_report\.md$')
+
+
+def report_meta_path(report_file_path):
+    """
+    返回记录报告生成模型的文件路径：{report}.meta.json。
+    """
+    return os.path.splitext(report_file_path)[0] + ".meta.json"
+
+
+class StoredReport:
+    """
+    已保存的一份仓库报告。
+    """
+
+    def __init__(self, path, since, until, generated_at, provider=None, model=None):
+        self.path = path
+        self.since = since
+        self.until = until
+        self.generated_at = generated_at  # 报告文件的修改时间
+        self.provider = provider  # 生成报告的模型类型与模型名称，没有记录时为 None
+        self.model = model
+
+    def read(self):
+        with open(self.path, 'r') as file:
+            return file.read()
+
+
+class ReportStore:
+    """
+    查找守护进程或界面此前为某个仓库、某个时间窗口生成的最新报告，并判断它是否仍然新鲜。
+    """
+
+    def __init__(self, base_dir='daily_progress', max_age_minutes=60):
+        """
+        :param base_dir: 仓库进展与报告的保存目录。
+        :param max_age_minutes: 报告生成后在该时长内视为新鲜，不需要重新生成。
+        """
+        self.base_dir = base_dir
+        self.max_age = max_age_minutes * 60
+
+    def latest(self, repo, days, provider=None, model=None):
+        """
+        返回覆盖 days 天的最新报告（按结束日期、再按生成时间），没有时返回 None。
+        指定 provider 与 model 时只返回记录为该模型生成的报告。
+        """
+        repo_dir = os.path.join(self.base_dir, repo.replace("/", "_"))
+        if not os.path.isdir(repo_dir):
+            return None
+        latest = None
+        for name in os.listdir(repo_dir):
+            match = REPORT_FILE.match(name)
+            if not match:
+                continue
+            since, until = date.fromisoformat(match.group('since')), date.fromisoformat(match.group('until'))
+            if (until - since).days != days:
+                continue
+            path = os.path.join(repo_dir, name)
+            report = StoredReport(path, since, until, os.path.getmtime(path), **_read_meta(path))
+            if provider is not None and (report.provider, report.model) != (provider, model):
+                continue
+            if latest is None or (report.until, report.generated_at) > (latest.until, latest.generated_at):
+                latest = report
+        return latest
+
+    def is_fresh(self, report, now=None):
+        """
+        报告覆盖到今天且生成时间未超过 max_age 时视为新鲜。
+        """
+        now = now or time.time()
+        return report.until == date.fromtimestamp(now) and now - report.generated_at < self.max_age
+
+
+def _read_meta(report_file_path):
+    # 旧版本生成的报告没有模型记录，视为未知模型
+    try:
+        with open(report_meta_path(report_file_path), 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return {'provider': meta.get('provider'), 'model': meta.get('model')}
+
+
+class BackgroundRefresher:
+    """
+    在后台线程池中刷新报告；同一个键（例如 仓库+时间窗口+模型）同时只有一次刷新，
+    后到的请求直接等待进行中的那一次，不会重复调用 GitHub API 与 LLM。
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-refresh")
+        self._in_flight = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        """
+        提交刷新任务并返回 Future；该键已有进行中的刷新时返回同一个 Future。
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None and not future.done():
+                LOG.debug(f"[后台刷新]{key} 已在刷新中，等待进行中的结果")
+                return future
+            future = self._executor.submit(func, *args)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
@@ -0,0 +1,307 @@
+import heapq  # 导入heapq库，按下一次执行时间维护任务堆
+import random  # 导入random库，用于计算抖动
+import threading  # 导入threading库，调度线程与任务工作线程
+import time  # 导入time库，获取当前时间
+from datetime import datetime, timedelta  # 导入日期时间类型，用于计算 cron 的下一次触发时间
+from logger import LOG  # 导入日志模块
+import metrics  # 导入指标模块，记录任务耗时与最近一次成功时间
+import tracing  # 导入追踪模块，每次任务运行是一个 trace 的根 span
+
+# 任务重叠策略：上一次运行尚未结束时再次到期的处理方式
+OVERLAP_SKIP = "skip"  # 跳过本次运行
+OVERLAP_QUEUE = "queue"  # 等上一次运行结束后再补跑一次（多次到期合并为一次）
+OVERLAP_ALLOW = "allow"  # 允许并发运行
+OVERLAP_POLICIES = (OVERLAP_SKIP, OVERLAP_QUEUE, OVERLAP_ALLOW)
+
+
+class CronTrigger:
+    """
+    类 cron 表达式触发器，格式为 "分 时 日 月 周"，每个字段支持 *、*/n、a-b、a-b/n 和逗号分隔的列表。
+    周字段中 0 和 7 都表示周日。日和周同时受限时，与 cron 一样满足其一即可。
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式必须包含 5 个字段：{expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        # cron 中周日为 0（或 7），datetime.weekday() 中周一为 0，这里统一转换为 datetime 的表示
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.day_restricted = not fields[2].startswith("*")
+        self.weekday_restricted = not fields[4].startswith("*")
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"cron 步长必须为正数：{field}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron 字段超出范围 [{low}, {high}]：{field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, timestamp):
+        """
+        返回严格晚于 timestamp 的下一次触发时间（时间戳）。
+        不匹配时按月、日、时、分逐级跳过，而不是逐分钟检查。
+        """
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"cron 表达式没有可触发的时间：{self.expression}")
+
+    def __repr__(self):
+        return f"cron({self.expression})"
+
+
+class IntervalTrigger:
+    """
+    固定间隔触发器；可指定首次触发时间，之后每隔 interval 秒触发一次。
+    """
+
+    def __init__(self, interval, first_run=None):
+        """
+        :param interval: 触发间隔（秒）。
+        :param first_run: 首次触发的时间戳，默认为创建后一个间隔。
+        """
+        if interval <= 0:
+            raise ValueError("触发间隔必须为正数")
+        self.interval = interval
+        self.first_run = first_run
+
+    def next_after(self, timestamp):
+        if self.first_run is None:
+            return timestamp + self.interval
+        if timestamp < self.first_run:
+            return self.first_run
+        # 保持与首次触发时间对齐，避免每次运行的耗时累积成漂移
+        periods = int((timestamp - self.first_run) // self.interval) + 1
+        return self.first_run + periods * self.interval
+
+    def __repr__(self):
+        return f"every({self.interval}s)"
+
+
+class Job:
+    """
+    一个定时任务及其运行状态。
+    """
+
+    def __init__(self, name, func, trigger, args=(), overlap=OVERLAP_SKIP, jitter=0):
+        """
+        :param name: 任务名称，用于日志。
+        :param func: 任务函数。
+        :param trigger: 触发器（CronTrigger 或 IntervalTrigger）。
+        :param args: 调用任务函数时的参数。
+        :param overlap: 重叠策略，skip / queue / allow 之一。
+        :param jitter: 每次触发时间上随机增加的最大秒数，避免多个进程同时请求外部服务。
+        """
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"未知的重叠策略：{overlap}")
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.args = args
+        self.overlap = overlap
+        self.jitter = jitter
+        self.next_run = None
+        self.running = 0  # 正在运行的实例数
+        self.pending = False  # queue 策略下是否有等待补跑的运行
+        self.replaced_by = None  # 运行期间被同名任务替换时指向新任务，运行结束后的计数与补跑都记在新任务上
+
+    def schedule_next(self, now):
+        self.next_run = self.trigger.next_after(now) + (random.uniform(0, self.jitter) if self.jitter else 0)
+        return self.next_run
+
+
+class Scheduler:
+    """
+    基于截止时间堆的调度器：调度线程只在最近的截止时间到达（或任务表变化）时醒来，
+    到期的任务交给独立的工作线程执行，长时间运行的任务不会推迟其他任务。
+    """
+
+    def __init__(self):
+        self._heap = []  # (下一次运行时间, 序号, 任务)
+        self._counter = 0
+        self._jobs = {}
+        self._condition = threading.Condition(threading.RLock())
+        self._stopped = False
+        self._running = False  # 调度循环是否正在运行
+        self._workers = set()
+
+    def add_job(self, name, func, trigger, args=(), overlap=OVERLAP_SKIP, jitter=0):
+        """
+        添加一个定时任务，返回 Job 实例。同名任务会被替换。
+        """
+        job = Job(name, func, trigger, args, overlap, jitter)
+        with self._condition:
+            previous = self._jobs.get(name)
+            if previous is not None:
+                # 替换（例如重新加载配置）时沿用旧任务的运行状态，重叠策略对仍在运行的旧实例继续生效
+                job.running, job.pending = previous.running, previous.pending
+                previous.replaced_by = job
+            self._jobs[name] = job
+            self._push(job, time.time())
+            self._condition.notify()
+        LOG.info(f"[调度器]已添加任务 {name}（{trigger}，重叠策略 {overlap}），下一次运行：{_format(job.next_run)}")
+        return job
+
+    def remove_job(self, name):
+        with self._condition:
+            # 堆中的旧条目在弹出时根据任务表识别并丢弃
+            self._jobs.pop(name, None)
+            self._condition.notify()
+
+    def jobs(self):
+        with self._condition:
+            return list(self._jobs.values())
+
+    def _push(self, job, now):
+        self._counter += 1
+        heapq.heappush(self._heap, (job.schedule_next(now), self._counter, job))
+
+    def run_now(self, name):
+        """
+        立即运行一次指定任务（遵循其重叠策略），不影响下一次计划运行时间。
+        """
+        with self._condition:
+            job = self._jobs[name]
+        self._dispatch(job)
+
+    def run_forever(self):
+        """
+        在当前线程运行调度循环，直到 stop() 被调用。
+        """
+        LOG.info("[调度器]开始运行")
+        with self._condition:
+            self._running = True
+            while not self._stopped:
+                now = time.time()
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                next_run, _, job = self._heap[0]
+                if next_run > now:
+                    # 睡到最近的截止时间；添加任务或停止时会被提前唤醒
+                    self._condition.wait(next_run - now)
+                    continue
+                heapq.heappop(self._heap)
+                if self._jobs.get(job.name) is not job:
+                    continue  # 任务已被移除或替换
+                self._push(job, now)
+                self._dispatch(job)  # 只启动工作线程，不在调度线程中执行任务
+            self._running = False
+        LOG.info("[调度器]已停止")
+
+    def health(self):
+        """
+        返回 (调度器是否存活, 说明)，供 /healthz 使用。
+        """
+        with self._condition:
+            if not self._running:
+                return False, "scheduler not running"
+            if self._heap and self._heap[0][0] < time.time() - 60:
+                # 最近的截止时间已过去一分钟仍未被处理，说明调度循环被阻塞
+                return False, f"scheduler stalled, job {self._heap[0][2].name} overdue"
+            return True, f"ok, {len(self._jobs)} jobs, {sum(job.running for job in self._jobs.values())} running"
+
+    def stop(self, wait=False, timeout=None):
+        """
+        停止调度循环；wait 为 True 时等待正在运行的任务结束。
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join(timeout)
+
+    def _dispatch(self, job):
+        with self._condition:
+            if job.running and job.overlap == OVERLAP_SKIP:
+                LOG.warning(f"[调度器]任务 {job.name} 上一次运行尚未结束，跳过本次运行")
+                return
+            if job.running and job.overlap == OVERLAP_QUEUE:
+                LOG.info(f"[调度器]任务 {job.name} 上一次运行尚未结束，结束后补跑")
+                job.pending = True
+                return
+            job.running += 1
+            worker = threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.name}", daemon=True)
+            self._workers.add(worker)
+        worker.start()
+
+    def _run_job(self, job):
+        while True:
+            start = time.time()
+            try:
+                with tracing.span(f"job.{job.name}"):
+                    job.func(*job.args)
+                LOG.info(f"[调度器]任务 {job.name} 运行完成，耗时 {time.time() - start:.1f}s")
+                metrics.JOB_RUNS.inc(job=job.name, result="success")
+                metrics.JOB_LAST_SUCCESS.set(time.time(), job=job.name)
+            except Exception as e:
+                LOG.error(f"[调度器]任务 {job.name} 运行失败：{str(e)}")
+                metrics.JOB_RUNS.inc(job=job.name, result="failure")
+            metrics.JOB_DURATION.observe(time.time() - start, job=job.name)
+            with self._condition:
+                while job.replaced_by is not None:
+                    job = job.replaced_by
+                if job.pending and not self._stopped:
+                    job.pending = False
+                    continue  # 在同一个工作线程中补跑排队的运行
+                job.running -= 1
+                self._workers.discard(threading.current_thread())
+                return
+
+
+def daily_trigger(exec_time, every_days=1):
+    """
+    根据 "HH:MM" 形式的执行时间创建每 every_days 天触发一次的触发器。
+    """
+    hour, minute = (int(value) for value in exec_time.split(":"))
+    if every_days == 1:
+        return CronTrigger(f"{minute} {hour} * * *")
+    first_run = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if first_run.timestamp() <= time.time():
+        first_run += timedelta(days=1)
+    return IntervalTrigger(every_days * 86400, first_run.timestamp())
+
+
+def _format(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,119 @@
+import json
+import time
+import requests  # 导入requests库用于调用 Slack Incoming Webhook
+from logger import LOG  # 导入日志模块
+from notification_channel import NotificationChannel  # 导入通知渠道基类
+from report_renderer import SLACK_TEXT_LIMIT, render_slack_blocks  # 导入 Slack Block 渲染
+
+# Slack 单条消息最多包含的 block 数
+SLACK_MAX_BLOCKS = 50
+
+
+class SlackNotifier(NotificationChannel):
+    """
+    通过 Slack Incoming Webhook 以 Block 消息的形式发送报告。
+    """
+
+    channel_name = "slack"
+    display_name = "Slack"
+
+    def __init__(self, slack_settings, outbox=None):
+        settings = slack_settings or {}
+        # Slack Webhook 限制约每秒 1 条消息；batch 为 True 时把一次运行中的多个报告合并成分组消息
+        super().__init__(outbox, settings.get('max_per_minute', 60), settings.get('batch', True))
+        self.webhook_url = settings.get('webhook_url')
+        self.max_retries = settings.get('max_retries', 3)  # 遇到 429 限流时的重试次数
+
+    def is_configured(self):
+        return bool(self.webhook_url) and self.webhook_url.startswith("https://")
+
+    def render(self, subject, report, structured=None):
+        blocks = render_slack_blocks(structured) if structured else markdown_to_blocks(report)
+        return json.dumps({"text": subject, "blocks": blocks}, ensure_ascii=False)
+
+    def combine(self, items):
+        # 多个报告之间用分割线隔开，合并后由 split 按 Slack 的 block 数限制拆分为多条分组消息
+        blocks = []
+        for _, body in items:
+            if blocks:
+                blocks.append({"type": "divider"})
+            blocks.extend(json.loads(body)["blocks"])
+        subject = f"GitHubSentinel 报告汇总（{len(items)} 份）"
+        return [(subject, json.dumps({"text": subject, "blocks": blocks}, ensure_ascii=False))]
+
+    def split(self, subject, body):
+        blocks = json.loads(body)["blocks"]
+        if len(blocks) <= SLACK_MAX_BLOCKS:
+            return [(subject, body)]
+        chunks = [blocks[i:i + SLACK_MAX_BLOCKS] for i in range(0, len(blocks), SLACK_MAX_BLOCKS)]
+        return [
+            (f"{subject} ({index}/{len(chunks)})",
+             json.dumps({"text": f"{subject} ({index}/{len(chunks)})", "blocks": chunk}, ensure_ascii=False))
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+
+    def deliver(self, subject, body, recipient=None):
+        """
+        把一条 Block 消息 POST 到 Webhook；遇到 429 时按 Retry-After 等待后重试。
+        :return: 是否发送成功
+        """
+        LOG.info(f"准备发送 Slack 消息:{subject}")
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = requests.post(
+                    recipient or self.webhook_url, data=body.encode('utf-8'),
+                    headers={'Content-Type': 'application/json'}, timeout=10,
+                )
+            except Exception as e:
+                LOG.error(f"发送 Slack 消息失败：{str(e)}")
+                return False
+            if response.status_code == 429 and attempt < self.max_retries:
+                retry_after = float(response.headers.get('Retry-After', 1))
+                LOG.warning(f"Slack 限流，{retry_after} 秒后重试")
+                time.sleep(retry_after)
+                continue
+            if response.status_code == 200:
+                LOG.info("Slack 消息发送成功！")
+                return True
+            LOG.error(f"发送 Slack 消息失败：{response.status_code} {response.text}")
+            return False
+        return False
+
+
+def markdown_to_blocks(report):
+    """
+    把 Markdown 报告粗略转换为 Slack Block：标题行转为加粗，正文按行拼接并按长度上限切分。
+    """
+    blocks = []
+    lines = []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        lines.clear()
+        while text:
+            # 尽量在换行处切分，保证单个 section 不超过长度上限
+            cut = text.rfind("\n", 0, SLACK_TEXT_LIMIT) if len(text) > SLACK_TEXT_LIMIT else len(text)
+            cut = cut if cut > 0 else SLACK_TEXT_LIMIT
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text[:cut]}})
+            text = text[cut:].lstrip("\n")
+
+    for line in report.strip().splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            flush()
+            lines.append(f"*{stripped.lstrip('#').strip()}*")
+        elif stripped.startswith(("- ", "* ")):
+            lines.append(f"• {stripped[2:]}")
+        else:
+            lines.append(stripped)
+    flush()
+    return blocks
+
+
+if __name__ == '__main__':
+    from config import Config
+
+    config = Config()
+    notifier = SlackNotifier(config.slack)
+    notifier.notify_github_report("DjangoPeng/openai-quickstart", "# DjangoPeng/openai-quickstart 项目进展\n\n## 新增功能\n- 添加嵌入集成测试\n")
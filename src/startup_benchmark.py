@@ -0,0 +1,68 @@
+import argparse  # 导入argparse库，用于处理命令行参数
+import os  # 导入os模块，用于构建路径与环境变量
+import subprocess  # 导入subprocess库，在独立进程中测量导入耗时
+import sys  # 导入sys库，获取当前 Python 解释器
+import time  # 导入time库，用于统计总耗时
+from collections import defaultdict
+
+# 需要测量启动耗时的入口模块
+ENTRY_POINTS = ["command_tool", "daemon_process", "gradio_server"]
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+
+def measure(module, runs=3):
+    """
+    在新进程中以 -X importtime 导入入口模块，返回 (最短总耗时秒, 模块导入耗时微秒, 按顶层包汇总的自身耗时)。
+    导入失败时抛出 RuntimeError。
+    """
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "导入失败")
+        if best is None or elapsed < best[0]:
+            best = (elapsed, result.stderr)
+
+    elapsed, stderr = best
+    module_us = 0
+    by_package = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not self_us.isdigit():
+            continue  # 跳过表头
+        by_package[name.split(".")[0]] += int(self_us)
+        if name == module:
+            module_us = int(cumulative_us)
+    return elapsed, module_us, by_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量各入口模块的启动耗时（基于 python -X importtime）')
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS, help='要测量的入口模块，默认测量全部入口')
+    parser.add_argument('--runs', type=int, default=3, help='每个入口的测量次数，取最快的一次')
+    parser.add_argument('--top', type=int, default=5, help='显示导入耗时最高的顶层包数量')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            elapsed, module_us, by_package = measure(module, args.runs)
+        except RuntimeError as e:
+            print(f"{module}: 无法导入（{e}）")
+            continue
+        print(f"{module}: 进程总耗时 {elapsed * 1000:.0f} ms，模块导入 {module_us / 1000:.0f} ms")
+        for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+            print(f"  {package:<24} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import fcntl  # 导入fcntl库，用于进程间的文件锁
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+
+def atomic_write_json(path, data):
+    """
+    把数据以 JSON 格式原子地写入文件：先写临时文件再替换，读取方不会看到写了一半的文件，
+    进程中途退出也不会损坏原文件。临时文件名带有进程号与线程号，多个写入方不会写到同一个临时文件。
+    :param path: 目标文件路径，所在目录不存在时自动创建。
+    :param data: 可序列化为 JSON 的数据。
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    在上下文期间持有进程间的排他锁。被原子替换的文件本身不能加锁，因此锁加在单独的锁文件上，
+    多个进程读-合并-写同一个状态文件时用它互斥，避免互相覆盖对方的记录。
+    :param lock_path: 锁文件路径，通常为 "<状态文件>.lock"。
+    """
+    directory = os.path.dirname(lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
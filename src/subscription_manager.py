@@ -1,27 +1,346 @@
+import bisect
 import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from state_file import atomic_write_json, file_lock  # 导入状态文件的原子写入与进程间文件锁
+from wildcard_expander import is_wildcard  # 导入通配订阅的判断函数
+
+# 每个订阅可单独设置的参数，未设置时使用全局配置
+SETTINGS = (
+    "frequency_days",  # 报告频率（天），GitHub 任务每次运行时只处理到期的仓库
+    "window_days",  # 每份报告覆盖的天数
+    "labels",  # 只统计带有这些标签的 Issues
+    "model",  # 生成报告使用的模型名称
+    "priority",  # 优先级，数值越大越先处理
+)
 
 class SubscriptionManager:
-    def __init__(self, subscriptions_file):
+    """
+    管理订阅列表。订阅项可以是仓库名字符串（通知发往默认收件人），
+    也可以是 {"repo": "owner/repo", "recipients": ["a@example.com"], "frequency_days": 7, ...} 形式，
+    为仓库指定收件人以及 SETTINGS 中的参数。
+    仓库名也可以是 org:<组织> 或 topic:<主题> 形式的通配订阅，由 WildcardExpander 展开为具体仓库，
+    展开得到的仓库继承通配订阅的收件人与参数（同时被显式订阅时，以显式订阅的参数为准）。
+
+    内存中以 仓库 -> 收件人列表 的索引保存订阅，并维护 收件人 -> 仓库 的反向索引与按下次到期时间排序的列表，
+    查找、按收件人查询与“当前到期”查询都不需要遍历整个订阅列表；
+    修改时持有进程间文件锁，先重新读取文件合并其它进程（守护进程或命令行工具）的修改，再原子地写回。
+    """
+
+    def __init__(self, subscriptions_file, state_file=None, grace_hours=1, expander=None):
+        """
+        :param state_file: 记录各仓库上次报告时间的状态文件，为 None 时只保存在内存中。
+        :param grace_hours: 判断是否到期时的宽限时间，避免调度抖动导致刚好差几分钟而被推迟一个周期。
+        :param expander: 可选的通配订阅展开器（WildcardExpander），为 None 时通配订阅不展开。
+        """
         self.subscriptions_file = subscriptions_file
+        self.lock_file = subscriptions_file + ".lock"  # 进程间互斥使用的锁文件（订阅文件会被原子替换，不能直接加锁）
+        self.state_file = state_file
+        self.grace = grace_hours * 3600
+        self.expander = expander
+        self._lock = threading.RLock()
+        self._state_mtime = None  # 最近一次读取或写入时状态文件的修改时间
+        self.last_runs = self._load_state()  # repo -> 上次报告的时间戳
         self.subscriptions = self.load_subscriptions()
-    
+
+    @property
+    def subscriptions(self):
+        """
+        与订阅文件格式相同的订阅项列表，由索引生成。
+        """
+        entries = []
+        for repo, recipients in self._index.items():
+            settings = self._settings.get(repo, {})
+            named = [recipient for recipient in recipients if recipient is not None]
+            # 默认收件人用仓库名字符串表示；只有默认收件人时参数写在不含 recipients 的订阅项中
+            if None in recipients and (named or not settings):
+                entries.append(repo)
+            if named:
+                entries.append({"repo": repo, "recipients": named, **settings})
+            elif settings:
+                entries.append({"repo": repo, **settings})
+        return entries
+
+    @subscriptions.setter
+    def subscriptions(self, entries):
+        index, settings = {}, {}
+        for entry in entries:
+            repo = _repo_of(entry)
+            recipients = index.setdefault(repo, [])
+            entry_recipients = entry.get('recipients') if isinstance(entry, dict) else None
+            for recipient in entry_recipients or [None]:
+                if recipient not in recipients:
+                    recipients.append(recipient)
+            if isinstance(entry, dict):
+                settings.setdefault(repo, {}).update({key: entry[key] for key in SETTINGS if key in entry})
+        with self._lock:
+            self._index, self._settings = index, settings
+            self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        # 展开通配订阅（只读取缓存）得到具体仓库 -> 收件人与参数，
+        # 再建立 收件人 -> 仓库（None 表示默认收件人）的反向索引，以及按 (下次到期时间, 仓库) 排序的到期列表
+        self.expanded = {}
+        if self.expander is not None:
+            self.expanded = {key: self.expander.cached(key) for key in self._index if is_wildcard(key)}
+        self._repos, self._repo_settings = {}, {}
+        for key, recipients in self._index.items():
+            if not is_wildcard(key):
+                self._repos[key] = list(recipients)
+                self._repo_settings[key] = dict(self._settings.get(key, {}))
+        for key, repos in self.expanded.items():
+            for repo in repos:
+                merged = self._repos.setdefault(repo, [])
+                merged.extend(recipient for recipient in self._index[key] if recipient not in merged)
+                settings = self._repo_settings.setdefault(repo, {})
+                for name, value in self._settings.get(key, {}).items():
+                    settings.setdefault(name, value)
+
+        self._by_recipient = {}
+        for repo, recipients in self._repos.items():
+            for recipient in recipients:
+                self._by_recipient.setdefault(recipient, {})[repo] = None
+        self._due = sorted((self._next_due(repo), repo) for repo in self._repos)
+
+    def _next_due(self, repo):
+        last_run = self.last_runs.get(repo)
+        if last_run is None:
+            return 0
+        return last_run + self._repo_settings.get(repo, {}).get('frequency_days', 0) * 86400 - self.grace
+
+    def sync_wildcards(self):
+        """
+        只读取其它进程（协调进程或单进程任务）更新过的展开缓存，不访问网络；供工作进程在处理每个仓库前调用。
+        """
+        if self.expander is not None and self.expander.sync():
+            with self._lock:
+                self._rebuild_indexes()
+
+    def refresh_wildcards(self, now=None):
+        """
+        重新展开缓存已超过 TTL 的通配订阅（会访问 GitHub API），并读取其它进程更新过的展开缓存。
+        未超过 TTL 时不访问网络，由协调进程或单进程任务在每次运行开始时调用。
+        """
+        if self.expander is None:
+            return
+        changed = self.expander.sync()
+        with self._lock:
+            patterns = [key for key in self._index if is_wildcard(key)]
+        for pattern in patterns:
+            if self.expander.is_stale(pattern, now):
+                self.expander.refresh(pattern, now)
+                changed = True
+        if changed:
+            with self._lock:
+                self._rebuild_indexes()
+
     def load_subscriptions(self):
         with open(self.subscriptions_file, 'r') as f:
             return json.load(f)
-    
+
+    def reload(self):
+        """
+        重新读取订阅文件（例如收到 SIGHUP 或其它进程修改了订阅之后）。
+        """
+        self.subscriptions = self.load_subscriptions()
+
     def save_subscriptions(self):
-        with open(self.subscriptions_file, 'w') as f:
-            json.dump(self.subscriptions, f, indent=4)
-    
+        atomic_write_json(self.subscriptions_file, self.subscriptions)
+
     def list_subscriptions(self):
         return self.subscriptions
-    
-    def add_subscription(self, repo):
-        if repo not in self.subscriptions:
-            self.subscriptions.append(repo)
-            self.save_subscriptions()
-    
-    def remove_subscription(self, repo):
-        if repo in self.subscriptions:
-            self.subscriptions.remove(repo)
-            self.save_subscriptions()
\ No newline at end of file
+
+    def list_entries(self):
+        """
+        返回订阅文件中的仓库与通配订阅（不展开，保持订阅顺序）。
+        """
+        return list(self._index)
+
+    def list_repos(self):
+        """
+        返回去重后的具体仓库列表（通配订阅已展开），多个收件人订阅同一仓库时每次运行只获取和总结一次。
+        """
+        return list(self._repos)
+
+    def recipients_for(self, repo):
+        """
+        返回订阅了指定仓库（或通配订阅）的收件人列表；None 表示渠道的默认收件人。
+        """
+        return list(self._repos.get(repo) or self._index.get(repo, []))
+
+    def settings_for(self, repo):
+        """
+        返回仓库（或通配订阅）的订阅参数（只包含单独设置过的 SETTINGS 项）。
+        """
+        return dict(self._repo_settings.get(repo) or self._settings.get(repo, {}))
+
+    def by_recipient(self, recipient):
+        """
+        返回某个收件人订阅的仓库列表；recipient 为 None 时返回发往默认收件人的仓库。
+        """
+        return list(self._by_recipient.get(recipient, {}))
+
+    def due_now(self, now=None):
+        """
+        返回当前到期的仓库：从未报告过，或距上次报告已超过各自的 frequency_days。
+        只读取到期列表中早于当前时间的部分，结果按优先级从高到低、同优先级按到期时间排序。
+        先合并其它进程（例如工作进程）写入状态文件的报告时间。
+        """
+        now = now or time.time()
+        self.sync_state()
+        with self._lock:
+            due = self._due[:bisect.bisect_right(self._due, now, key=lambda item: item[0])]
+            return [repo for _, repo in sorted(due, key=lambda item: (-self._repo_settings[item[1]].get('priority', 0), item[0]))]
+
+    def mark_run(self, repo, run_at=None):
+        """
+        记录仓库完成了一次报告，据此计算下次到期时间。
+        :param run_at: 本次运行开始的时间，默认为当前时间。
+        """
+        with self._lock:
+            self._set_last_run(repo, run_at or time.time())
+            if self.state_file:
+                self._save_state()
+
+    def sync_state(self):
+        """
+        状态文件被其它进程更新后，合并其中较新的报告时间；文件未变化时不读取。
+        :return: 是否重新读取了状态文件
+        """
+        mtime = self._state_file_mtime()
+        with self._lock:
+            if mtime is None or mtime == self._state_mtime:
+                return False
+            self._merge_state(self._load_state())
+            return True
+
+    def _merge_state(self, state):
+        for repo, run_at in state.items():
+            if run_at > self.last_runs.get(repo, 0):
+                self._set_last_run(repo, run_at)
+
+    def _set_last_run(self, repo, run_at):
+        # 只移动该仓库在到期列表中的位置，不重新排序整个列表
+        if repo in self._repos:
+            self._due.pop(bisect.bisect_left(self._due, (self._next_due(repo), repo)))
+        self.last_runs[repo] = run_at
+        if repo in self._repos:
+            bisect.insort(self._due, (self._next_due(repo), repo))
+
+    def _state_file_mtime(self):
+        if not self.state_file:
+            return None
+        try:
+            return os.path.getmtime(self.state_file)
+        except OSError:
+            return None
+
+    def _load_state(self):
+        mtime = self._state_file_mtime()
+        if mtime is None:
+            return {}
+        with open(self.state_file, 'r') as f:
+            state = json.load(f)
+        self._state_mtime = mtime
+        return state
+
+    def _save_state(self):
+        # 多个进程（工作进程）可能同时记录，先合并文件中其它进程的记录再原子写回
+        with file_lock(self.lock_file):
+            self._merge_state(self._load_state())
+            atomic_write_json(self.state_file, self.last_runs)
+            self._state_mtime = self._state_file_mtime()
+
+    def update_settings(self, repo, **settings):
+        """
+        设置仓库的订阅参数，值为 None 的参数会被清除；仓库尚未订阅时同时为默认收件人添加订阅。
+        """
+        unknown = set(settings) - set(SETTINGS)
+        if unknown:
+            raise ValueError(f"不支持的订阅参数：{sorted(unknown)}")
+        with self._modify() as index:
+            index.setdefault(repo, [None])
+            current = self._settings.setdefault(repo, {})
+            for key, value in settings.items():
+                if value is None:
+                    current.pop(key, None)
+                else:
+                    current[key] = value
+
+    def add_subscription(self, repo, recipient=None):
+        """
+        添加订阅；指定 recipient 时把该收件人加入此仓库的按收件人订阅中。
+        """
+        return self.add_subscriptions([repo], recipient) > 0
+
+    def remove_subscription(self, repo, recipient=None):
+        """
+        移除订阅；指定 recipient 时只移除该收件人，否则移除此仓库的所有订阅项。
+        """
+        return self.remove_subscriptions([repo], recipient) > 0
+
+    def add_subscriptions(self, repos, recipient=None):
+        """
+        批量添加订阅，只写一次文件。
+        :return: 实际新增的订阅数（已存在的订阅不计入）
+        """
+        with self._modify() as index:
+            added = 0
+            for repo in repos:
+                recipients = index.setdefault(repo, [])
+                if recipient not in recipients:
+                    recipients.append(recipient)
+                    added += 1
+            return added
+
+    def remove_subscriptions(self, repos, recipient=None):
+        """
+        批量移除订阅，只写一次文件；指定 recipient 时只移除该收件人。
+        :return: 实际移除的订阅数
+        """
+        with self._modify() as index:
+            removed = 0
+            for repo in repos:
+                if repo not in index:
+                    continue
+                if recipient is None:
+                    del index[repo]
+                    removed += 1
+                elif recipient in index[repo]:
+                    index[repo].remove(recipient)
+                    removed += 1
+                    if not index[repo]:
+                        del index[repo]
+                if repo not in index:
+                    self._settings.pop(repo, None)
+            return removed
+
+    @contextmanager
+    def _modify(self):
+        """
+        在进程间文件锁内读取最新的订阅、交给调用方修改索引，有变化时原子地写回文件。
+        """
+        with self._lock, file_lock(self.lock_file):
+            if os.path.exists(self.subscriptions_file):
+                self.reload()
+            before = self.subscriptions
+            yield self._index
+            self._settings = {repo: settings for repo, settings in self._settings.items() if settings}
+            self._rebuild_indexes()
+            if self.subscriptions != before:
+                self.save_subscriptions()
+
+
+def read_repo_file(path):
+    """
+    读取批量订阅文件：每行一个仓库（owner/repo），忽略空行与 # 开头的注释。
+    """
+    with open(path, 'r') as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+def _repo_of(entry):
+    return entry['repo'] if isinstance(entry, dict) else entry
@@ -0,0 +1,217 @@
+import argparse  # 导入argparse库，用于命令行汇总工具
+import contextvars  # 导入contextvars库，跟踪当前线程中的父 span
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from logger import LOG  # 导入日志模块
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_exporter = None  # 当前的 span 导出器，未配置时 span 只计时不导出
+
+
+class Span:
+    """
+    一次操作的耗时记录，与父 span 组成调用树；同一次运行中的所有 span 共享 trace_id。
+    """
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.end = None
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def set(self, key, value):
+        """
+        设置 span 的属性，例如仓库、模型、字节数、条目数。
+        """
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id, 'name': self.name,
+            'start': self.start, 'end': self.end, 'duration': self.duration, 'thread': self.thread,
+            'attributes': self.attributes, 'error': self.error,
+        }
+
+
+class JsonlExporter:
+    """
+    把结束的 span 逐行追加到本地 JSON Lines 文件。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+def configure(path):
+    """
+    启用追踪并把 span 导出到 path；path 为 None 时关闭导出。
+    """
+    global _exporter
+    _exporter = JsonlExporter(path) if path else None
+
+
+def configure_from_config(tracing_config):
+    """
+    根据配置中的 tracing 段启用或关闭追踪。
+    """
+    enabled = bool(tracing_config) and tracing_config.get('enabled', False)
+    configure(tracing_config.get('path', 'logs/traces.jsonl') if enabled else None)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    创建一个 span 并设为当前 span，代码块中创建的 span 都是它的子 span。
+    """
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end = time.time()
+        _current_span.reset(token)
+        if _exporter is not None:
+            try:
+                _exporter.export(current)
+            except OSError as e:
+                LOG.warning(f"span 导出失败：{str(e)}")
+
+
+def traced(name, **attributes):
+    """
+    装饰器形式的 span，函数运行期间处于该 span 中。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    return _current_span.get()
+
+
+def annotate(**attributes):
+    """
+    给当前 span（如果有）设置属性。
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def run_in_context(target):
+    """
+    返回在当前追踪上下文中运行 target 的函数，用于把父 span 传递到新线程中。
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(target, *args, **kwargs)
+
+
+def load_spans(path):
+    """
+    读取导出的 span，按 trace_id 分组并按开始时间排序。
+    """
+    traces = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                traces[record['trace_id']].append(record)
+    return sorted(traces.values(), key=lambda spans: min(s['start'] for s in spans))
+
+
+def critical_path(spans):
+    """
+    返回一次运行的关键路径：从根 span 开始，每一层选择最晚结束的子 span。
+    """
+    children = defaultdict(list)
+    ids = {s['span_id'] for s in spans}
+    roots = []
+    for s in spans:
+        if s['parent_id'] in ids:
+            children[s['parent_id']].append(s)
+        else:
+            roots.append(s)
+    if not roots:
+        return []
+    node = max(roots, key=lambda s: s['duration'])
+    path = [node]
+    while children.get(node['span_id']):
+        node = max(children[node['span_id']], key=lambda s: s['end'] or 0)
+        path.append(node)
+    return path
+
+
+def summarize(spans, top=10):
+    """
+    返回一次运行的文字汇总：关键路径与最慢的 span。
+    """
+    start = min(s['start'] for s in spans)
+    end = max(s['end'] or s['start'] for s in spans)
+    lines = [f"Trace {spans[0]['trace_id']}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start))}"
+             f"  共 {len(spans)} 个 span，总耗时 {end - start:.2f}s"]
+    lines.append("  关键路径：")
+    for depth, s in enumerate(critical_path(spans)):
+        lines.append(f"    {'  ' * depth}{s['name']} {s['duration']:.2f}s {_describe(s)}")
+    lines.append(f"  最慢的 {min(top, len(spans))} 个 span：")
+    for s in sorted(spans, key=lambda s: s['duration'], reverse=True)[:top]:
+        lines.append(f"    {s['duration']:8.2f}s  {s['name']} {_describe(s)}")
+    return "\n".join(lines)
+
+
+def _describe(span_record):
+    parts = [f"{key}={value}" for key, value in span_record['attributes'].items()]
+    if span_record.get('error'):
+        parts.append(f"error={span_record['error']}")
+    return f"[{', '.join(parts)}]" if parts else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='汇总追踪文件中每次运行的关键路径与最慢的 span')
+    parser.add_argument('--file', default='logs/traces.jsonl', help='span 导出文件（JSON Lines）')
+    parser.add_argument('--runs', type=int, default=1, help='汇总最近的几次运行')
+    parser.add_argument('--top', type=int, default=10, help='每次运行列出的最慢 span 数')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"追踪文件不存在：{args.file}")
+        return
+    for spans in load_spans(args.file)[-args.runs:]:
+        print(summarize(spans, args.top))
+        print()
+
+
+if __name__ == '__main__':
+    main()
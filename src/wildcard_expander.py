@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from logger import LOG  # 导入日志模块
+from state_file import atomic_write_json, file_lock  # 导入状态文件的原子写入与进程间文件锁
+from config import optional_feature  # 导入可选功能的 from_config 装饰器
+
+WILDCARD_PREFIXES = ("org:", "topic:")  # 通配订阅的前缀：组织下的所有仓库、带有某个主题的仓库
+
+
+def is_wildcard(key):
+    """
+    判断订阅项是否为 org:<组织> 或 topic:<主题> 形式的通配订阅。
+    """
+    return key.startswith(WILDCARD_PREFIXES)
+
+
+class WildcardExpander:
+    """
+    通过 GitHub API 把通配订阅展开为具体仓库。展开结果缓存在本地文件中，超过 TTL 才重新查询，
+    已归档、已停用以及长时间没有推送的仓库不会被展开，避免浪费获取与 LLM 调用。
+    """
+
+    def __init__(self, github_client, cache_file, ttl_hours=24, inactive_days=180, max_repos=200):
+        """
+        :param github_client: 用于查询组织仓库与搜索主题的 GitHubClient。
+        :param cache_file: 展开结果的缓存文件路径。
+        :param ttl_hours: 缓存的有效期（小时）。
+        :param inactive_days: 超过该天数没有推送的仓库视为不活跃，不参与展开。
+        :param max_repos: 每个通配订阅最多展开的仓库数，按最近推送时间优先。
+        """
+        self.github_client = github_client
+        self.cache_file = cache_file
+        self.ttl = ttl_hours * 3600
+        self.inactive_days = inactive_days
+        self.max_repos = max_repos
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.cache = self._load()  # pattern -> {'expanded_at': ts, 'repos': [...]}
+
+    @classmethod
+    @optional_feature
+    def from_config(cls, wildcard_config, github_client):
+        return cls(
+            github_client,
+            wildcard_config.get('path', 'data/wildcard_cache.json'),
+            wildcard_config.get('ttl_hours', 24),
+            wildcard_config.get('inactive_days', 180),
+            wildcard_config.get('max_repos', 200),
+        )
+
+    def cached(self, pattern):
+        """
+        返回缓存中的展开结果（不访问网络），从未展开过时返回空列表。
+        """
+        with self._lock:
+            return list(self.cache.get(pattern, {}).get('repos', []))
+
+    def is_stale(self, pattern, now=None):
+        now = now or time.time()
+        with self._lock:
+            entry = self.cache.get(pattern)
+        return entry is None or now - entry['expanded_at'] >= self.ttl
+
+    def sync(self):
+        """
+        缓存文件被其它进程（例如协调进程）更新后重新读取。
+        :return: 是否重新读取了缓存
+        """
+        mtime = self._file_mtime()
+        with self._lock:
+            if mtime is None or mtime == self._mtime:
+                return False
+        cache = self._load()
+        with self._lock:
+            self.cache = cache
+        return True
+
+    def refresh(self, pattern, now=None):
+        """
+        重新查询 GitHub 展开通配订阅并写入缓存；查询失败时保留上次的结果，下次运行再重试。
+        """
+        now = now or time.time()
+        cutoff = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now - self.inactive_days * 86400))
+        try:
+            items = self._query(pattern, cutoff)
+        except Exception as e:
+            LOG.error(f"[通配订阅]展开 {pattern} 失败，继续使用缓存的结果：{str(e)}")
+            return self.cached(pattern)
+
+        repos = [
+            item['full_name'] for item in items
+            if not item.get('archived') and not item.get('disabled') and (item.get('pushed_at') or '') >= cutoff
+        ]
+        LOG.info(f"[通配订阅]{pattern} 展开为 {len(repos)} 个活跃仓库（共查询到 {len(items)} 个）")
+        with self._lock:
+            self.cache[pattern] = {'expanded_at': now, 'repos': repos}
+            self._save()
+        return repos
+
+    def _query(self, pattern, cutoff):
+        kind, _, name = pattern.partition(':')
+        if kind == 'org':
+            return self.github_client.list_org_repos(name, pushed_since=cutoff, limit=self.max_repos)
+        if kind == 'topic':
+            return self.github_client.search_repos(f"topic:{name} archived:false pushed:>={cutoff[:10]}", limit=self.max_repos)
+        raise ValueError(f"不支持的通配订阅：{pattern}")
+
+    def _file_mtime(self):
+        try:
+            return os.path.getmtime(self.cache_file)
+        except OSError:
+            return None
+
+    def _load(self):
+        mtime = self._file_mtime()
+        if mtime is None:
+            return {}
+        with open(self.cache_file, 'r') as f:
+            cache = json.load(f)
+        self._mtime = mtime
+        return cache
+
+    def _save(self):
+        # 在文件锁内合并其它进程展开的结果，同一通配订阅以最近一次展开为准
+        with file_lock(self.cache_file + ".lock"):
+            for pattern, entry in self._load().items():
+                current = self.cache.get(pattern)
+                if current is None or entry['expanded_at'] > current['expanded_at']:
+                    self.cache[pattern] = entry
+            atomic_write_json(self.cache_file, self.cache)
+            self._mtime = self._file_mtime()
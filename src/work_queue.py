@@ -0,0 +1,274 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from logger import LOG  # 导入日志模块
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "WAL")
+
+
+class LeaseLost(Exception):
+    """
+    任务的租约已丢失（心跳失败，任务可能已被其他工作进程领取），不应再产生对外可见的副作用。
+    """
+
+
+class Lease:
+    """
+    工作进程持有的任务租约。心跳失败后 lost 被设置，处理函数在发送通知等副作用之前调用 ensure_held 确认。
+    """
+
+    def __init__(self, work_queue, worker_id, task):
+        self.work_queue = work_queue
+        self.worker_id = worker_id
+        self.task = task
+        self.lost = threading.Event()
+
+    def renew(self):
+        """
+        续约一次；租约已被其他进程领取或无法访问数据库时标记为丢失。
+        :return: 是否仍持有租约
+        """
+        if self.lost.is_set():
+            return False
+        try:
+            held = self.work_queue.heartbeat(self.worker_id, self.task)
+        except sqlite3.Error as e:
+            LOG.error(f"[工作队列]任务 {self.task['key']} 续约失败：{str(e)}")
+            held = False
+        if not held:
+            LOG.warning(f"[工作队列]任务 {self.task['key']} 的租约已丢失")
+            self.lost.set()
+        return held
+
+    def ensure_held(self):
+        """
+        立即续约并确认仍持有租约，否则抛出 LeaseLost。
+        """
+        if not self.renew():
+            raise LeaseLost(f"任务 {self.task['key']} 的租约已丢失，放弃后续处理")
+
+
+class WorkQueue:
+    """
+    基于 SQLite 的共享工作队列：协调进程把一次运行的所有仓库发布为任务，
+    多个工作进程（或共享同一数据卷的多台主机）通过租约领取任务，并用心跳续约。
+    工作进程崩溃后租约过期，任务会被其他工作进程重新领取；租约丢失的工作进程会放弃通知，
+    避免与接手的工作进程重复发送。
+    """
+
+    def __init__(self, db_path, lease_seconds=300, max_attempts=3, journal_mode="DELETE"):
+        """
+        :param db_path: 数据库文件路径，所有进程必须访问同一个文件。
+        :param lease_seconds: 租约时长（秒），超过该时间没有心跳的任务会被重新分配。
+        :param max_attempts: 每个任务最多尝试的次数，超过后标记为 failed。
+        :param journal_mode: SQLite 日志模式。默认的 DELETE（回滚日志）只依赖文件锁，适用于多台主机共享的数据卷；
+                             WAL 依赖共享内存，只能在所有进程位于同一台主机、数据库位于本地磁盘时使用。
+        """
+        journal_mode = journal_mode.upper()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"不支持的日志模式：{journal_mode}，可选 {JOURNAL_MODES}")
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    run_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    PRIMARY KEY (run_id, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires_at)")
+
+    @classmethod
+    def from_config(cls, work_queue_config):
+        """
+        根据配置中的 work_queue 段创建实例。
+        """
+        work_queue_config = work_queue_config or {}
+        return cls(
+            work_queue_config.get('path', 'data/work_queue.db'),
+            work_queue_config.get('lease_seconds', 300),
+            work_queue_config.get('max_attempts', 3),
+            work_queue_config.get('journal_mode', 'DELETE'),
+        )
+
+    @contextmanager
+    def _connect(self):
+        # 每次操作使用独立连接；isolation_level=None 以便显式使用 BEGIN IMMEDIATE 获取写锁
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def publish(self, run_id, keys):
+        """
+        发布一次运行的任务，重复发布同一运行中的同一任务会被忽略。
+        :return: 新发布的任务数
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            published = sum(
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (run_id, key, created_at) VALUES (?, ?, ?)", (run_id, key, now)
+                ).rowcount
+                for key in keys
+            )
+        LOG.info(f"[工作队列]运行 {run_id} 发布了 {published} 个任务")
+        return published
+
+    def lease(self, worker_id):
+        """
+        领取一个待处理（或租约已过期）的任务。
+        :return: {'run_id', 'key', 'attempts'}，没有可领取的任务时返回 None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT run_id, key, attempts FROM tasks "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires_at < ?)) AND attempts < ? "
+                "ORDER BY created_at, key LIMIT 1",
+                (now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                # 租约过期且已达最大尝试次数的任务不再重试
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', owner = NULL, last_error = COALESCE(last_error, '租约过期') "
+                    "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                return None
+            run_id, key, attempts = row
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires_at = ?, attempts = ? "
+                "WHERE run_id = ? AND key = ?",
+                (worker_id, now + self.lease_seconds, attempts + 1, run_id, key),
+            )
+        return {'run_id': run_id, 'key': key, 'attempts': attempts + 1}
+
+    def heartbeat(self, worker_id, task):
+        """
+        为持有的任务续约。
+        :return: 是否仍持有该任务（租约过期并被其他进程领取时返回 False）
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE run_id = ? AND key = ? AND owner = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, task['run_id'], task['key'], worker_id),
+            ).rowcount
+        return updated == 1
+
+    def complete(self, worker_id, task):
+        """
+        标记任务完成。
+        :return: 是否仍持有该任务（租约已被其他进程领取时不修改任务状态并返回 False）
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET status = 'done', finished_at = ?, last_error = NULL "
+                "WHERE run_id = ? AND key = ? AND owner = ?",
+                (time.time(), task['run_id'], task['key'], worker_id),
+            ).rowcount
+        return updated == 1
+
+    def fail(self, worker_id, task, error):
+        """
+        记录一次处理失败：未达最大尝试次数时放回队列，否则标记为 failed。
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires_at = NULL, last_error = ? WHERE run_id = ? AND key = ? AND owner = ?",
+                (self.max_attempts, error, task['run_id'], task['key'], worker_id),
+            )
+
+    def run_status(self, run_id):
+        """
+        返回一次运行中各状态的任务数量，例如 {'pending': 0, 'leased': 1, 'done': 9, 'failed': 0}。
+        """
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        with self._connect() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY status", (run_id,)):
+                counts[status] = count
+        return counts
+
+    @contextmanager
+    def holding(self, worker_id, task):
+        """
+        处理任务期间在后台线程中定期发送心跳，保持租约不过期；返回 Lease，心跳失败时其 lost 被设置。
+        """
+        lease = Lease(self, worker_id, task)
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                if not lease.renew():
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{task['key']}", daemon=True)
+        thread.start()
+        try:
+            yield lease
+        finally:
+            stop.set()
+            thread.join()
+
+
+def default_worker_id():
+    """
+    返回默认的工作进程标识：主机名加进程号，在共享数据卷的多台主机之间也唯一。
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(work_queue, worker_id, process, poll_interval=10, stop_event=None):
+    """
+    工作进程主循环：不断领取任务并调用 process(key, lease) 处理，直到 stop_event 被设置。
+    process 应在通知等对外的副作用之前调用 lease.ensure_held()。
+    """
+    stop_event = stop_event or threading.Event()
+    LOG.info(f"[工作队列]工作进程 {worker_id} 已启动")
+    while not stop_event.is_set():
+        task = work_queue.lease(worker_id)
+        if task is None:
+            stop_event.wait(poll_interval)
+            continue
+        LOG.info(f"[工作队列]{worker_id} 领取任务 {task['key']}（运行 {task['run_id']}，第 {task['attempts']} 次尝试）")
+        try:
+            with work_queue.holding(worker_id, task) as lease:
+                process(task['key'], lease)
+        except LeaseLost as e:
+            # 任务已由其他工作进程接手，不记录失败，也不计入本进程的结果
+            LOG.warning(f"[工作队列]{str(e)}")
+        except Exception as e:
+            LOG.error(f"[工作队列]任务 {task['key']} 处理失败：{str(e)}")
+            work_queue.fail(worker_id, task, str(e))
+        else:
+            if not work_queue.complete(worker_id, task):
+                LOG.warning(f"[工作队列]任务 {task['key']} 完成时租约已被其他工作进程领取")
+    LOG.info(f"[工作队列]工作进程 {worker_id} 已停止")
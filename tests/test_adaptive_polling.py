@@ -0,0 +1,129 @@
+import sys
+import os
+import smtplib
+import tempfile
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from adaptive_polling import AdaptivePolling  # 导入要测试的自适应轮询策略
+from daemon_process import github_stages, process_github_repo, publish_github_run  # 导入使用自适应轮询的 GitHub 任务
+from notifier import Notifier  # 导入邮件通知渠道
+from notification_channel import NotifierGroup  # 导入多渠道通知组合
+
+DAY = 86400
+
+class TestAdaptivePolling(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中创建状态文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "repo_activity.json")
+        self.polling = AdaptivePolling(self.state_file, min_interval_hours=24, max_interval_hours=168, target_items=10)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_interval_follows_activity_within_bounds(self):
+        """
+        测试活跃仓库按最短间隔获取，冷门仓库放宽到最长间隔，中间活跃度按目标条数计算。
+        """
+        now = 1_000_000
+        self.assertEqual(self.polling.record("hot/repo", 50, 1, now), 24)
+        self.assertEqual(self.polling.record("dormant/repo", 0, 1, now), 168)
+        self.assertEqual(self.polling.record("steady/repo", 5, 1, now), 48)
+
+        self.assertTrue(self.polling.is_due("hot/repo", now + DAY))
+        self.assertFalse(self.polling.is_due("steady/repo", now + DAY))
+        self.assertEqual(self.polling.due_repos(["hot/repo", "steady/repo", "dormant/repo", "new/repo"], now + DAY),
+                         ["hot/repo", "new/repo"])
+
+    def test_state_persists_and_window_covers_gap(self):
+        """
+        测试状态被持久化，下一次获取覆盖自上次获取以来的天数，活动速率按滑动平均更新。
+        """
+        now = 1_000_000
+        self.polling.record("a/b", 0, 1, now)
+
+        restarted = AdaptivePolling(self.state_file, target_items=10, smoothing=0.5)
+        self.assertEqual(restarted.window_days("a/b", 1, now + 7 * DAY), 7)
+        self.assertEqual(restarted.window_days("new/repo", 1, now), 1)
+        restarted.record("a/b", 70, 7, now + 7 * DAY)
+        self.assertAlmostEqual(restarted.repos["a/b"]["rate"], 5.0)
+
+    def test_records_from_other_processes_are_merged(self):
+        """
+        测试多个工作进程共用状态文件时互不覆盖对方的记录，协调进程筛选到期仓库时能看到工作进程的记录。
+        """
+        now = 1_000_000
+        coordinator = AdaptivePolling(self.state_file, target_items=10)
+        worker_a = AdaptivePolling(self.state_file, target_items=10)
+        worker_b = AdaptivePolling(self.state_file, target_items=10)
+        worker_a.record("a/b", 0, 1, now)
+        worker_b.record("c/d", 0, 1, now)
+
+        self.assertEqual(set(AdaptivePolling(self.state_file).repos), {"a/b", "c/d"})
+        self.assertEqual(coordinator.due_repos(["a/b", "c/d", "new/repo"], now + DAY), ["new/repo"])
+
+    @patch('smtplib.SMTP_SSL')
+    def test_poll_is_recorded_only_after_successful_notify(self, mock_smtp):
+        """
+        测试邮件投递失败时不推进上次获取时间与报告时间，下一次获取仍覆盖未报告的条目；投递成功后才记录。
+        """
+        subscription_manager = MagicMock()
+        subscription_manager.settings_for.return_value = {}
+        subscription_manager.recipients_for.return_value = [None]
+        github_client = MagicMock(activity_counts={"a/b": 5})
+        github_client.export_progress_by_date_range.return_value = "a_b.md"
+        report_generator = MagicMock()
+        report_generator.generate_github_report.return_value = ("# 报告", "a_b_report.md")
+        report_generator.load_structured.return_value = None
+        email = {'smtp_server': "smtp.example.com", 'smtp_port': 465, 'from': "a@example.com",
+                 'password': "secret", 'to': "b@example.com", 'max_per_minute': None}
+        notifier = NotifierGroup([Notifier(email)])
+        mock_smtp.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected("gone"), None]
+        config = MagicMock(freq_days=1, delta_reports=False, skip_unchanged_notify=False)
+        fetch, summarize, notify = github_stages(subscription_manager, github_client, report_generator, notifier,
+                                                 config, polling=self.polling)
+
+        item = summarize(fetch({'repo': "a/b"}))
+        with self.assertRaises(RuntimeError):
+            notify(item)
+        self.assertNotIn("a/b", self.polling.repos)
+        subscription_manager.mark_run.assert_not_called()
+
+        notify(item)
+        self.assertEqual(self.polling.repos["a/b"]["rate"], 5.0)
+        subscription_manager.mark_run.assert_called_once()
+
+    def test_coordinator_and_workers_share_polling(self):
+        """
+        测试多进程模式下工作进程记录获取结果，协调进程只发布按活跃度到期的仓库。
+        """
+        subscription_manager = MagicMock()
+        subscription_manager.due_now.return_value = ["a/b", "c/d"]
+        subscription_manager.settings_for.return_value = {}
+        work_queue = MagicMock()
+        publish_github_run(subscription_manager, work_queue, self.polling)
+        work_queue.publish.assert_called_once_with(ANY, ["a/b", "c/d"])
+
+        github_client = MagicMock(activity_counts={"a/b": 0})
+        github_client.export_progress_by_date_range.return_value = "a_b.md"
+        report_generator = MagicMock()
+        report_generator.generate_github_report.return_value = ("# 报告", "a_b_report.md")
+        notifier = MagicMock()
+        notifier.notify_github_report.return_value = True
+        config = MagicMock(freq_days=1, delta_reports=False, skip_unchanged_notify=False)
+        worker_polling = AdaptivePolling(self.state_file, min_interval_hours=24, max_interval_hours=168, target_items=10)
+        stages = github_stages(subscription_manager, github_client, report_generator, notifier, config, polling=worker_polling)
+        process_github_repo(stages, notifier, "a/b")
+
+        work_queue.reset_mock()
+        publish_github_run(subscription_manager, work_queue, self.polling)
+        work_queue.publish.assert_called_once_with(ANY, ["c/d"])
+
+if __name__ == '__main__':
+    unittest.main()
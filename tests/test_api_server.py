@@ -0,0 +1,147 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from datetime import date, timedelta
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from api_server import ApiServer, ReportJobQueue, QueueFull  # 导入要测试的报告接口与任务队列
+from report_store import ReportStore  # 导入已保存报告的查找
+
+class TestReportJobQueue(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建由事件控制完成时机的报告生成函数。
+        """
+        self.release = threading.Event()
+        self.calls = []
+
+        def process(repo, days, provider, model):
+            self.calls.append(repo)
+            self.release.wait(5)
+            if repo == "bad/repo":
+                raise RuntimeError("boom")
+            return f"# {repo} 报告", f"daily_progress/{repo}_report.md"
+
+        self.process = process
+
+    def _wait(self, jobs, job_id, status):
+        for _ in range(500):
+            job = jobs.get(job_id, with_report=True)
+            if job['status'] == status:
+                return job
+            threading.Event().wait(0.01)
+        self.fail(f"任务未进入 {status} 状态")
+
+    def test_identical_requests_share_job_and_cached_result(self):
+        """
+        测试相同参数的请求在进行中与完成后都复用同一个任务，失败的任务可以重新提交。
+        """
+        jobs = ReportJobQueue(self.process, workers=1)
+        jobs.start()
+        try:
+            first, created = jobs.submit("a/b", 2, "ollama", "llama3.1")
+            duplicate, duplicate_created = jobs.submit("a/b", 2, "ollama", "llama3.1")
+            other, _ = jobs.submit("a/b", 7, "ollama", "llama3.1")
+            self.assertTrue(created)
+            self.assertFalse(duplicate_created)
+            self.assertEqual(duplicate['id'], first['id'])
+            self.assertNotEqual(other['id'], first['id'])
+
+            self.release.set()
+            done = self._wait(jobs, first['id'], 'done')
+            self.assertEqual(done['report'], "# a/b 报告")
+            cached, cached_created = jobs.submit("a/b", 2, "ollama", "llama3.1")
+            self.assertFalse(cached_created)
+            self.assertEqual(cached['id'], first['id'])
+
+            failed, _ = jobs.submit("bad/repo", 1, "ollama", "llama3.1")
+            self.assertEqual(self._wait(jobs, failed['id'], 'failed')['error'], "boom")
+            retried, retried_created = jobs.submit("bad/repo", 1, "ollama", "llama3.1")
+            self.assertTrue(retried_created)
+            self._wait(jobs, retried['id'], 'failed')
+            self.assertEqual(self.calls, ["a/b", "a/b", "bad/repo", "bad/repo"])
+        finally:
+            self.release.set()
+            jobs.stop()
+
+    def test_stored_report_is_reused_only_for_matching_model(self):
+        """
+        测试新鲜的已保存报告只在模型一致或请求未指定模型时直接返回，其它模型的请求重新生成。
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            repo_dir = os.path.join(tmp_dir, "a_b")
+            os.makedirs(repo_dir)
+            name = f"{date.today() - timedelta(days=2)}_to_{date.today()}_report"
+            with open(os.path.join(repo_dir, f"{name}.md"), 'w') as f:
+                f.write("# llama 报告")
+            with open(os.path.join(repo_dir, f"{name}.meta.json"), 'w') as f:
+                json.dump({"provider": "ollama", "model": "llama3.1"}, f)
+            jobs = ReportJobQueue(self.process, workers=1, report_store=ReportStore(tmp_dir))
+
+            matching, _ = jobs.submit("a/b", 2, "ollama", "llama3.1")
+            unspecified, _ = jobs.submit("a/b", 2, "ollama", "qwen2:7b", any_model=True)
+            other, other_created = jobs.submit("a/b", 2, "ollama", "qwen2:7b")
+
+        self.assertTrue(matching['cached'])
+        self.assertEqual(jobs.get(matching['id'], with_report=True)['report'], "# llama 报告")
+        self.assertEqual((unspecified['cached'], unspecified['model']), (True, "llama3.1"))
+        self.assertTrue(other_created)
+        self.assertEqual((other['status'], other['cached'], other['model']), ('queued', False, "qwen2:7b"))
+
+    def test_bounded_queue_rejects_when_full(self):
+        """
+        测试队列已满时拒绝新任务。
+        """
+        jobs = ReportJobQueue(self.process, workers=1, max_queue=1)
+        jobs.submit("a/b", 1, "ollama", "llama3.1")
+        with self.assertRaises(QueueFull):
+            jobs.submit("c/d", 1, "ollama", "llama3.1")
+
+    def test_http_endpoints(self):
+        """
+        测试提交任务、查询状态与获取结果的 HTTP 接口，以及参数校验。
+        """
+        jobs = ReportJobQueue(self.process, workers=1)
+        server = ApiServer(jobs, "127.0.0.1", 0, "ollama", "llama3.1")
+        jobs.start()
+        server.start()
+        base = f"http://127.0.0.1:{server.port}"
+
+        def request(path, body=None):
+            data = json.dumps(body).encode('utf-8') if body is not None else None
+            try:
+                with urllib.request.urlopen(urllib.request.Request(f"{base}{path}", data=data)) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        try:
+            status, job = request("/reports", {"repo": "a/b", "days": 3})
+            self.assertEqual(status, 202)
+            self.assertEqual((job['provider'], job['model']), ("ollama", "llama3.1"))
+            self.assertEqual(request("/reports", {"repo": "a/b", "days": 3})[1]['deduplicated'], True)
+            self.assertEqual(request(f"/jobs/{job['id']}/result")[0], 202)
+
+            self.release.set()
+            self._wait(jobs, job['id'], 'done')
+            status, result = request(f"/jobs/{job['id']}/result")
+            self.assertEqual(status, 200)
+            self.assertEqual(result['report'], "# a/b 报告")
+            self.assertNotIn('report', request(f"/jobs/{job['id']}")[1])
+
+            self.assertEqual(request("/reports", {"repo": "not a repo"})[0], 400)
+            self.assertEqual(request("/reports", {"repo": "a/b", "days": 365})[0], 400)
+            self.assertEqual(request("/jobs/0123abcd")[0], 404)
+        finally:
+            server.stop()
+            jobs.stop()
+
+if __name__ == '__main__':
+    unittest.main()
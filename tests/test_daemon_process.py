@@ -0,0 +1,64 @@
+import sys
+import os
+import copy
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from config import Config  # 导入配置类
+from daemon_process import DaemonRuntime  # 导入要测试的守护进程运行时
+
+class TestDaemonRuntimeReload(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，使用不落盘的配置创建运行时。
+        """
+        self.config = Config()
+        # 关闭需要写入文件的组件，避免测试在仓库目录中产生状态文件
+        self.config.outbox = {}
+        self.config.job_state = {}
+        self.config.report_manifest = {}
+        self.config.adaptive_polling = {}
+        self.config.subscriptions_file = "subscriptions.json"
+        self.config.subscription_state_file = None
+        self.runtime = DaemonRuntime(self.config)
+        self.scheduler = MagicMock()
+        self.runtime.schedule_jobs(self.scheduler)
+        self.scheduler.reset_mock()
+
+    def _reload_with(self, **changes):
+        new_config = copy.copy(self.config)
+        for key, value in changes.items():
+            setattr(new_config, key, value)
+        with patch('daemon_process.Config', return_value=new_config):
+            self.runtime.reload()
+
+    def test_reload_without_changes_keeps_components(self):
+        """
+        测试配置未变化时不重建任何组件，也不更新调度项。
+        """
+        llm, notifier, report_generator = self.runtime.llm, self.runtime.notifier, self.runtime.report_generator
+        self._reload_with()
+
+        self.assertIs(self.runtime.llm, llm)
+        self.assertIs(self.runtime.notifier, notifier)
+        self.assertIs(self.runtime.report_generator, report_generator)
+        self.scheduler.add_job.assert_not_called()
+
+    def test_reload_rebuilds_only_affected_components(self):
+        """
+        测试模型变化只重建 LLM 与报告生成器，执行时间变化只更新 GitHub 调度项。
+        """
+        notifier, github_client, llm = self.runtime.notifier, self.runtime.github_client, self.runtime.llm
+        self._reload_with(ollama_model_name="qwen2", exec_time="09:30")
+
+        self.assertIsNot(self.runtime.llm, llm)
+        self.assertIs(self.runtime.report_generator.llm, self.runtime.llm)
+        self.assertIs(self.runtime.notifier, notifier)
+        self.assertIs(self.runtime.github_client, github_client)
+        self.assertEqual([call.args[0] for call in self.scheduler.add_job.call_args_list], ["github"])
+
+if __name__ == '__main__':
+    unittest.main()
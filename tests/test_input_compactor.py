@@ -0,0 +1,74 @@
+import sys
+import os
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from input_compactor import InputCompactor, _normalize_title  # 导入要测试的 InputCompactor 类与标题归一化函数
+
+class TestInputCompactor(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，准备包含机器人 PR、近似重复标题和杂务提交的进展内容。
+        """
+        self.compactor = InputCompactor()
+        self.markdown_content = (
+            "# Progress for langchain-ai/langchain (2024-08-20 to 2024-08-21)\n\n"
+            "\n## Issues Closed in the Last 1 Days\n"
+            "- Bump requests from 2.31.0 to 2.32.0 #1\n"
+            "- chore(deps): update dependency ruff to v0.6.2 #2\n"
+            "- chore: tidy imports #3\n"
+            "- docs: update examples in api ref #4\n"
+            "- docs: update examples in api ref (part 2) #5\n"
+            "- fix: handle empty response #6\n"
+            "- Add streaming support #7\n"
+        )
+
+    def test_compact_filters_and_collapses(self):
+        """
+        测试机器人与杂务条目被过滤，近似重复条目被合并。
+        """
+        compacted, stats = self.compactor.compact(self.markdown_content)
+
+        self.assertNotIn("Bump requests", compacted)
+        self.assertNotIn("ruff", compacted)
+        self.assertNotIn("tidy imports", compacted)
+        self.assertIn("- docs: update examples in api ref #4 (+1 similar: #5)", compacted)
+        self.assertEqual(stats['items_in'], 7)
+        self.assertEqual(stats['filtered'], 3)
+        self.assertEqual(stats['collapsed'], 1)
+        self.assertEqual(stats['items_out'], 3)
+        self.assertGreater(stats['tokens_saved'], 0)
+
+    def test_compact_groups_by_prefix(self):
+        """
+        测试条目按约定式提交前缀分组，标题行保持不变。
+        """
+        compacted, _ = self.compactor.compact(self.markdown_content)
+        lines = compacted.splitlines()
+
+        self.assertEqual(lines[0], "# Progress for langchain-ai/langchain (2024-08-20 to 2024-08-21)")
+        self.assertEqual(
+            [line for line in lines if line.startswith("### ")],
+            ["### docs", "### fix", "### other"],
+        )
+
+    def test_only_standalone_version_numbers_are_ignored(self):
+        """
+        测试归一化标题时只去掉独立的版本号，单词中的数字（例如 IPv6、dev2）保持不变。
+        """
+        self.assertEqual(_normalize_title("Drop support for Python 3.8"), _normalize_title("Drop support for Python v3.9.1"))
+        self.assertEqual(_normalize_title("Add IPv6 listener"), "add ipv6 listener")
+        self.assertEqual(_normalize_title("Fix dev2 build"), "fix dev2 build")
+
+    def test_from_config_disabled(self):
+        """
+        测试未启用压缩时 from_config 返回 None。
+        """
+        self.assertIsNone(InputCompactor.from_config({}))
+        self.assertIsNone(InputCompactor.from_config({"enabled": False}))
+        self.assertIsInstance(InputCompactor.from_config({"enabled": True}), InputCompactor)
+
+if __name__ == '__main__':
+    unittest.main()
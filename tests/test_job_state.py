@@ -0,0 +1,155 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from job_state import JobState  # 导入要测试的任务状态类
+from scheduler import CronTrigger  # 导入 cron 触发器，用于计算错过的运行
+from daemon_process import github_job  # 导入使用检查点续跑的 GitHub 任务
+
+class TestJobState(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中创建任务状态文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "job_state.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_checkpoints_survive_restart(self):
+        """
+        测试检查点被持久化，重启后可以继续未完成的运行。
+        """
+        state = JobState(self.state_file)
+        self.assertFalse(state.begin_run("github"))
+        state.checkpoint("github", "a/b", "summarized", report_file_path="a.md")
+
+        restarted = JobState(self.state_file)
+        self.assertTrue(restarted.has_unfinished_run("github"))
+        self.assertTrue(restarted.begin_run("github"))
+        self.assertTrue(restarted.reached("github", "a/b", "fetched"))
+        self.assertFalse(restarted.reached("github", "a/b", "notified"))
+        self.assertEqual(restarted.progress("github", "a/b")["report_file_path"], "a.md")
+
+        restarted.finish_run("github")
+        self.assertFalse(JobState(self.state_file).has_unfinished_run("github"))
+
+    def test_processes_keep_each_others_runs(self):
+        """
+        测试两个进程共用状态文件时，各自任务的完成时间与检查点都被保留。
+        """
+        scheduler = JobState(self.state_file)
+        other = JobState(self.state_file)
+        scheduler.begin_run("github")
+        other.finish_run("hacker_news_daily", finished_at=100)
+        scheduler.checkpoint("github", "a/b", "fetched")
+        scheduler.finish_run("github", finished_at=200)
+        other.begin_run("hacker_news_hours_topic")
+
+        reloaded = JobState(self.state_file)
+        self.assertEqual(reloaded.last_run("github"), 200)
+        self.assertEqual(reloaded.last_run("hacker_news_daily"), 100)
+        self.assertFalse(reloaded.has_unfinished_run("github"))
+        self.assertTrue(reloaded.has_unfinished_run("hacker_news_hours_topic"))
+
+    def test_missed_runs_are_bounded(self):
+        """
+        测试只统计补跑窗口内错过的计划运行。
+        """
+        state = JobState(self.state_file, catch_up_max_age_hours=48)
+        now = datetime(2024, 9, 10, 12, 0).timestamp()
+        state.finish_run("hn_daily", datetime(2024, 9, 1, 11, 0).timestamp())
+
+        missed = state.missed_runs("hn_daily", CronTrigger("0 10 * * *"), now)
+        self.assertEqual([datetime.fromtimestamp(slot) for slot in missed],
+                         [datetime(2024, 9, 9, 10, 0), datetime(2024, 9, 10, 10, 0)])
+        self.assertEqual(state.missed_runs("github", CronTrigger("0 8 * * *"), now), [])
+
+    def test_github_job_resumes_from_checkpoints(self):
+        """
+        测试 github_job 续跑时跳过已完成的阶段，只处理剩余的工作。
+        """
+        tmp = self.tmp_dir.name
+        report_path = os.path.join(tmp, "b_report.md")
+        with open(report_path, "w") as f:
+            f.write("# b 报告")
+        state = JobState(self.state_file)
+        state.begin_run("github")
+        state.checkpoint("github", "org/a", "notified")
+        state.checkpoint("github", "org/b", "summarized", markdown_file_path=report_path, report_file_path=report_path)
+
+        subscription_manager = MagicMock()
+        subscription_manager.due_now.return_value = ["org/a", "org/b", "org/c"]
+        subscription_manager.settings_for.return_value = {}
+        subscription_manager.recipients_for.return_value = [None]
+        github_client = MagicMock(activity_counts={})
+        github_client.export_progress_by_date_range.return_value = report_path
+        report_generator = MagicMock()
+        report_generator.generate_github_report.return_value = ("# c 报告", report_path)
+        report_generator.load_structured.return_value = None
+        notifier = MagicMock()
+        config = MagicMock(freq_days=1, pipeline={}, delta_reports=False, skip_unchanged_notify=False)
+
+        github_job(subscription_manager, github_client, report_generator, notifier, config, state)
+
+        github_client.export_progress_by_date_range.assert_called_once_with("org/c", 1, None)
+        report_generator.generate_github_report.assert_called_once()
+        notified = sorted(call.args[0] for call in notifier.notify_github_report.call_args_list)
+        self.assertEqual(notified, ["org/b", "org/c"])
+        self.assertFalse(state.has_unfinished_run("github"))
+        self.assertIsNotNone(state.last_run("github"))
+
+    def test_github_job_keeps_checkpoints_of_failed_repos(self):
+        """
+        测试有仓库处理失败时保留其检查点，下次运行从已完成的阶段继续；成功的仓库不会因检查点被跳过。
+        """
+        def export(repo, days, labels):
+            raw_path = os.path.join(self.tmp_dir.name, f"{repo.replace('/', '_')}.md")
+            with open(raw_path, "w") as f:
+                f.write("# 原始进展")
+            return raw_path
+
+        failures = ["org_bad.md"]
+
+        def generate(raw_path, model):
+            if os.path.basename(raw_path) in failures:
+                raise RuntimeError("LLM 超时")
+            return "# 报告", raw_path
+
+        state = JobState(self.state_file)
+        subscription_manager = MagicMock()
+        subscription_manager.due_now.return_value = ["org/ok", "org/bad"]
+        subscription_manager.settings_for.return_value = {}
+        subscription_manager.recipients_for.return_value = [None]
+        github_client = MagicMock(activity_counts={})
+        github_client.export_progress_by_date_range.side_effect = export
+        report_generator = MagicMock()
+        report_generator.generate_github_report.side_effect = generate
+        report_generator.load_structured.return_value = None
+        notifier = MagicMock()
+        config = MagicMock(freq_days=1, pipeline={}, delta_reports=False, skip_unchanged_notify=False)
+
+        github_job(subscription_manager, github_client, report_generator, notifier, config, state)
+
+        self.assertTrue(state.has_unfinished_run("github"))
+        self.assertEqual(state.progress("github", "org/bad")['stage'], "fetched")
+        self.assertEqual(state.progress("github", "org/ok"), {})
+
+        # 下次运行续跑：失败的仓库复用已获取的进展，成功过的仓库再次到期时正常处理
+        failures.clear()
+        github_job(subscription_manager, github_client, report_generator, notifier, config, JobState(self.state_file))
+
+        fetched = [call.args[0] for call in github_client.export_progress_by_date_range.call_args_list]
+        self.assertEqual(sorted(fetched), ["org/bad", "org/ok", "org/ok"])
+        self.assertEqual(notifier.notify_github_report.call_count, 3)
+        self.assertFalse(JobState(self.state_file).has_unfinished_run("github"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import threading
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from config import Config  # 导入配置类
+from llm_pool import LLMPool  # 导入要测试的模型实例池
+
+class TestLLMPool(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，使用 Ollama 模型配置创建实例池（创建实例时不访问网络）。
+        """
+        self.config = Config()
+        self.config.llm_model_type = "ollama"
+        self.config.ollama_model_name = "llama3.1"
+        self.pool = LLMPool(self.config, max_size=2)
+
+    def test_instances_are_reused_per_model_without_touching_config(self):
+        """
+        测试同一模型复用同一个实例，不同模型使用各自的配置副本，全局配置保持不变。
+        """
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.pool.get("ollama", "qwen2:7b"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        gemma = self.pool.get("ollama", "gemma2:2b")
+
+        self.assertTrue(all(generator is results[0] for generator in results))
+        self.assertEqual(results[0].llm.config.ollama_model_name, "qwen2:7b")
+        self.assertEqual(gemma.llm.config.ollama_model_name, "gemma2:2b")
+        self.assertEqual(self.config.ollama_model_name, "llama3.1")
+
+    def test_least_recently_used_instance_is_evicted(self):
+        """
+        测试超过实例池大小时淘汰最久未使用的实例。
+        """
+        first = self.pool.get("ollama", "a")
+        self.pool.get("ollama", "b")
+        self.assertIs(self.pool.get("ollama", "a"), first)
+        self.pool.get("ollama", "c")
+
+        self.assertIs(self.pool.get("ollama", "a"), first)
+        self.assertEqual(list(self.pool._generators), [("ollama", "c"), ("ollama", "a")])
+
+if __name__ == '__main__':
+    unittest.main()
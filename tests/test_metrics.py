@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch, MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import metrics  # 导入要测试的指标模块
+from metrics import Counter, Histogram, MetricsServer
+from github_client import GitHubClient  # 导入会记录请求指标的 GitHub 客户端
+
+class TestMetrics(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        """
+        测试计数器与直方图按 Prometheus 文本格式输出（注册到局部的指标列表，不影响全局的 /metrics 输出）。
+        """
+        registry = []
+        counter = Counter("test_requests_total", "测试请求次数", ["status"], registry=registry)
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+        histogram = Histogram("test_duration_seconds", "测试耗时", ["job"], buckets=(1, 5), registry=registry)
+        histogram.observe(0.5, job="github")
+        histogram.observe(3, job="github")
+
+        text = metrics.render(registry)
+        self.assertNotIn("test_requests_total", metrics.render())
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{status="200"} 3', text)
+        self.assertIn('test_duration_seconds_bucket{job="github",le="1"} 1', text)
+        self.assertIn('test_duration_seconds_bucket{job="github",le="+Inf"} 2', text)
+        self.assertIn('test_duration_seconds_sum{job="github"} 3.5', text)
+
+    @patch('github_client.requests.get')
+    def test_github_requests_are_recorded(self, mock_get):
+        """
+        测试 GitHub 请求次数与剩余速率限制配额被记录。
+        """
+        mock_response = MagicMock(status_code=200, headers={'X-RateLimit-Remaining': '4321'})
+        mock_response.json.return_value = []
+        mock_get.return_value = mock_response
+        before = metrics.GITHUB_REQUESTS.value(endpoint="commits", status="200") or 0
+
+        GitHubClient("token").fetch_commits("a/b")
+
+        self.assertEqual(metrics.GITHUB_REQUESTS.value(endpoint="commits", status="200"), before + 1)
+        self.assertEqual(metrics.GITHUB_RATE_LIMIT_REMAINING.value(), 4321)
+
+    def test_server_endpoints(self):
+        """
+        测试 /metrics 输出指标，/healthz 按健康检查结果返回 200 或 503。
+        """
+        health = {"value": (True, "ok")}
+        server = MetricsServer("127.0.0.1", 0, lambda: health["value"])
+        server.start()
+        base = f"http://127.0.0.1:{server.port}"
+        try:
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                self.assertIn("sentinel_job_runs_total", response.read().decode('utf-8'))
+            with urllib.request.urlopen(f"{base}/healthz") as response:
+                self.assertEqual(response.status, 200)
+
+            health["value"] = (False, "scheduler not running")
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(f"{base}/healthz")
+            self.assertEqual(context.exception.code, 503)
+        finally:
+            server.stop()
+
+if __name__ == '__main__':
+    unittest.main()
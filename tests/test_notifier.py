@@ -1,5 +1,6 @@
 import sys
 import os
+import smtplib
 import unittest
 from unittest.mock import patch, MagicMock
 from io import StringIO
@@ -9,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 
 from config import Config  # 导入配置类
 from notifier import Notifier  # 导入要测试的 Notifier 类
+from notification_channel import NotificationChannel  # 导入通知渠道基类
 from logger import LOG  # 导入日志记录器
 
 class TestNotifier(unittest.TestCase):
@@ -85,5 +87,89 @@ class TestNotifier(unittest.TestCase):
         self.assertIn("邮件设置未配置正确", log_content)
 
 
+    @patch('smtplib.SMTP_SSL')
+    def test_session_reuses_connection(self, mock_smtp):
+        """
+        测试 session 中多封邮件复用同一个已登录的 SMTP 连接，连接失效时自动重连。
+        """
+        notifier = Notifier(dict(self.config.email, password="secret", max_per_minute=None))
+        server = mock_smtp.return_value
+        server.sendmail.side_effect = [None, smtplib.SMTPServerDisconnected("gone"), None]
+
+        with notifier.session():
+            notifier.notify_github_report(self.test_repo, self.test_github_report)
+            notifier.notify_github_report("some/repo", self.test_github_report)
+
+        # 第二封邮件发送失败后重连一次，因此共建立两次连接、登录两次、发送三次
+        self.assertEqual(mock_smtp.call_count, 2)
+        self.assertEqual(server.login.call_count, 2)
+        self.assertEqual(server.sendmail.call_count, 3)
+        server.quit.assert_called()
+
+    @patch('smtplib.SMTP_SSL')
+    def test_session_retries_only_transient_errors(self, mock_smtp):
+        """
+        测试 4xx 临时错误重连后重试，5xx 永久拒绝不重试，也不关闭连接。
+        """
+        notifier = Notifier(dict(self.config.email, max_per_minute=None))
+        server = mock_smtp.return_value
+        server.sendmail.side_effect = [smtplib.SMTPDataError(451, b"try later"), None,
+                                       smtplib.SMTPDataError(554, b"rejected"), None]
+
+        with notifier.session():
+            self.assertTrue(notifier.notify_github_report(self.test_repo, self.test_github_report))
+            self.assertFalse(notifier.notify_github_report("some/repo", self.test_github_report))
+            self.assertTrue(notifier.notify_github_report("other/repo", self.test_github_report))
+
+        # 只有 4xx 错误触发了一次重连；5xx 拒绝的邮件只尝试一次
+        self.assertEqual(mock_smtp.call_count, 2)
+        self.assertEqual(server.sendmail.call_count, 4)
+
+    @patch('smtplib.SMTP_SSL')
+    def test_digest_mode_sends_one_email(self, mock_smtp):
+        """
+        测试摘要模式下一次 session 中的所有报告合并为一封邮件。
+        """
+        notifier = Notifier(dict(self.config.email, digest=True, max_per_minute=None))
+        server = mock_smtp.return_value
+
+        with notifier.session():
+            notifier.notify_github_report(self.test_repo, self.test_github_report)
+            notifier.notify_github_report("some/repo", self.test_github_report)
+            server.sendmail.assert_not_called()
+
+        self.assertEqual(server.sendmail.call_count, 1)
+        self.assertIn("报告汇总（2 份）", self.log_capture.getvalue())
+
+    @patch('smtplib.SMTP_SSL')
+    def test_fan_out_renders_once_per_report(self, mock_smtp):
+        """
+        测试同一份报告只渲染一次 HTML，再分别发送给每个收件人。
+        """
+        notifier = Notifier(dict(self.config.email, max_per_minute=None))
+        server = mock_smtp.return_value
+        recipients = ["a@example.com", "b@example.com", None]
+
+        with patch.object(notifier, 'render', wraps=notifier.render) as mock_render:
+            self.assertTrue(notifier.notify_github_report(self.test_repo, self.test_github_report, recipients=recipients))
+
+        mock_render.assert_called_once()
+        sent_to = [call.args[1] for call in server.sendmail.call_args_list]
+        self.assertEqual(sent_to, ["a@example.com", "b@example.com", self.config.email['to']])
+
+    def test_incomplete_channel_fails_on_construction(self):
+        """
+        测试缺少抽象方法实现的渠道在创建实例时就报错，而不是等到第一次发送。
+        """
+        class IncompleteChannel(NotificationChannel):
+            def is_configured(self):
+                return True
+
+            def render(self, subject, report, structured=None):
+                return report
+
+        with self.assertRaises(TypeError):
+            IncompleteChannel()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from outbox import Outbox, OutboxWorker  # 导入要测试的发件箱类
+from notifier import Notifier  # 导入通过发件箱投递邮件的 Notifier 类
+
+try:
+    from aiosmtpd.controller import Controller  # 本地 SMTP 测试服务器（可选依赖）
+except ImportError:
+    Controller = None
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中创建发件箱数据库。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outbox = Outbox(os.path.join(self.tmp_dir.name, "outbox.db"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_enqueue_deduplicates(self):
+        """
+        测试相同的消息只会入队一次。
+        """
+        self.assertIsNotNone(self.outbox.enqueue("email", "subject", "<p>body</p>"))
+        self.assertIsNone(self.outbox.enqueue("email", "subject", "<p>body</p>"))
+        self.assertEqual(self.outbox.status_counts(), {'pending': 1, 'sent': 0, 'failed': 0})
+
+    def test_worker_retries_until_sent(self):
+        """
+        测试投递失败后按退避策略重试，成功后标记为 sent。
+        """
+        sender = MagicMock(side_effect=[Exception("smtp down"), True])
+        worker = OutboxWorker(self.outbox, {"email": sender}, max_attempts=3, base_backoff=0)
+        self.outbox.enqueue("email", "subject", "<p>body</p>")
+
+        self.assertEqual(worker.drain(), 0)
+        self.assertEqual(worker.drain(), 1)
+        self.assertEqual(self.outbox.status_counts(), {'pending': 0, 'sent': 1, 'failed': 0})
+        sender.assert_called_with("subject", "<p>body</p>", None)
+
+    def test_worker_gives_up_after_max_attempts(self):
+        """
+        测试达到最大尝试次数后消息被标记为 failed，并保留最后的错误信息。
+        """
+        worker = OutboxWorker(self.outbox, {"email": MagicMock(return_value=False)}, max_attempts=2, base_backoff=0)
+        self.outbox.enqueue("email", "subject", "<p>body</p>")
+
+        worker.drain()
+        worker.drain()
+        self.assertEqual(self.outbox.status_counts()['failed'], 1)
+        self.assertEqual(self.outbox.recent_failures()[0]['attempts'], 2)
+        self.assertEqual(worker.drain(), 0)
+
+    @unittest.skipIf(Controller is None, "需要安装 aiosmtpd 才能运行本地 SMTP 投递测试")
+    def test_delivery_through_local_smtp(self):
+        """
+        测试通知器入队的邮件由投递线程通过本地 SMTP 服务器送达。
+        """
+        received = []
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                received.append(envelope)
+                return "250 OK"
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            settings = {"smtp_server": "127.0.0.1", "smtp_port": port, "use_ssl": False,
+                        "from": "sentinel@example.com", "to": "team@example.com", "password": ""}
+            notifier = Notifier(settings, self.outbox)
+            worker = OutboxWorker(self.outbox, {"email": notifier.deliver})
+            worker.batch_contexts["email"] = notifier.connection
+
+            notifier.notify_github_report("a/b", "# a/b 项目进展")
+            notifier.notify_github_report("c/d", "# c/d 项目进展")
+            self.assertEqual(received, [])
+
+            self.assertEqual(worker.drain(), 2)
+            self.assertEqual(len(received), 2)
+            self.assertEqual(received[0].rcpt_tos, ["team@example.com"])
+        finally:
+            controller.stop()
+
+if __name__ == '__main__':
+    unittest.main()
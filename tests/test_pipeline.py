@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pipeline import Pipeline, Stage  # 导入要测试的流水线类
+
+class TestPipeline(unittest.TestCase):
+    def test_run_passes_items_through_all_stages(self):
+        """
+        测试每个条目依次经过所有阶段，且结果全部返回。
+        """
+        pipeline = Pipeline("test", [
+            Stage("double", lambda x: x * 2, workers=2, queue_size=1),
+            Stage("inc", lambda x: x + 1, workers=3, queue_size=1),
+        ])
+        results = pipeline.run(range(10))
+        self.assertEqual(sorted(results), [x * 2 + 1 for x in range(10)])
+
+    def test_failed_and_dropped_items(self):
+        """
+        测试处理失败或返回 None 的条目不会进入下一阶段，也不会中断流水线。
+        """
+        def flaky(x):
+            if x == 3:
+                raise ValueError("boom")
+            return None if x == 4 else x
+
+        first = Stage("flaky", flaky)
+        pipeline = Pipeline("test", [first, Stage("identity", lambda x: x)])
+        results = pipeline.run(range(6))
+
+        self.assertEqual(sorted(results), [0, 1, 2, 5])
+        self.assertEqual(first.errors, 1)
+        self.assertEqual(len(first.durations), 6)
+
+    def test_failing_input_still_stops_workers(self):
+        """
+        测试输入迭代抛出异常时，异常被抛给调用方，已入队的条目仍被处理，所有工作线程都会退出。
+        """
+        processed = []
+
+        def items():
+            yield 1
+            raise RuntimeError("subscriptions unavailable")
+
+        pipeline = Pipeline("broken-input", [Stage("record", processed.append, workers=2)])
+        with self.assertRaises(RuntimeError):
+            pipeline.run(items())
+
+        self.assertEqual(processed, [1])
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("broken-input-")])
+
+    def test_stages_overlap(self):
+        """
+        测试后续条目的第一阶段与先前条目的第二阶段并发执行。
+        """
+        active = set()
+        overlapped = threading.Event()
+        lock = threading.Lock()
+
+        def track(name):
+            def func(x):
+                with lock:
+                    active.add(name)
+                    if len(active) > 1:
+                        overlapped.set()
+                time.sleep(0.05)
+                with lock:
+                    active.discard(name)
+                return x
+            return func
+
+        pipeline = Pipeline("test", [Stage("fetch", track("fetch")), Stage("summarize", track("summarize"))])
+        pipeline.run(range(4))
+        self.assertTrue(overlapped.is_set())
+
+if __name__ == '__main__':
+    unittest.main()
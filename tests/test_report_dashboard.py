@@ -0,0 +1,85 @@
+import sys
+import os
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from report_dashboard import stream_dashboard  # 导入要测试的多仓库看板
+from report_store import BackgroundRefresher  # 导入后台刷新，看板通过它并发生成报告
+
+class TestReportDashboard(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，模拟已保存的报告：只有 fresh/repo 有所选模型的新鲜报告。
+        """
+        stored = MagicMock(path="fresh_report.md")
+        stored.read.return_value = "# fresh 报告"
+        self.report_store = MagicMock()
+        self.report_store.latest.side_effect = lambda repo, days, provider, model: stored if repo == "fresh/repo" else None
+        self.report_store.is_fresh.return_value = True
+        self.refresher = BackgroundRefresher(max_workers=2)
+
+    def test_streams_progress_and_isolates_failures(self):
+        """
+        测试先推送初始进度，之后每完成一个仓库推送一次；单个仓库失败不影响其它仓库，报告按选择顺序排列。
+        """
+        release = threading.Event()
+        calls = []
+
+        def refresh(model_type, model_name, repo, days):
+            calls.append((model_type, model_name, repo, days))
+            release.wait(5)
+            if repo == "bad/repo":
+                raise RuntimeError("LLM 超时")
+            return f"# {repo} 报告", f"{repo.replace('/', '_')}_report.md"
+
+        repos = ["slow/repo", "fresh/repo", "bad/repo"]
+        views = stream_dashboard(repos, 2, "ollama", "llama3.1", self.report_store, self.refresher, refresh)
+
+        progress, combined, files = next(views)
+        self.assertIn("已完成 1/3", progress)
+        self.assertIn("| fresh/repo | 已是最新（使用已保存的报告） |", progress)
+        self.assertIn("| slow/repo | 生成中 |", progress)
+        self.assertEqual((combined, files), ("# fresh 报告", ["fresh_report.md"]))
+        self.report_store.latest.assert_any_call("slow/repo", 2, "ollama", "llama3.1")
+
+        release.set()
+        remaining = list(views)
+        self.assertEqual(len(remaining), 2)
+        progress, combined, files = remaining[-1]
+        self.assertIn("已完成 2/3", progress)
+        self.assertIn("| bad/repo | 失败：LLM 超时 |", progress)
+        self.assertIn("| slow/repo | 完成（", progress)
+        self.assertEqual(combined, "# slow/repo 报告\n\n---\n\n# fresh 报告")
+        self.assertEqual(files, ["slow_repo_report.md", "fresh_report.md"])
+        self.assertEqual(sorted(calls), [("ollama", "llama3.1", "bad/repo", 2), ("ollama", "llama3.1", "slow/repo", 2)])
+
+    def test_refreshes_are_shared_per_model(self):
+        """
+        测试同一模型的进行中刷新被共用，其它模型单独生成。
+        """
+        release = threading.Event()
+        calls = []
+
+        def refresh(model_type, model_name, repo, days):
+            calls.append(model_name)
+            release.wait(5)
+            return f"# {repo} {model_name}", "report.md"
+
+        first = stream_dashboard(["slow/repo"], 2, "ollama", "llama3.1", self.report_store, self.refresher, refresh)
+        same = stream_dashboard(["slow/repo"], 2, "ollama", "llama3.1", self.report_store, self.refresher, refresh)
+        other = stream_dashboard(["slow/repo"], 2, "ollama", "qwen2:7b", self.report_store, self.refresher, refresh)
+        for views in (first, same, other):
+            next(views)
+        release.set()
+
+        self.assertEqual(list(first)[-1][1], "# slow/repo llama3.1")
+        self.assertEqual(list(same)[-1][1], "# slow/repo llama3.1")
+        self.assertEqual(list(other)[-1][1], "# slow/repo qwen2:7b")
+        self.assertEqual(sorted(calls), ["llama3.1", "qwen2:7b"])
+
+if __name__ == '__main__':
+    unittest.main()
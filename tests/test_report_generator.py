@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -16,6 +17,7 @@ class TestReportGenerator(unittest.TestCase):
         # 创建一个模拟的 LLM（大语言模型）对象
         self.mock_llm = MagicMock()
         self.mock_llm.model = "mock_model"  # 确保mock对象有一个有效的模型名称
+        self.mock_llm.model_name.return_value = "mock_model_name"  # 报告旁记录的模型名称
 
         # 模拟提示内容
         self.mock_prompts = {
@@ -62,8 +64,9 @@ class TestReportGenerator(unittest.TestCase):
 
         # 删除生成的报告文件
         report_file_path = os.path.splitext(self.test_markdown_file_path)[0] + "_report.md"
-        if os.path.exists(report_file_path):
-            os.remove(report_file_path)
+        for path in (report_file_path, os.path.splitext(report_file_path)[0] + ".meta.json"):
+            if os.path.exists(path):
+                os.remove(path)
 
         hn_topic_report_path = os.path.splitext(self.test_hn_topic_file_path)[0] + "_topic.md"
         if os.path.exists(hn_topic_report_path):
@@ -107,6 +110,10 @@ class TestReportGenerator(unittest.TestCase):
         # 验证 LLM 的 generate_report 方法是否被正确调用，且传入了正确的参数
         self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["github"], self.markdown_content)
 
+        # 验证报告旁记录了生成报告的模型
+        with open(os.path.splitext(report_file_path)[0] + ".meta.json", 'r') as file:
+            self.assertEqual(json.load(file), {"provider": "mock_model", "model": "mock_model_name"})
+
     @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
     def test_generate_hn_topic_report(self, mock_preload_prompts):
         """
@@ -164,5 +171,124 @@ class TestReportGenerator(unittest.TestCase):
         aggregated_content = self.report_generator._aggregate_topic_reports(self.test_hn_daily_dir_path)
         self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["hacker_news_daily_report"], aggregated_content)
 
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_incremental_hn_daily_report(self, mock_preload_prompts):
+        """
+        测试增量模式下小时主题报告被折叠进滚动汇总，每日汇总只合并尚未折叠的部分。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github", "hacker_news_hours_topic", "hacker_news_daily_report"], incremental_daily=True)
+        self.report_generator.prompts = self.mock_prompts
+
+        hour_file_path = os.path.join(self.test_hn_daily_dir_path, "10.md")
+        with open(hour_file_path, 'w') as file:
+            file.write(self.markdown_content)
+
+        # 生成小时主题报告时同时折叠已有的两份主题报告，共两次 LLM 调用
+        self.mock_llm.generate_report.side_effect = ["topic report", "rolling summary"]
+        self.report_generator.generate_hn_topic_report(hour_file_path)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+        with open(os.path.join(self.test_hn_daily_dir_path, ReportGenerator.ROLLING_SUMMARY_FILE)) as file:
+            self.assertEqual(file.read(), "rolling summary")
+
+        # 没有新的主题报告时，每日汇总直接复用滚动汇总，不再调用 LLM
+        report, _ = self.report_generator.generate_hn_daily_report(self.test_hn_daily_dir_path)
+        self.assertEqual(report, "rolling summary")
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+
+        # 每日汇总自己合并了新的主题报告时，同时更新滚动汇总与折叠记录，再次生成时不再重复合并
+        with open(os.path.join(self.test_hn_daily_dir_path, "11_topic.md"), 'w') as file:
+            file.write("late topic report")
+        self.mock_llm.generate_report.side_effect = ["daily summary"]
+        report, _ = self.report_generator.generate_hn_daily_report(self.test_hn_daily_dir_path)
+        self.assertEqual(report, "daily summary")
+        with open(os.path.join(self.test_hn_daily_dir_path, ReportGenerator.ROLLING_SUMMARY_FILE)) as file:
+            self.assertEqual(file.read(), "daily summary")
+        report, _ = self.report_generator.generate_hn_daily_report(self.test_hn_daily_dir_path)
+        self.assertEqual(report, "daily summary")
+        self.assertEqual(self.mock_llm.generate_report.call_count, 3)
+
+    def test_aggregate_topic_reports_in_order(self):
+        """
+        测试主题报告按文件名顺序聚合。
+        """
+        for hour in ["12", "04"]:
+            with open(os.path.join(self.test_hn_daily_dir_path, f"{hour}_topic.md"), 'w') as file:
+                file.write(f"hour {hour}")
+
+        with patch.object(ReportGenerator, '_preload_prompts', return_value=None):
+            report_generator = ReportGenerator(self.mock_llm, [])
+        content = report_generator._aggregate_topic_reports(self.test_hn_daily_dir_path)
+        self.assertEqual(content, "hour 04\nhour 12\n" + self.markdown_content + "\n")
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_generate_github_delta_report(self, mock_preload_prompts):
+        """
+        测试增量报告只把新条目和上次报告交给 LLM，没有新条目时不调用 LLM。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github", "github_delta"])
+        self.report_generator.prompts = dict(self.mock_prompts, github_delta="GitHub delta prompt...")
+        self.mock_llm.generate_report.side_effect = ["full report", "delta report"]
+
+        repo_dir = self.test_hn_daily_dir_path  # 复用测试目录，tearDown 时统一清理
+        first = os.path.join(repo_dir, "2024-08-20_to_2024-08-22.md")
+        second = os.path.join(repo_dir, "2024-08-21_to_2024-08-23.md")
+        with open(first, 'w') as file:
+            file.write("# Progress for a/b (2024-08-20 to 2024-08-22)\n\n- Fix bug #1\n- Add feature #2\n")
+        with open(second, 'w') as file:
+            file.write("# Progress for a/b (2024-08-21 to 2024-08-23)\n\n- Add feature #2\n- Improve docs #3\n")
+
+        # 第一次没有上次报告，退回完整报告
+        report, _ = self.report_generator.generate_github_delta_report(first)
+        self.assertEqual(report, "full report")
+
+        report, report_file_path = self.report_generator.generate_github_delta_report(second)
+        self.assertEqual(report, "delta report")
+        self.assertTrue(report_file_path.endswith("_delta_report.md"))
+        prompt, user_content = self.mock_llm.generate_report.call_args.args
+        self.assertEqual(prompt, "GitHub delta prompt...")
+        self.assertIn("full report", user_content)
+        self.assertIn("- Improve docs #3", user_content)
+        self.assertNotIn("#2", user_content)
+
+        # 再次生成同一窗口时没有新条目
+        report, _ = self.report_generator.generate_github_delta_report(second)
+        self.assertIn("没有新的进展", report)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_generate_structured_github_report(self, mock_preload_prompts):
+        """
+        测试结构化输出模式下 LLM 返回的 JSON 被缓存，并在本地渲染为 Markdown 报告。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"], structured=True)
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.generate_report.return_value = json.dumps(
+            {"title": "openai-quickstart 项目进展", "sections": [{"heading": "修复问题", "items": [{"text": "Fix bug"}]}]}
+        )
+
+        report, report_file_path = self.report_generator.generate_github_report(self.test_markdown_file_path)
+        self.assertEqual(report, "# openai-quickstart 项目进展\n\n## 修复问题\n- Fix bug\n")
+        self.assertTrue(self.mock_llm.generate_report.call_args.kwargs['json_mode'])
+
+        structured = self.report_generator.load_structured(report_file_path)
+        self.assertEqual(structured["sections"][0]["items"][0]["text"], "Fix bug")
+        os.remove(os.path.splitext(report_file_path)[0] + ".json")
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_invalid_structured_output_falls_back_to_markdown(self, mock_preload_prompts):
+        """
+        测试 LLM 返回无效 JSON 时重试一次，仍然无效则退回普通 Markdown 提示，不缓存结构化报告。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"], structured=True)
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.generate_report.side_effect = ["不是 JSON", json.dumps({"title": "缺少 sections"}), "# Markdown 报告"]
+
+        report, report_file_path = self.report_generator.generate_github_report(self.test_markdown_file_path)
+        self.assertEqual(report, "# Markdown 报告")
+        self.assertEqual(self.mock_llm.generate_report.call_count, 3)
+        self.assertNotIn('json_mode', self.mock_llm.generate_report.call_args.kwargs)
+        self.assertEqual(self.mock_llm.generate_report.call_args.args, (self.mock_prompts["github"], self.markdown_content))
+        self.assertIsNone(self.report_generator.load_structured(report_file_path))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import os
+import unittest
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from report_manifest import ReportManifest  # 导入要测试的 ReportManifest 类
+from report_generator import ReportGenerator  # 导入使用报告清单的 ReportGenerator 类
+
+class TestReportManifest(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建临时目录存放清单与进展文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manifest_file = os.path.join(self.tmp_dir.name, "data", "manifest.json")  # 保存时自动创建所在目录
+        self.mock_llm = MagicMock()
+        self.mock_llm.model = "mock_model"
+        self.mock_llm.model_name.return_value = "mock_model_name"
+        self.mock_llm.generate_report.return_value = "report"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_progress(self, name, heading, body):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w') as file:
+            file.write(f"# {heading}\n\n{body}")
+        return path
+
+    def test_lookup_and_persist(self):
+        """
+        测试清单记录后可以被重新加载并命中。
+        """
+        output_path = os.path.join(self.tmp_dir.name, "out.md")
+        with open(output_path, 'w') as file:
+            file.write("old")
+
+        manifest = ReportManifest(self.manifest_file)
+        input_hash = ReportManifest.hash_input("model", "prompt", "content")
+        manifest.record("key", input_hash, output_path)
+
+        reloaded = ReportManifest(self.manifest_file)
+        self.assertEqual(reloaded.lookup("key", input_hash), output_path)
+        self.assertIsNone(reloaded.lookup("key", ReportManifest.hash_input("model", "prompt", "changed")))
+
+    def test_processes_do_not_drop_each_others_entries(self):
+        """
+        测试两个进程（两个实例）共用同一份清单时，各自记录的条目都被保留。
+        """
+        worker_a = ReportManifest(self.manifest_file)
+        worker_b = ReportManifest(self.manifest_file)
+        worker_a.record("a/b", "hash-a", "a.md")
+        worker_b.record("c/d", "hash-c", "c.md")
+        worker_a.record("e/f", "hash-e", "e.md")
+
+        entries = ReportManifest(self.manifest_file).entries
+        self.assertEqual(set(entries), {"a/b", "c/d", "e/f"})
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_unchanged_input_reuses_report(self, mock_preload_prompts):
+        """
+        测试仅日期标题不同、正文相同的进展文件会复用上次的报告，不再调用 LLM。
+        """
+        report_generator = ReportGenerator(self.mock_llm, ["github"], manifest=ReportManifest(self.manifest_file))
+        report_generator.prompts = {"github": "GitHub specific prompt..."}
+
+        first = self._write_progress("2024-08-20_to_2024-08-21.md", "Progress for a/b (2024-08-20 to 2024-08-21)", "- Fix bug #1\n")
+        second = self._write_progress("2024-08-21_to_2024-08-22.md", "Progress for a/b (2024-08-21 to 2024-08-22)", "- Fix bug #1\n")
+        third = self._write_progress("2024-08-22_to_2024-08-23.md", "Progress for a/b (2024-08-22 to 2024-08-23)", "- New feature #2\n")
+
+        _, first_report_path = report_generator.generate_github_report(first)
+        report, second_report_path = report_generator.generate_github_report(second)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 1)
+        self.assertEqual(report, "report")
+        self.assertTrue(os.path.exists(second_report_path))
+        self.assertFalse(report_generator.is_unchanged(first_report_path))
+        self.assertTrue(report_generator.is_unchanged(second_report_path))
+
+        _, third_report_path = report_generator.generate_github_report(third)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+        self.assertFalse(report_generator.is_unchanged(third_report_path))
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_changing_configured_model_regenerates_report(self, mock_preload_prompts):
+        """
+        测试修改配置中的模型名称（未按订阅指定模型）后，相同的输入不再复用旧报告。
+        """
+        report_generator = ReportGenerator(self.mock_llm, ["github"], manifest=ReportManifest(self.manifest_file))
+        report_generator.prompts = {"github": "GitHub specific prompt..."}
+        progress = self._write_progress("2024-08-20_to_2024-08-21.md", "Progress for a/b", "- Fix bug #1\n")
+
+        report_generator.generate_github_report(progress)
+        report_generator.generate_github_report(progress)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 1)
+
+        self.mock_llm.model_name.return_value = "another_model_name"
+        report_generator.generate_github_report(progress)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from report_renderer import parse_report, render, validate_report  # 导入要测试的结构化报告函数
+
+class TestReportRenderer(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，准备一份结构化报告。
+        """
+        self.report = {
+            "title": "LangChain 项目进展",
+            "period": "2024-08-13至2024-08-18",
+            "sections": [
+                {"heading": "新增功能", "items": [{"text": "添加 <Box> 加载器", "links": ["https://example.com/1"]}]},
+                {"heading": "修复问题", "items": [{"text": "修复Azure的json模式问题"}]},
+            ],
+        }
+
+    def test_parse_report_accepts_code_fence(self):
+        """
+        测试 parse_report 能解析包裹在代码块中的 JSON。
+        """
+        content = "```json\n" + json.dumps(self.report, ensure_ascii=False) + "\n```"
+        self.assertEqual(parse_report(content), self.report)
+
+    def test_validate_report_rejects_invalid(self):
+        """
+        测试不符合 schema 的报告会抛出 ValueError。
+        """
+        with self.assertRaises(ValueError):
+            validate_report({"title": "x"})
+        with self.assertRaises(ValueError):
+            validate_report({"title": "x", "sections": [{"heading": "h", "items": [{"links": []}]}]})
+        with self.assertRaises(ValueError):
+            parse_report("not json")
+
+    def test_render_formats(self):
+        """
+        测试同一份结构化报告可以渲染为多种格式。
+        """
+        markdown = render(self.report, "markdown")
+        self.assertTrue(markdown.startswith("# LangChain 项目进展\n"))
+        self.assertIn("## 时间周期：2024-08-13至2024-08-18", markdown)
+        self.assertIn("- 修复Azure的json模式问题", markdown)
+
+        html = render(self.report, "html")
+        self.assertIn("<li>添加 &lt;Box&gt; 加载器 <a href=\"https://example.com/1\">", html)
+
+        text = render(self.report, "text")
+        self.assertIn("  * 修复Azure的json模式问题", text)
+
+        blocks = render(self.report, "slack")
+        self.assertEqual(blocks[0]["type"], "header")
+        self.assertIn("&lt;Box&gt;", blocks[2]["text"]["text"])
+
+        with self.assertRaises(ValueError):
+            render(self.report, "pdf")
+
+if __name__ == '__main__':
+    unittest.main()
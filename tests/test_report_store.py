@@ -0,0 +1,95 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from report_store import ReportStore, BackgroundRefresher  # 导入要测试的报告查找与后台刷新
+
+class TestReportStore(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中准备不同时间窗口的报告文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.repo_dir = os.path.join(self.tmp_dir.name, "owner_repo")
+        os.makedirs(self.repo_dir)
+        self.store = ReportStore(self.tmp_dir.name, max_age_minutes=60)
+        self.today = date.today()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, content="report", age_seconds=0):
+        path = os.path.join(self.repo_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        mtime = time.time() - age_seconds
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_latest_report_for_window_and_freshness(self):
+        """
+        测试按时间窗口找到结束日期最新的完整报告（忽略增量报告与原始进展），并按生成时间判断是否新鲜。
+        """
+        yesterday = self.today - timedelta(days=1)
+        self._write(f"{yesterday - timedelta(days=2)}_to_{yesterday}_report.md")
+        current = self._write(f"{self.today - timedelta(days=2)}_to_{self.today}_report.md", "今天的报告", age_seconds=7200)
+        self._write(f"{self.today - timedelta(days=2)}_to_{self.today}_delta_report.md")
+        self._write(f"{self.today - timedelta(days=2)}_to_{self.today}.md")
+        self._write(f"{self.today - timedelta(days=1)}_to_{self.today}_report.md")
+
+        stored = self.store.latest("owner/repo", 2)
+        self.assertEqual(stored.path, current)
+        self.assertEqual(stored.read(), "今天的报告")
+        self.assertFalse(self.store.is_fresh(stored))
+        self.assertTrue(self.store.is_fresh(self.store.latest("owner/repo", 1)))
+        self.assertIsNone(self.store.latest("owner/repo", 7))
+        self.assertIsNone(self.store.latest("other/repo", 2))
+
+    def test_latest_report_for_model(self):
+        """
+        测试指定模型时只返回记录为该模型生成的报告，没有模型记录的旧报告不参与匹配。
+        """
+        since = self.today - timedelta(days=2)
+        llama = self._write(f"{since}_to_{self.today}_report.md", "llama 报告", age_seconds=60)
+        with open(os.path.join(self.repo_dir, f"{since}_to_{self.today}_report.meta.json"), 'w') as f:
+            json.dump({"provider": "ollama", "model": "llama3.1"}, f)
+        self._write(f"{since - timedelta(days=1)}_to_{self.today - timedelta(days=1)}_report.md", "旧版本报告")
+
+        stored = self.store.latest("owner/repo", 2, "ollama", "llama3.1")
+        self.assertEqual((stored.path, stored.provider, stored.model), (llama, "ollama", "llama3.1"))
+        self.assertIsNone(self.store.latest("owner/repo", 2, "ollama", "qwen2:7b"))
+        self.assertIsNone(self.store.latest("owner/repo", 2, "openai", "llama3.1"))
+        self.assertEqual(self.store.latest("owner/repo", 2).path, llama)
+
+    def test_refresher_deduplicates_in_flight_refreshes(self):
+        """
+        测试同一个键的刷新进行中时，后续请求共用同一次刷新；完成后可以再次刷新。
+        """
+        refresher = BackgroundRefresher(max_workers=2)
+        release = threading.Event()
+        calls = []
+
+        def refresh(value):
+            calls.append(value)
+            release.wait(5)
+            return value
+
+        first = refresher.submit(("owner/repo", 2), refresh, "first")
+        second = refresher.submit(("owner/repo", 2), refresh, "second")
+        release.set()
+
+        self.assertIs(first, second)
+        self.assertEqual(second.result(), "first")
+        self.assertEqual(refresher.submit(("owner/repo", 2), refresh, "third").result(), "third")
+        self.assertEqual(calls, ["first", "third"])
+
+if __name__ == '__main__':
+    unittest.main()
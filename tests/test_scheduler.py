@@ -0,0 +1,103 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from datetime import datetime
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from scheduler import Scheduler, CronTrigger, IntervalTrigger  # 导入要测试的调度器
+
+class TestCronTrigger(unittest.TestCase):
+    def test_next_after(self):
+        """
+        测试 cron 表达式计算下一次触发时间。
+        """
+        start = datetime(2024, 9, 1, 10, 30).timestamp()  # 2024-09-01 是周日
+        self.assertEqual(datetime.fromtimestamp(CronTrigger("0 */4 * * *").next_after(start)), datetime(2024, 9, 1, 12, 0))
+        self.assertEqual(datetime.fromtimestamp(CronTrigger("0 10 * * *").next_after(start)), datetime(2024, 9, 2, 10, 0))
+        self.assertEqual(datetime.fromtimestamp(CronTrigger("15 8 * * 1-5").next_after(start)), datetime(2024, 9, 2, 8, 15))
+        self.assertEqual(datetime.fromtimestamp(CronTrigger("0 0 1 1 *").next_after(start)), datetime(2025, 1, 1, 0, 0))
+
+    def test_invalid_expression(self):
+        """
+        测试非法的 cron 表达式会抛出 ValueError。
+        """
+        with self.assertRaises(ValueError):
+            CronTrigger("* * *")
+        with self.assertRaises(ValueError):
+            CronTrigger("61 * * * *")
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在后台线程中启动调度器。
+        """
+        self.scheduler = Scheduler()
+        self.thread = threading.Thread(target=self.scheduler.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.scheduler.stop(wait=True, timeout=2)
+        self.thread.join(2)
+
+    def test_long_job_does_not_delay_other_jobs(self):
+        """
+        测试长时间运行的任务在独立线程中执行，不会推迟其他任务。
+        """
+        release = threading.Event()
+        fast_runs = []
+        self.scheduler.add_job("slow", release.wait, IntervalTrigger(0.05), args=(5,))
+        self.scheduler.add_job("fast", lambda: fast_runs.append(time.time()), IntervalTrigger(0.05))
+        time.sleep(0.4)
+        release.set()
+        self.assertGreaterEqual(len(fast_runs), 3)
+
+    def test_overlap_policies(self):
+        """
+        测试 skip 策略跳过重叠的运行，queue 策略在结束后补跑一次，allow 策略并发运行。
+        """
+        release = threading.Event()
+        runs = {"skip": 0, "queue": 0, "allow": 0}
+
+        def job(name):
+            runs[name] += 1
+            release.wait(5)
+
+        for name in runs:
+            self.scheduler.add_job(name, job, IntervalTrigger(3600), args=(name,), overlap=name)
+            for _ in range(3):
+                self.scheduler.run_now(name)
+        time.sleep(0.1)
+        self.assertEqual(runs, {"skip": 1, "queue": 1, "allow": 3})
+
+        release.set()
+        time.sleep(0.2)
+        self.assertEqual(runs["queue"], 2)  # 多次排队合并为一次补跑
+        self.assertEqual(runs["skip"], 1)
+
+    def test_replacing_running_job_keeps_overlap_state(self):
+        """
+        测试运行中的任务被同名任务替换后，重叠策略仍对旧实例生效，排队的补跑使用新任务，结束后计数归零。
+        """
+        release = threading.Event()
+        runs = []
+        self.scheduler.add_job("job", lambda: (runs.append("old"), release.wait(5)), IntervalTrigger(3600))
+        self.scheduler.run_now("job")
+        time.sleep(0.05)
+
+        job = self.scheduler.add_job("job", lambda: runs.append("new"), IntervalTrigger(3600), overlap="queue")
+        self.assertEqual(job.running, 1)
+        self.scheduler.run_now("job")
+        self.assertEqual(runs, ["old"])  # 旧实例仍在运行，新任务的运行排队等待
+
+        release.set()
+        time.sleep(0.2)
+        self.assertEqual(runs, ["old", "new"])
+        self.assertEqual(job.running, 0)
+        self.assertFalse(job.pending)
+
+if __name__ == '__main__':
+    unittest.main()
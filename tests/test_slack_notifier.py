@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from slack_notifier import SlackNotifier, SLACK_MAX_BLOCKS, markdown_to_blocks  # 导入要测试的 Slack 通知渠道
+from report_renderer import SLACK_TEXT_LIMIT
+
+class TestSlackNotifier(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，初始化不限速的 Slack 通知渠道。
+        """
+        self.settings = {"webhook_url": "https://hooks.slack.com/services/T/B/X", "max_per_minute": None}
+        self.report = "# a/b 项目进展\n\n## 新增功能\n- 添加嵌入集成测试\n"
+
+    def _response(self, status_code, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        return response
+
+    def test_not_configured_with_placeholder(self):
+        """
+        测试占位 Webhook 地址不会被视为已配置。
+        """
+        notifier = SlackNotifier({"webhook_url": "your_slack_webhook_url"})
+        self.assertFalse(notifier.is_configured())
+        self.assertFalse(notifier.notify_github_report("a/b", self.report))
+
+    def test_markdown_to_blocks_respects_text_limit(self):
+        """
+        测试长报告被切分为不超过 Slack 长度上限的多个 section。
+        """
+        report = "# 标题\n" + "\n".join(f"- item {i} " + "x" * 80 for i in range(100))
+        blocks = markdown_to_blocks(report)
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(len(block["text"]["text"]) <= SLACK_TEXT_LIMIT for block in blocks))
+        self.assertTrue(blocks[0]["text"]["text"].startswith("*标题*"))
+
+    @patch('slack_notifier.requests.post')
+    def test_session_batches_reports_into_grouped_posts(self, mock_post):
+        """
+        测试 session 中的多个报告被合并，并按 block 数上限拆分成多条消息。
+        """
+        mock_post.return_value = self._response(200)
+        notifier = SlackNotifier(self.settings)
+
+        with notifier.session():
+            for i in range(30):
+                notifier.notify_github_report(f"org/repo{i}", self.report)
+            mock_post.assert_not_called()
+
+        payloads = [json.loads(call.kwargs['data'].decode('utf-8')) for call in mock_post.call_args_list]
+        self.assertGreater(len(payloads), 1)
+        self.assertTrue(all(len(payload["blocks"]) <= SLACK_MAX_BLOCKS for payload in payloads))
+        self.assertTrue(payloads[0]["text"].endswith(f"(1/{len(payloads)})"))
+
+    @patch('slack_notifier.time.sleep')
+    @patch('slack_notifier.requests.post')
+    def test_deliver_retries_after_rate_limit(self, mock_post, mock_sleep):
+        """
+        测试遇到 429 时按 Retry-After 等待后重试。
+        """
+        mock_post.side_effect = [self._response(429, {'Retry-After': '2'}), self._response(200)]
+        notifier = SlackNotifier(dict(self.settings, batch=False))
+
+        self.assertTrue(notifier.notify_github_report("a/b", self.report))
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once_with(2.0)
+
+if __name__ == '__main__':
+    unittest.main()
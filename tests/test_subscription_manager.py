@@ -2,36 +2,46 @@ import sys
 import os
 import unittest
 import json
+import tempfile
 from unittest.mock import patch, mock_open, call
 
 # 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from subscription_manager import SubscriptionManager  # 导入要测试的 SubscriptionManager 类
+from subscription_manager import SubscriptionManager, read_repo_file  # 导入要测试的 SubscriptionManager 类
 
 class TestSubscriptionManager(unittest.TestCase):
     def setUp(self):
         # 在每个测试之前设置测试所需的数据
         self.subscriptions_file = 'test_subscriptions.json'  # 测试用的订阅文件名
         self.initial_data = ["DjangoPeng/openai-quickstart", "some/repo"]  # 测试用的初始订阅数据
+        self.tmp_dir = tempfile.TemporaryDirectory()  # 需要真实写入文件的测试使用临时目录
+        self.subscriptions_path = os.path.join(self.tmp_dir.name, "subscriptions.json")
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps(["DjangoPeng/openai-quickstart", "some/repo"]))
-    def test_save_subscriptions(self, mock_file):
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_file(self, data):
+        with open(self.subscriptions_path, 'w') as f:
+            json.dump(data, f)
+        return self.subscriptions_path
+
+    def _read_file(self):
+        with open(self.subscriptions_path, 'r') as f:
+            return json.load(f)
+
+    def test_save_subscriptions(self):
         """
-        测试 save_subscriptions 方法是否正确保存订阅数据到文件。
+        测试 save_subscriptions 方法是否原子地保存订阅数据到文件（不留下临时文件）。
         """
         # 创建 SubscriptionManager 实例，并设置初始数据
-        manager = SubscriptionManager(self.subscriptions_file)
+        manager = SubscriptionManager(self._write_file(["old/repo"]))
         manager.subscriptions = self.initial_data
         manager.save_subscriptions()
-        
-        # 验证 open 函数是否被调用，分别用于读取和写入文件
-        mock_file.assert_any_call(self.subscriptions_file, 'r')  # 检查读取操作
-        mock_file.assert_any_call(self.subscriptions_file, 'w')  # 检查写入操作
 
-        # 提取写入的字符串内容，并验证写入内容是否正确
-        written_data = ''.join([call_arg.args[0] for call_arg in mock_file().write.call_args_list])
-        self.assertEqual(json.loads(written_data), self.initial_data)
+        # 验证写入的内容是否正确
+        self.assertEqual(self._read_file(), self.initial_data)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [os.path.basename(self.subscriptions_path)])
 
     @patch('builtins.open', new_callable=mock_open, read_data=json.dumps(["DjangoPeng/openai-quickstart", "some/repo"]))
     def test_load_subscriptions(self, mock_file):
@@ -62,43 +72,114 @@ class TestSubscriptionManager(unittest.TestCase):
         # 验证 open 函数是否正确调用以读取文件
         mock_file.assert_called_once_with(self.subscriptions_file, 'r')
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps(["DjangoPeng/openai-quickstart"]))
-    def test_add_subscription(self, mock_file):
+    def test_add_subscription(self):
         """
         测试 add_subscription 方法是否正确添加新的订阅，并保存到文件。
         """
         # 创建 SubscriptionManager 实例，并添加新的订阅
-        manager = SubscriptionManager(self.subscriptions_file)
-        manager.add_subscription("new/repo")
-        
-        # 验证新的订阅是否正确添加到订阅列表中
-        self.assertIn("new/repo", manager.subscriptions)
-        
-        # 验证 open 函数是否正确调用以写入文件
-        mock_file.assert_called_with(self.subscriptions_file, 'w')
-        
-        # 提取写入的字符串内容，并验证写入的内容是否正确
-        written_data = ''.join([call_arg.args[0] for call_arg in mock_file().write.call_args_list])
-        self.assertEqual(json.loads(written_data), ["DjangoPeng/openai-quickstart", "new/repo"])
+        manager = SubscriptionManager(self._write_file(["DjangoPeng/openai-quickstart"]))
+        self.assertTrue(manager.add_subscription("new/repo"))
+        self.assertFalse(manager.add_subscription("new/repo"))
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps(["DjangoPeng/openai-quickstart", "some/repo"]))
-    def test_remove_subscription(self, mock_file):
+        # 验证新的订阅是否正确添加到订阅列表中，并写入文件
+        self.assertIn("new/repo", manager.list_repos())
+        self.assertEqual(self._read_file(), ["DjangoPeng/openai-quickstart", "new/repo"])
+
+    def test_remove_subscription(self):
         """
         测试 remove_subscription 方法是否正确移除订阅，并保存到文件。
         """
         # 创建 SubscriptionManager 实例，并移除指定的订阅
-        manager = SubscriptionManager(self.subscriptions_file)
+        manager = SubscriptionManager(self._write_file(self.initial_data))
         manager.remove_subscription("some/repo")
-        
-        # 验证订阅列表中是否已移除指定的订阅
-        self.assertNotIn("some/repo", manager.subscriptions)
-        
-        # 验证 open 函数是否正确调用以写入文件
-        mock_file.assert_called_with(self.subscriptions_file, 'w')
-        
-        # 提取写入的字符串内容，并验证写入的内容是否正确
-        written_data = ''.join([call_arg.args[0] for call_arg in mock_file().write.call_args_list])
-        self.assertEqual(json.loads(written_data), ["DjangoPeng/openai-quickstart"])
+
+        # 验证订阅列表中是否已移除指定的订阅，并写入文件
+        self.assertNotIn("some/repo", manager.list_repos())
+        self.assertEqual(self._read_file(), ["DjangoPeng/openai-quickstart"])
+
+    def test_recipients_for(self):
+        """
+        测试按收件人订阅时仓库只列出一次，并能查到所有订阅该仓库的收件人。
+        """
+        manager = SubscriptionManager(self._write_file([
+            "some/repo",
+            {"repo": "some/repo", "recipients": ["a@example.com"]},
+            {"repo": "other/repo", "recipients": ["a@example.com", "b@example.com"]},
+        ]))
+
+        self.assertEqual(manager.list_repos(), ["some/repo", "other/repo"])
+        self.assertEqual(manager.recipients_for("some/repo"), [None, "a@example.com"])
+        self.assertEqual(manager.recipients_for("other/repo"), ["a@example.com", "b@example.com"])
+
+        # 只移除一个收件人时保留其他收件人的订阅
+        manager.remove_subscription("other/repo", "a@example.com")
+        self.assertEqual(manager.recipients_for("other/repo"), ["b@example.com"])
+        manager.add_subscription("other/repo", "c@example.com")
+        self.assertEqual(manager.recipients_for("other/repo"), ["b@example.com", "c@example.com"])
+        self.assertEqual(self._read_file()[-1], {"repo": "other/repo", "recipients": ["b@example.com", "c@example.com"]})
+
+    def test_bulk_changes_merge_concurrent_writers(self):
+        """
+        测试批量增删只写一次文件，并且会合并另一个进程（另一个实例）已写入的修改。
+        """
+        repo_file = os.path.join(self.tmp_dir.name, "repos.txt")
+        with open(repo_file, 'w') as f:
+            f.write("# 批量订阅\nbulk/a\n\nbulk/b  # 行尾注释\nsome/repo\n")
+        daemon_manager = SubscriptionManager(self._write_file(self.initial_data))
+        cli_manager = SubscriptionManager(self.subscriptions_path)
+
+        self.assertEqual(cli_manager.add_subscriptions(read_repo_file(repo_file)), 2)
+        # 另一个实例基于过期的内存数据修改时，不会覆盖前面的批量添加
+        daemon_manager.add_subscription("daemon/repo")
+        self.assertEqual(self._read_file(), self.initial_data + ["bulk/a", "bulk/b", "daemon/repo"])
+
+        self.assertEqual(cli_manager.remove_subscriptions(["bulk/a", "bulk/b", "missing/repo"]), 2)
+        self.assertEqual(cli_manager.list_repos(), self.initial_data + ["daemon/repo"])
+
+    def test_settings_and_indexed_queries(self):
+        """
+        测试订阅参数的保存与读取，以及按收件人查询、按报告频率与优先级查询到期仓库。
+        """
+        manager = SubscriptionManager(self._write_file([
+            "daily/repo",
+            {"repo": "weekly/repo", "recipients": ["a@example.com"], "frequency_days": 7, "labels": ["bug"]},
+            {"repo": "urgent/repo", "priority": 10},
+        ]), os.path.join(self.tmp_dir.name, "state", "subscription_state.json"))
+        manager.update_settings("daily/repo", model="qwen2", window_days=2)
+
+        self.assertEqual(manager.settings_for("weekly/repo"), {"frequency_days": 7, "labels": ["bug"]})
+        self.assertEqual(manager.settings_for("daily/repo"), {"window_days": 2, "model": "qwen2"})
+        self.assertEqual(manager.recipients_for("urgent/repo"), [None])
+        self.assertEqual(manager.by_recipient("a@example.com"), ["weekly/repo"])
+        self.assertEqual(manager.by_recipient(None), ["daily/repo", "urgent/repo"])
+        # 只有默认收件人的仓库，参数写在不含 recipients 的订阅项中
+        self.assertIn({"repo": "daily/repo", "window_days": 2, "model": "qwen2"}, self._read_file())
+
+        now = 1_000_000
+        self.assertEqual(manager.due_now(now), ["urgent/repo", "daily/repo", "weekly/repo"])
+        for repo in manager.list_repos():
+            manager.mark_run(repo, now)
+        day = 86400
+        self.assertEqual(manager.due_now(now + day), ["urgent/repo", "daily/repo"])
+
+        # 上次报告时间被持久化，重启后仍按频率判断
+        restarted = SubscriptionManager(self.subscriptions_path, manager.state_file)
+        self.assertEqual(restarted.due_now(now + 6 * day), ["urgent/repo", "daily/repo"])
+        self.assertEqual(restarted.due_now(now + 7 * day)[-1], "weekly/repo")
+
+    def test_due_now_merges_runs_recorded_by_other_process(self):
+        """
+        测试协调进程的实例在判断到期时，会读取工作进程（另一个实例）记录的报告时间。
+        """
+        state_file = os.path.join(self.tmp_dir.name, "subscription_state.json")
+        coordinator = SubscriptionManager(self._write_file([{"repo": "a/b", "frequency_days": 7}]), state_file)
+        worker = SubscriptionManager(self.subscriptions_path, state_file)
+
+        now = 1_000_000
+        self.assertEqual(coordinator.due_now(now), ["a/b"])
+        worker.mark_run("a/b", now)
+        self.assertEqual(coordinator.due_now(now + 86400), [])
+        self.assertEqual(coordinator.due_now(now + 7 * 86400), ["a/b"])
 
 if __name__ == '__main__':
     unittest.main()
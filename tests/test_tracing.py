@@ -0,0 +1,69 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import tracing  # 导入要测试的追踪模块
+from pipeline import Pipeline, Stage  # 导入在工作线程中运行各阶段的流水线
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，把 span 导出到临时文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.trace_file = os.path.join(self.tmp_dir.name, "traces.jsonl")
+        tracing.configure(self.trace_file)
+
+    def tearDown(self):
+        tracing.configure(None)
+        self.tmp_dir.cleanup()
+
+    def test_pipeline_stages_are_children_of_job_span(self):
+        """
+        测试流水线工作线程中的阶段 span 与阶段内部的 span 都挂在任务的根 span 之下。
+        """
+        def fetch(repo):
+            with tracing.span("github.request", repo=repo):
+                return repo
+
+        with tracing.span("job.github"):
+            Pipeline("github", [Stage("fetch", fetch, workers=2)]).run(["a/b", "c/d"])
+
+        [spans] = tracing.load_spans(self.trace_file)
+        by_id = {s['span_id']: s for s in spans}
+        root = next(s for s in spans if s['name'] == "job.github")
+        stage_spans = [s for s in spans if s['name'] == "github.fetch"]
+        requests = [s for s in spans if s['name'] == "github.request"]
+
+        self.assertIsNone(root['parent_id'])
+        self.assertEqual(len(stage_spans), 2)
+        self.assertTrue(all(s['parent_id'] == root['span_id'] for s in stage_spans))
+        self.assertEqual(sorted(s['attributes']['repo'] for s in requests), ["a/b", "c/d"])
+        self.assertTrue(all(by_id[s['parent_id']]['name'] == "github.fetch" for s in requests))
+
+    def test_summary_shows_critical_path_and_errors(self):
+        """
+        测试汇总按最晚结束的子 span 给出关键路径，并列出失败 span 的错误。
+        """
+        spans = [
+            {'trace_id': "t", 'span_id': "root", 'parent_id': None, 'name': "job.github",
+             'start': 0, 'end': 10, 'duration': 10, 'attributes': {}, 'error': None},
+            {'trace_id': "t", 'span_id': "fast", 'parent_id': "root", 'name': "github.fetch",
+             'start': 0, 'end': 2, 'duration': 2, 'attributes': {'repo': "a/b"}, 'error': None},
+            {'trace_id': "t", 'span_id': "slow", 'parent_id': "root", 'name': "github.summarize",
+             'start': 2, 'end': 9, 'duration': 7, 'attributes': {'repo': "a/b"}, 'error': None},
+            {'trace_id': "t", 'span_id': "llm", 'parent_id': "slow", 'name': "llm.generate",
+             'start': 2, 'end': 9, 'duration': 7, 'attributes': {}, 'error': "Timeout: read timed out"},
+        ]
+
+        self.assertEqual([s['span_id'] for s in tracing.critical_path(spans)], ["root", "slow", "llm"])
+        summary = tracing.summarize(spans, top=2)
+        self.assertIn("error=Timeout: read timed out", summary)
+        self.assertNotIn("github.fetch", summary.split("最慢的")[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from wildcard_expander import WildcardExpander  # 导入要测试的通配订阅展开器
+from subscription_manager import SubscriptionManager  # 导入展开通配订阅的订阅管理器
+from github_client import GitHubClient  # 导入分页查询仓库的 GitHub 客户端
+
+NOW = 1_700_000_000  # 2023-11-14
+
+
+def repo(name, pushed_at="2023-11-01T00:00:00Z", archived=False):
+    return {'full_name': name, 'pushed_at': pushed_at, 'archived': archived}
+
+
+class TestWildcardExpander(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中创建缓存文件与订阅文件。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp_dir.name, "wildcard_cache.json")
+        self.github_client = MagicMock()
+        self.github_client.list_org_repos.return_value = [
+            repo("acme/api"), repo("acme/old", archived=True), repo("acme/stale", pushed_at="2021-01-01T00:00:00Z"),
+        ]
+        self.github_client.search_repos.return_value = [repo("someone/agent")]
+        self.expander = WildcardExpander(self.github_client, self.cache_file, ttl_hours=24, inactive_days=180)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_expansion_skips_inactive_repos_and_is_cached(self):
+        """
+        测试展开时跳过已归档与长时间未推送的仓库，结果在 TTL 内从缓存读取，查询失败时保留缓存。
+        """
+        self.assertEqual(self.expander.refresh("org:acme", NOW), ["acme/api"])
+        self.assertEqual(self.github_client.list_org_repos.call_args.kwargs['limit'], 200)
+        self.assertEqual(self.expander.refresh("topic:agents", NOW), ["someone/agent"])
+        self.assertEqual(self.github_client.search_repos.call_args.args[0], "topic:agents archived:false pushed:>=2023-05-18")
+
+        self.assertFalse(self.expander.is_stale("org:acme", NOW + 3600))
+        self.assertTrue(self.expander.is_stale("org:acme", NOW + 86400))
+        # 重启后从缓存文件读取
+        restarted = WildcardExpander(self.github_client, self.cache_file)
+        self.assertEqual(restarted.cached("org:acme"), ["acme/api"])
+
+        self.github_client.list_org_repos.side_effect = RuntimeError("rate limited")
+        self.assertEqual(restarted.refresh("org:acme", NOW + 86400), ["acme/api"])
+        self.assertTrue(restarted.is_stale("org:acme", NOW + 86400))
+
+    def test_subscription_manager_expands_wildcards(self):
+        """
+        测试展开的仓库继承通配订阅的收件人与参数，显式订阅的参数优先，未到 TTL 时不重新查询。
+        """
+        subscriptions_file = os.path.join(self.tmp_dir.name, "subscriptions.json")
+        with open(subscriptions_file, 'w') as f:
+            json.dump([
+                {"repo": "acme/api", "priority": 5},
+                {"repo": "org:acme", "recipients": ["team@example.com"], "frequency_days": 7, "priority": 1},
+                "topic:agents",
+            ], f)
+        manager = SubscriptionManager(subscriptions_file, expander=self.expander)
+        self.assertEqual(manager.list_repos(), ["acme/api"])
+
+        manager.refresh_wildcards(NOW)
+        self.assertEqual(manager.list_repos(), ["acme/api", "someone/agent"])
+        self.assertEqual(manager.recipients_for("acme/api"), [None, "team@example.com"])
+        self.assertEqual(manager.settings_for("acme/api"), {"priority": 5, "frequency_days": 7})
+        self.assertEqual(manager.by_recipient("team@example.com"), ["acme/api"])
+        self.assertEqual(manager.due_now(NOW), ["acme/api", "someone/agent"])
+
+        manager.refresh_wildcards(NOW + 3600)
+        self.assertEqual(self.github_client.list_org_repos.call_count, 1)
+
+    def test_worker_only_syncs_cache(self):
+        """
+        测试工作进程只读取协调进程写入的展开缓存，缓存过期也不访问 GitHub API。
+        """
+        subscriptions_file = os.path.join(self.tmp_dir.name, "subscriptions.json")
+        with open(subscriptions_file, 'w') as f:
+            json.dump(["org:acme"], f)
+        worker_client = MagicMock()
+        worker = SubscriptionManager(subscriptions_file, expander=WildcardExpander(worker_client, self.cache_file))
+        worker.sync_wildcards()
+        self.assertEqual(worker.list_repos(), [])
+
+        coordinator = SubscriptionManager(subscriptions_file, expander=self.expander)
+        coordinator.refresh_wildcards(NOW)
+        worker.sync_wildcards()
+        self.assertEqual(worker.list_repos(), ["acme/api"])
+        self.assertEqual(worker.recipients_for("acme/api"), [None])
+        worker_client.list_org_repos.assert_not_called()
+
+    @patch('github_client.requests.get')
+    def test_org_listing_pages_until_inactive(self, mock_get):
+        """
+        测试按推送时间倒序分页列出组织仓库，遇到不活跃的仓库即停止翻页。
+        """
+        first_page = MagicMock(status_code=200, headers={})
+        first_page.json.return_value = [repo(f"acme/r{i}") for i in range(100)]
+        second_page = MagicMock(status_code=200, headers={})
+        second_page.json.return_value = [repo("acme/last"), repo("acme/stale", pushed_at="2021-01-01T00:00:00Z"), repo("acme/x")]
+        mock_get.side_effect = [first_page, second_page]
+
+        repos = GitHubClient("token").list_org_repos("acme", pushed_since="2023-05-18T00:00:00Z")
+
+        self.assertEqual(len(repos), 101)
+        self.assertEqual(repos[-1]['full_name'], "acme/last")
+        self.assertEqual(mock_get.call_args.kwargs['params']['page'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
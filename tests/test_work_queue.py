@@ -0,0 +1,137 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from work_queue import WorkQueue, LeaseLost, run_worker  # 导入要测试的共享工作队列
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，在临时目录中创建工作队列数据库。
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "work_queue.db")
+        self.queue = WorkQueue(self.db_path, lease_seconds=60, max_attempts=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lease_is_exclusive_and_expires(self):
+        """
+        测试任务同一时间只能被一个工作进程领取，租约过期后可被重新领取。
+        """
+        self.assertEqual(self.queue.publish("run-1", ["a/b"]), 1)
+        self.assertEqual(self.queue.publish("run-1", ["a/b"]), 0)
+
+        task = self.queue.lease("worker-1")
+        self.assertEqual(task['key'], "a/b")
+        self.assertIsNone(self.queue.lease("worker-2"))
+        self.assertTrue(self.queue.heartbeat("worker-1", task))
+
+        # 模拟 worker-1 崩溃：租约立即过期后由 worker-2 接手，worker-1 的心跳失效
+        expired = WorkQueue(self.db_path, lease_seconds=-1, max_attempts=2)
+        expired.heartbeat("worker-1", task)
+        retried = self.queue.lease("worker-2")
+        self.assertEqual(retried['attempts'], 2)
+        self.assertFalse(self.queue.heartbeat("worker-1", task))
+
+        self.queue.complete("worker-2", retried)
+        self.assertEqual(self.queue.run_status("run-1"), {'pending': 0, 'leased': 0, 'done': 1, 'failed': 0})
+
+    def test_failed_task_is_retried_until_max_attempts(self):
+        """
+        测试处理失败的任务被放回队列，达到最大尝试次数后标记为 failed。
+        """
+        self.queue.publish("run-1", ["a/b"])
+        self.queue.fail("worker-1", self.queue.lease("worker-1"), "LLM 超时")
+        self.queue.fail("worker-1", self.queue.lease("worker-1"), "LLM 超时")
+
+        self.assertIsNone(self.queue.lease("worker-1"))
+        self.assertEqual(self.queue.run_status("run-1")['failed'], 1)
+
+    def test_workers_share_run_without_duplicates(self):
+        """
+        测试多个工作进程共同处理一次运行，每个仓库只被处理一次。
+        """
+        repos = [f"org/repo{i}" for i in range(20)]
+        self.queue.publish("run-1", repos)
+        processed = []
+        stop = threading.Event()
+
+        def process(repo, lease):
+            processed.append(repo)
+            time.sleep(0.01)
+
+        workers = [
+            threading.Thread(target=run_worker, args=(WorkQueue(self.db_path), f"worker-{i}", process, 0.05, stop))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        deadline = time.time() + 10
+        while self.queue.run_status("run-1")['done'] < len(repos) and time.time() < deadline:
+            time.sleep(0.05)
+        stop.set()
+        for worker in workers:
+            worker.join(5)
+
+        self.assertEqual(sorted(processed), sorted(repos))
+
+    def test_lost_lease_aborts_before_notify(self):
+        """
+        测试租约被其他工作进程接手后，原工作进程在通知前放弃处理，不标记完成也不记录失败。
+        """
+        self.queue.publish("run-1", ["a/b"])
+        notified = []
+        stop = threading.Event()
+        taken_over = {}
+
+        def process(repo, lease):
+            stop.set()  # 只处理这一个任务
+            # 模拟处理耗时超过租约：租约过期后由 worker-2 接手
+            WorkQueue(self.db_path, lease_seconds=-1).heartbeat("worker-1", lease.task)
+            taken_over['task'] = self.queue.lease("worker-2")
+            lease.ensure_held()
+            notified.append(repo)
+
+        run_worker(self.queue, "worker-1", process, 0.01, stop)
+
+        self.assertEqual(notified, [])
+        self.assertEqual(self.queue.run_status("run-1"), {'pending': 0, 'leased': 1, 'done': 0, 'failed': 0})
+        self.assertFalse(self.queue.heartbeat("worker-1", taken_over['task']))
+        self.assertTrue(self.queue.heartbeat("worker-2", taken_over['task']))
+
+    def test_lease_marks_lost_and_journal_mode_is_configurable(self):
+        """
+        测试心跳失败后租约被标记为丢失；默认使用回滚日志，WAL 需要显式配置。
+        """
+        self.queue.publish("run-1", ["a/b"])
+        task = self.queue.lease("worker-1")
+        with self.queue.holding("worker-1", task) as lease:
+            lease.ensure_held()
+            self.queue.fail("worker-1", task, "被移除")
+            with self.assertRaises(LeaseLost):
+                lease.ensure_held()
+            self.assertTrue(lease.lost.is_set())
+
+        def journal_mode(queue):
+            conn = sqlite3.connect(queue.db_path)
+            try:
+                return conn.execute("PRAGMA journal_mode").fetchone()[0]
+            finally:
+                conn.close()
+
+        self.assertEqual(journal_mode(self.queue), "delete")
+        self.assertEqual(journal_mode(WorkQueue(os.path.join(self.tmp_dir.name, "wal.db"), journal_mode="wal")), "wal")
+        with self.assertRaises(ValueError):
+            WorkQueue(os.path.join(self.tmp_dir.name, "bad.db"), journal_mode="memory")
+
+if __name__ == '__main__':
+    unittest.main()